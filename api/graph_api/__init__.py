@@ -1,12 +1,18 @@
 """Public API exports for graph_api plugin contracts."""
 
-from .model import Node, Edge, Graph
+from .model import Node, Edge, Graph, GraphStore, CompactGraph, GraphView, MappedGraph, open_graph, write_graph
 from .services import DataSourcePlugin, VisualizerPlugin
 
 __all__ = [
     "Node",
     "Edge",
     "Graph",
+    "GraphStore",
+    "CompactGraph",
+    "GraphView",
+    "MappedGraph",
+    "open_graph",
+    "write_graph",
     "DataSourcePlugin",
     "VisualizerPlugin",
 ]
\ No newline at end of file
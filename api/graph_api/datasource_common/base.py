@@ -2,11 +2,26 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional
 
-from api.graph_api.model import Graph, Node, Edge
+from api.graph_api.model import Graph, CompactGraph, Node, Edge
 from api.graph_api.services.datasource_plugin import DataSourcePlugin
-from .type_inference import infer_attributes, infer_type
+from .type_inference import AttributeTypeInference, infer_attributes, infer_type
+
+# Number of edges converted and validated together when a source is streamed
+STREAM_BATCH_SIZE = 10_000
+
+
+def iter_batches(items: Iterable[Any], size: int = STREAM_BATCH_SIZE) -> Iterator[list]:
+    # Groups a stream of items into lists of at most size items
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 
 class BaseDatasourcePlugin(DataSourcePlugin):
@@ -20,12 +35,18 @@ class BaseDatasourcePlugin(DataSourcePlugin):
         raw_data = self._parse_source(source, **options)
 
         # Create Graph and generate graph Nodes and Edges
-        graph_directed = options.get("directed", True)
-        graph = Graph(directed=bool(graph_directed))
+        graph = self._new_graph(options)
         self._build_nodes(raw_data, graph)
         self._build_edges(raw_data, graph)
         return graph
 
+    @staticmethod
+    def _new_graph(options: dict[str, Any]) -> Graph:
+        # compact=True keeps the graph in columnar storage, which is much smaller for big files
+        graph_directed = options.get("directed", True)
+        graph_cls = CompactGraph if options.get("compact") else Graph
+        return graph_cls(directed=bool(graph_directed))
+
     @staticmethod
     def _resolve_path(source: Any, options: dict[str, Any]) -> str:
         if isinstance(source, str) and source.strip():
@@ -41,9 +62,64 @@ class BaseDatasourcePlugin(DataSourcePlugin):
         pass
 
     # Create Node objects
+    # All nodes are handed to the graph as one batch, so IDs are validated in a single pass
     def _build_nodes(self, raw_data: Any, graph: Graph) -> None:
         nodes_data = (raw_data or {}).get("nodes", []) or []
+        # Plugins that typed the attribute values while parsing (e.g. by column) set typed_nodes
+        typed = bool((raw_data or {}).get("typed_nodes"))
+        graph.add_nodes_bulk(self._iter_nodes(nodes_data, typed))
+
+        # Typed attribute columns a plugin produced while parsing (one value per node, in node order)
+        # They are filled in while the nodes are consumed, so they are read only now
+        for key, column in ((raw_data or {}).get("node_columns") or {}).items():
+            graph.set_node_column(key, column)
 
+    # Create Edge objects
+    # Same as nodes, endpoints and edge IDs are validated once for the whole batch
+    def _build_edges(self, raw_data: Any, graph: Graph) -> None:
+        edges_data = (raw_data or {}).get("edges", []) or []
+
+        if (raw_data or {}).get("implicit_nodes"):
+            # Plugins that already converted edges (e.g. in worker processes) pass them as edge_batches
+            edge_batches = raw_data.get("edge_batches")
+            if edge_batches is not None:
+                for batch in edge_batches:
+                    self._add_edge_batch(batch, graph)
+            else:
+                self._build_edges_streaming(edges_data, graph)
+            return
+
+        graph.add_edges_bulk(self._iter_edges(edges_data, graph.directed))
+
+    # Used for sources without a node section (e.g. CSV edge lists)
+    # Edges are consumed in fixed-size batches and their endpoints become nodes the
+    # first time they appear, so only one batch of rows is in memory at a time
+    def _build_edges_streaming(self, edges_data: Iterable[Any], graph: Graph) -> None:
+        batch: list[Edge] = []
+        for edge in self._iter_edges(edges_data, graph.directed):
+            batch.append(edge)
+            if len(batch) >= STREAM_BATCH_SIZE:
+                self._add_edge_batch(batch, graph)
+                batch = []
+
+        if batch:
+            self._add_edge_batch(batch, graph)
+
+    @staticmethod
+    def _add_edge_batch(batch: list[Edge], graph: Graph) -> None:
+        # Add the endpoints not seen before (in order of appearance), then the edges
+        new_node_ids: dict[str, None] = {}
+        for edge in batch:
+            for node_id in (edge.source, edge.target):
+                if node_id not in new_node_ids and not graph.has_node(node_id):
+                    new_node_ids[node_id] = None
+
+        graph.add_nodes_bulk(Node(node_id=node_id, label=node_id) for node_id in new_node_ids)
+        graph.add_edges_bulk(batch)
+
+    def _iter_nodes(self, nodes_data: Iterable[Any], typed: bool = False) -> Iterator[Node]:
+        # Attributes with the same name are typed as one column
+        columns = AttributeTypeInference()
         for node_dict in nodes_data:
             if not isinstance(node_dict, dict):
                 continue
@@ -61,14 +137,12 @@ class BaseDatasourcePlugin(DataSourcePlugin):
             raw_attributes = {k: v for k, v in node_dict.items() if k not in reserved_keys}
 
             # Convert attributes to their true types
-            typed_attributes = infer_attributes(raw_attributes)
+            typed_attributes = raw_attributes if typed else infer_attributes(raw_attributes, columns)
 
-            graph.add_node(Node(node_id=node_id, label=label, attributes=typed_attributes))
-
-    # Create Edge objects
-    def _build_edges(self, raw_data: Any, graph: Graph) -> None:
-        edges_data = (raw_data or {}).get("edges", []) or []
+            yield Node(node_id=node_id, label=label, attributes=typed_attributes)
 
+    def _iter_edges(self, edges_data: Iterable[Any], directed: bool) -> Iterator[Edge]:
+        columns = AttributeTypeInference()
         for edge_dict in edges_data:
             if not isinstance(edge_dict, dict):
                 continue
@@ -91,20 +165,16 @@ class BaseDatasourcePlugin(DataSourcePlugin):
             except (TypeError, ValueError):
                 weight = 1.0
 
-            directed = graph.directed
-
             # Everything else is the node attribute
             reserved_keys = {"id", "source", "target", "weight", "directed"}
             raw_attributes = {k: v for k, v in edge_dict.items() if k not in reserved_keys}
-            typed_attributes = infer_attributes(raw_attributes)
-
-            graph.add_edge(
-                Edge(
-                    source=str(source),
-                    target=str(target),
-                    edge_id=edge_id,
-                    weight=weight,
-                    directed=directed,
-                    attributes=typed_attributes,
-                )
+            typed_attributes = infer_attributes(raw_attributes, columns)
+
+            yield Edge(
+                source=str(source),
+                target=str(target),
+                edge_id=edge_id,
+                weight=weight,
+                directed=directed,
+                attributes=typed_attributes,
             )
@@ -1,7 +1,70 @@
 # This will be used to automatically recognize attributes types
 
+from collections import Counter
 from datetime import date, datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, without it infer_column returns plain lists
+    np = None
+
+# Number of distinct string values whose inferred type is remembered
+INFERENCE_CACHE_SIZE = 1 << 16
+
+# Number of string values of a column looked at before a parser is locked in for it
+COLUMN_SAMPLE_SIZE = 32
+
+
+@lru_cache(maxsize=INFERENCE_CACHE_SIZE)
+def _infer_string(value: str) -> Any:
+    # Categorical columns repeat the same strings over and over, so results are cached.
+    # Every possible result (str, bool, int, float, date, datetime) is immutable and safe to share.
+    stripped = value.strip()
+    if stripped == "":
+        return value
+
+    lowered = stripped.lower()
+
+    # Boolean values
+    if lowered == "true":
+        return True
+    if lowered == "false":
+        return False
+
+    # Numbers and ISO dates start with a digit, a sign or a dot (or are inf/nan),
+    # anything else is plain text and does not need the parsers below
+    first = stripped[0]
+    if not (first.isdigit() or first in "+-." or lowered[:3] in ("inf", "nan")):
+        return value
+
+    # Integer
+    try:
+        return int(stripped)
+    except ValueError:
+        pass
+
+    # Float
+    try:
+        return float(stripped)
+    except ValueError:
+        pass
+
+    # ISO date
+    try:
+        return date.fromisoformat(stripped)
+    except ValueError:
+        pass
+
+    # ISO datetime
+    try:
+        return datetime.fromisoformat(stripped)
+    except ValueError:
+        pass
+
+    return value
+
 
 def infer_type(value: Any) -> Any:
     # Converts raw attribute values to more specific types when possible
@@ -17,47 +80,183 @@ def infer_type(value: Any) -> Any:
         return value
 
     if isinstance(value, str):
-        stripped = value.strip()
-        if stripped == "":
+        return _infer_string(value)
+
+    return value
+
+
+# Column parsers
+# Each one is only a shortcut for infer_type: it returns the same result, or None
+# when the value does not look like the column type and has to go through infer_type.
+
+def _parse_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _parse_float(value: str) -> Optional[float]:
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    # Whole numbers such as "3" are integers for infer_type
+    return None if number.is_integer() else number
+
+
+def _is_number(stripped: str) -> bool:
+    # float accepts every string int does
+    try:
+        float(stripped)
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_date(value: str) -> Optional[date]:
+    stripped = value.strip()
+    # YYYYMMDD is an integer for infer_type
+    if stripped.isdigit():
+        return None
+    try:
+        result = date.fromisoformat(stripped)
+    except ValueError:
+        return None
+    # infer_type tries numbers first, fromisoformat also takes some of them (e.g. "20190101.5")
+    return None if _is_number(stripped) else result
+
+
+def _parse_datetime(value: str) -> Optional[datetime]:
+    stripped = value.strip()
+    # Up to 10 characters it can still be a plain ISO date, digits only is an integer
+    if len(stripped) <= 10 or stripped.isdigit():
+        return None
+    try:
+        result = datetime.fromisoformat(stripped)
+    except ValueError:
+        return None
+    return None if _is_number(stripped) else result
+
+
+_COLUMN_PARSERS: Dict[type, Callable[[str], Any]] = {
+    int: _parse_int,
+    float: _parse_float,
+    date: _parse_date,
+    datetime: _parse_datetime,
+}
+
+
+class ColumnTypeInference:
+    """
+    Type inference for the values of a single column (attribute name).
+
+    The first COLUMN_SAMPLE_SIZE strings go through infer_type. If they all come out
+    as the same numeric or date type, the parser for that type is locked in and tried
+    first for the rest of the column. Text and boolean columns keep using the cache of
+    infer_type. Values the locked parser rejects still go through infer_type, so the
+    result is always the same as calling infer_type on every value.
+    """
+
+    def __init__(self, sample_size: int = COLUMN_SAMPLE_SIZE):
+        self._sample_size = sample_size
+        self._sampled: Counter = Counter()
+        self._seen = 0
+        self._parser: Optional[Callable[[str], Any]] = None
+
+    def infer(self, value: Any) -> Any:
+        # infer_type keeps every value that is not a string as it is
+        if not isinstance(value, str):
             return value
 
-        lowered = stripped.lower()
-
-        # Boolean values
-        if lowered == "true":
-            return True
-        if lowered == "false":
-            return False
-
-        # Integer
-        try:
-            return int(stripped)
-        except ValueError:
-            pass
-
-        # Float
-        try:
-            return float(stripped)
-        except ValueError:
-            pass
-
-        # ISO date
-        try:
-            return date.fromisoformat(stripped)
-        except ValueError:
-            pass
-
-        # ISO datetime
-        try:
-            return datetime.fromisoformat(stripped)
-        except ValueError:
-            pass
+        if self._parser is not None:
+            result = self._parser(value)
+            if result is not None:
+                return result
+            return _infer_string(value)
+
+        result = _infer_string(value)
+        if self._seen < self._sample_size:
+            self._observe(result)
+        return result
+
+    def _observe(self, result: Any) -> None:
+        self._seen += 1
+        self._sampled[type(result)] += 1
+        if self._seen == self._sample_size and len(self._sampled) == 1:
+            (kind,) = self._sampled
+            self._parser = _COLUMN_PARSERS.get(kind)
 
-    return value
 
-def infer_attributes(raw_dict: dict) -> dict:
+class AttributeTypeInference:
+    # One ColumnTypeInference per attribute name, shared by all rows of a load
+    def __init__(self):
+        self._columns: Dict[str, ColumnTypeInference] = {}
+
+    def infer_attributes(self, raw_dict: dict) -> dict:
+        columns = self._columns
+        typed = {}
+        for key, value in raw_dict.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = ColumnTypeInference()
+            typed[key] = column.infer(value)
+        return typed
+
+
+def infer_attributes(raw_dict: dict, columns: Optional[AttributeTypeInference] = None) -> dict:
     # Apply type inference to every attribute value in a dictionary
+    # Passing the same columns object for every row of a source enables column-level inference
+    if columns is not None:
+        return columns.infer_attributes(raw_dict)
     return {
         key: infer_type(value)
         for key, value in raw_dict.items()
     }
+
+
+def infer_column(values: Sequence[Any]) -> Any:
+    """
+    Infers the types of a whole column at once.
+
+    With NumPy installed, a column of strings that infer_type would turn entirely into
+    ints, floats or booleans is parsed straight into an int64, float64 or bool array.
+    Every other column (mixed types, missing values, text, dates) is returned as a list
+    of infer_type results, and so is every column without NumPy.
+    """
+    count = len(values)
+    if np is None or not count or not all(isinstance(value, str) for value in values):
+        return [infer_type(value) for value in values]
+
+    # Each attempt stops at the first value that does not parse
+    try:
+        return np.fromiter(map(int, values), dtype=np.int64, count=count)
+    except (ValueError, OverflowError):
+        pass
+
+    try:
+        floats = np.fromiter(map(float, values), dtype=np.float64, count=count)
+    except ValueError:
+        floats = None
+
+    if floats is not None:
+        # Whole numbers that int() accepts are ints for infer_type, which makes the column mixed
+        whole = np.flatnonzero(np.isfinite(floats) & (floats == np.floor(floats)))
+        if all(_parse_int(values[i]) is None for i in whole.tolist()):
+            return floats
+    elif {value.strip().lower() for value in set(values)} <= {"true", "false"}:
+        return np.fromiter((value.strip().lower() == "true" for value in values), dtype=np.bool_, count=count)
+
+    return [infer_type(value) for value in values]
+
+
+def concat_columns(columns: List[Any]) -> Optional[Any]:
+    # Joins the typed arrays infer_column returned for consecutive batches of one column
+    # Returns None when they are not all arrays of the same type
+    if np is None or not columns:
+        return None
+    if not all(isinstance(column, np.ndarray) for column in columns):
+        return None
+    if len({column.dtype for column in columns}) != 1:
+        return None
+    return np.concatenate(columns)
@@ -0,0 +1,23 @@
+"""
+Layout building blocks shared by the visualizer plugins.
+"""
+
+from .preparation import get_components, get_levels, partition_edges
+from .cache import DEFAULT_LAYOUT_CACHE_SIZE, LAYOUT_CACHE, LayoutCache, graph_fingerprint
+from .hierarchical import Layout, LayoutParams, hierarchical_layout
+from .incremental import incremental_layout, update_layout
+
+__all__ = [
+    "get_components",
+    "get_levels",
+    "partition_edges",
+    "DEFAULT_LAYOUT_CACHE_SIZE",
+    "LAYOUT_CACHE",
+    "LayoutCache",
+    "graph_fingerprint",
+    "Layout",
+    "LayoutParams",
+    "hierarchical_layout",
+    "incremental_layout",
+    "update_layout",
+]
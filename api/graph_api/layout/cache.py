@@ -0,0 +1,108 @@
+"""
+LRU cache of layouts keyed by the structure of the graph.
+
+The fingerprint of a graph only covers its node IDs and edge endpoints, in order, so
+changes to attributes, labels, weights or the directed flag keep the cached layout.
+Entries are keyed by (fingerprint, algorithm, params) for finished layouts and by
+(fingerprint, algorithm) for the parameter-free part of an algorithm, which visualizers
+with different node sizes can share.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from ..model.graph import Graph
+
+# Number of layouts (and prepared hierarchies) kept by LAYOUT_CACHE
+DEFAULT_LAYOUT_CACHE_SIZE = 64
+
+# Node IDs / edges hashed per update call, bounds the temporary string for large graphs
+_FINGERPRINT_BATCH = 1 << 16
+
+
+def _hash_batches(digest, values) -> None:
+    batch = []
+    for value in values:
+        batch.append(value)
+        if len(batch) >= _FINGERPRINT_BATCH:
+            digest.update("\0".join(batch).encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+            batch = []
+    if batch:
+        digest.update("\0".join(batch).encode("utf-8", "surrogatepass"))
+
+
+def graph_fingerprint(graph: Graph) -> str:
+    # Hash of the node IDs and the edge endpoints in graph order
+    nodes, edges = graph.nodes, graph.edges
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"nodes %d edges %d\0" % (len(nodes), len(edges)))
+    _hash_batches(digest, (node.node_id for node in nodes))
+    digest.update(b"\1")
+    _hash_batches(digest, (f"{edge.source}\1{edge.target}" for edge in edges))
+    return digest.hexdigest()
+
+
+class LayoutCache:
+    """
+    Thread-safe LRU mapping bounded by a number of entries. None keeps every entry,
+    0 disables caching.
+
+    Cached layouts are shared by every caller and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: Optional[int] = DEFAULT_LAYOUT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if self.max_entries is not None and self.max_entries <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._trim()
+
+    def resize(self, max_entries: Optional[int]) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self._trim()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _trim(self) -> None:
+        if self.max_entries is None:
+            return
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+
+
+# Shared by every visualizer in the process
+LAYOUT_CACHE = LayoutCache()
@@ -0,0 +1,431 @@
+"""
+Hierarchical (layered) layout shared by the visualizer plugins.
+
+Every connected component is laid out as a layered tree: BFS levels give the columns,
+and every node gets a vertical slice proportional to the number of leaves below it,
+so parents are centered on their subtree. Components are placed side by side, largest
+first, and wrap into a new row when the row gets wider than wrap_width.
+
+Coordinates are kept by node ordinal in float64 arrays from placement to rendering:
+placement fills array("d") buffers in place, the normalized layout holds NumPy arrays
+when NumPy is installed (array("d") otherwise) and templates index them by ordinal.
+"""
+
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..model.graph import Graph
+from .cache import LAYOUT_CACHE, LayoutCache, graph_fingerprint
+from .preparation import get_components, get_levels, partition_edges
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Cache key part of this algorithm, layouts of other algorithms can share LAYOUT_CACHE
+ALGORITHM = "hierarchical"
+
+
+class LayoutParams(NamedTuple):
+    # node_width: width of a node, levels are spaced from its left edge and x is its center
+    # node_spacing: vertical space given to one leaf of the hierarchy
+    # level_spacing: horizontal distance between two levels
+    # component_gap / row_gap: space between components in a row and between rows
+    # wrap_width: a new row starts once the row offset gets past this
+    # margin: space kept around the normalized layout
+    node_width: float = 0.0
+    node_spacing: float = 60.0
+    level_spacing: float = 200.0
+    component_gap: float = 250.0
+    row_gap: float = 100.0
+    wrap_width: float = 1300.0
+    margin: float = 80.0
+
+
+def coordinate_array(values) -> Any:
+    # Contiguous float64 array of coordinates, NumPy when available
+    if np is not None:
+        return np.array(values, dtype=np.float64)
+    return array("d", values)
+
+
+def zero_array(count: int) -> array:
+    # Raw coordinate buffer of count zeros, filled in place by the placement
+    return array("d", bytes(8 * count))
+
+
+def padded_array(values: Any, delta: float, count: int) -> Any:
+    # New coordinate array with delta added to every value and count zeros appended
+    if np is not None and isinstance(values, np.ndarray):
+        padded = np.zeros(len(values) + count, dtype=np.float64)
+        padded[:len(values)] = values + delta if delta else values
+        return padded
+    padded = array("d", [value + delta for value in values]) if delta else array("d", values)
+    padded.frombytes(bytes(8 * count))
+    return padded
+
+
+def offset_array(values: Any, delta: float) -> Any:
+    # New coordinate array with delta added to every value
+    if np is not None and isinstance(values, np.ndarray):
+        return values + delta
+    return array("d", [value + delta for value in values])
+
+
+def _bounds(values: Any) -> Tuple[float, float]:
+    if np is not None and isinstance(values, np.ndarray):
+        return float(values.min()), float(values.max())
+    return min(values), max(values)
+
+
+class Layout:
+    """
+    Node positions of one layout run.
+
+    x and y are float64 arrays (see coordinate_array) indexed by node ordinal (the position
+    of the node in graph.nodes, also the position of its ID in node_ids). Coordinates are
+    normalized, the layout starts at (margin, margin) and spans width x height including
+    the margins. Cached layouts are shared, the arrays must not be modified in place.
+
+    placement records where every component went, so the layout can be updated after
+    small edits (see api.graph_api.layout.incremental).
+    """
+
+    __slots__ = ("node_ids", "index", "x", "y", "width", "height", "placement")
+
+    def __init__(self, node_ids: List[str], x: Any, y: Any, width: float, height: float,
+                 placement: Optional["Placement"] = None, index: Optional[Dict[str, int]] = None):
+        self.node_ids = node_ids
+        if index is None:
+            index = {node_id: ordinal for ordinal, node_id in enumerate(node_ids)}
+        self.index = index
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.placement = placement
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def position(self, node_id: str) -> Tuple[float, float]:
+        ordinal = self.index[node_id]
+        return float(self.x[ordinal]), float(self.y[ordinal])
+
+    def items(self) -> Iterator[Tuple[str, float, float]]:
+        return zip(self.node_ids, self.x.tolist(), self.y.tolist())
+
+    def corners(self, width: float, height: float) -> Tuple[Any, Any]:
+        # Top-left corners of width x height boxes centered on the nodes, by node ordinal
+        return offset_array(self.x, -width / 2), offset_array(self.y, -height / 2)
+
+    def to_dict(self) -> dict:
+        # JSON-ready layout, coordinates listed by node ordinal
+        return {
+            "node_ids": list(self.node_ids),
+            "x": self.x.tolist(),
+            "y": self.y.tolist(),
+            "width": self.width,
+            "height": self.height,
+        }
+
+
+class Component:
+    """
+    Parameter-free part of the layout of one connected component.
+
+    levels lists the node IDs of every BFS level, child_map the hierarchy edges (to the
+    next level only) and subtree_size the number of hierarchy leaves under every node.
+    fingerprint is the edge_fingerprint of the edges the component was built from.
+    """
+
+    __slots__ = ("nodes", "levels", "child_map", "subtree_size", "fingerprint")
+
+    def __init__(self, nodes: List[str], levels: List[List[str]], child_map: Dict[str, List[str]],
+                 subtree_size: Dict[str, int], fingerprint: int = 0):
+        self.nodes = nodes
+        self.levels = levels
+        self.child_map = child_map
+        self.subtree_size = subtree_size
+        self.fingerprint = fingerprint
+
+
+class Hierarchy:
+    # Components of a graph, largest first, the node IDs in graph order, the component
+    # of every node and the number of edges the hierarchy was built from
+    __slots__ = ("node_ids", "components", "component_of", "edge_count")
+
+    def __init__(self, node_ids: List[str], components: List[Component], edge_count: int,
+                 component_of: Optional[Dict[str, Component]] = None):
+        self.node_ids = node_ids
+        self.components = components
+        if component_of is None:
+            component_of = {nid: component for component in components for nid in component.nodes}
+        self.component_of = component_of
+        self.edge_count = edge_count
+
+
+class Coordinates:
+    # Raw (not normalized) coordinates by node ordinal, filled in by the placement
+    __slots__ = ("index", "x", "y")
+
+    def __init__(self, index: Dict[str, int], x: array, y: array):
+        self.index = index
+        self.x = x
+        self.y = y
+
+
+# Box reserved for one component, in raw (not normalized) coordinates:
+# (x, y) of its top-left corner, its reserved width and the index of its row
+Slot = Tuple[float, float, float, int]
+
+
+class Placement:
+    """
+    Where every component of a hierarchy was placed.
+
+    slots is aligned with hierarchy.components. rows holds [y, height] of every row,
+    the last one is still open and cursor is the x offset of its next component.
+    shift is the (min_x, min_y) subtracted from raw coordinates by the normalization.
+    """
+
+    __slots__ = ("hierarchy", "params", "slots", "rows", "cursor", "shift")
+
+    def __init__(self, hierarchy: Hierarchy, params: LayoutParams):
+        self.hierarchy = hierarchy
+        self.params = params
+        self.slots: List[Slot] = []
+        self.rows: List[List[float]] = [[0.0, 0.0]]
+        self.cursor = 0.0
+        self.shift = (0.0, 0.0)
+
+    def copy(self) -> "Placement":
+        placement = Placement(self.hierarchy, self.params)
+        placement.slots = list(self.slots)
+        placement.rows = [list(row) for row in self.rows]
+        placement.cursor = self.cursor
+        placement.shift = self.shift
+        return placement
+
+    def size(self, component: Component) -> Tuple[float, float]:
+        # Width and height the component needs with these params
+        levels = component.levels
+        roots = levels[0] if levels else []
+        width = (len(levels) - 1) * self.params.level_spacing + self.params.node_width
+        height = sum(component.subtree_size[r] for r in roots) * self.params.node_spacing
+        return width, height
+
+    def fits(self, slot: Slot, component: Component) -> bool:
+        # A reserved box can take a component as wide as it, and as high as its row
+        # unless the row is still open (nothing below it yet)
+        width, height = self.size(component)
+        row = slot[3]
+        return width <= slot[2] and (height <= self.rows[row][1] or row == len(self.rows) - 1)
+
+    def place(self, component: Component, slot: Slot, coordinates: Coordinates) -> Slot:
+        # Places the component in a box reserved earlier
+        x, y, _, row = slot
+        height = _place_component(component, x, y, self.params, coordinates)
+        self.rows[row][1] = max(self.rows[row][1], height)
+        return slot
+
+    def append(self, component: Component, coordinates: Coordinates) -> Slot:
+        # Places the component after the last one, wrapping into a new row past wrap_width
+        params = self.params
+        row_y = self.rows[-1][0]
+        slot = (self.cursor, row_y, self.size(component)[0], len(self.rows) - 1)
+        self.place(component, slot, coordinates)
+
+        self.cursor += slot[2] + params.component_gap
+        if self.cursor > params.wrap_width:
+            self.cursor = 0.0
+            self.rows.append([row_y + self.rows[-1][1] + params.row_gap, 0.0])
+        return slot
+
+
+def edge_fingerprint(edge) -> int:
+    # Summed over the edges of a component, so the order of the edges does not matter.
+    # Only compared within one process, hierarchies are not shared across processes.
+    return hash((edge.source, edge.target))
+
+
+def build_component(comp_nodes: List[str], comp_edges: list) -> Component:
+    # BFS levels and bottom-up subtree weights of one component
+    levels = get_levels(comp_nodes, comp_edges)
+
+    # Group node IDs by their BFS level
+    lvl_dict: Dict[int, List[str]] = {}
+    for nid, lvl in levels.items():
+        lvl_dict.setdefault(lvl, []).append(nid)
+
+    max_lvl = max(lvl_dict.keys()) if lvl_dict else 0
+
+    # subtree_size[nid] is the number of leaves under the node, which decides
+    # how much vertical space the node needs for its children.
+    subtree_size: Dict[str, int] = {}
+
+    # Hierarchy edges only go to the next level
+    child_map: Dict[str, List[str]] = {nid: [] for nid in comp_nodes}
+    for e in comp_edges:
+        if levels.get(e.target) == levels.get(e.source, 0) + 1:
+            child_map[e.source].append(e.target)
+
+    for lvl in range(max_lvl, -1, -1):
+        for nid in lvl_dict.get(lvl, []):
+            children = child_map[nid]
+            if not children:
+                subtree_size[nid] = 1  # Leaf of the hierarchy
+            else:
+                subtree_size[nid] = sum(subtree_size[c] for c in children)
+
+    return Component(
+        comp_nodes,
+        [lvl_dict.get(lvl, []) for lvl in range(max_lvl + 1)],
+        child_map,
+        subtree_size,
+        sum(edge_fingerprint(e) for e in comp_edges),
+    )
+
+
+def build_hierarchy(graph: Graph) -> Hierarchy:
+    # Edges are split by component in one pass, before the largest components are moved first
+    components = get_components(graph)
+    islands = sorted(zip(components, partition_edges(graph, components)), key=lambda c: len(c[0]), reverse=True)
+    return Hierarchy(
+        [node.node_id for node in graph.nodes],
+        [build_component(comp_nodes, comp_edges) for comp_nodes, comp_edges in islands],
+        len(graph.edges),
+    )
+
+
+def place_hierarchy(hierarchy: Hierarchy, params: LayoutParams) -> Layout:
+    """
+    Assigns coordinates to a prepared hierarchy.
+
+    Components are placed one after the other (see _place_component), then coordinates
+    are normalized into a margin-protected bounding box.
+    """
+    node_ids = hierarchy.node_ids
+    coordinates = Coordinates(
+        {node_id: ordinal for ordinal, node_id in enumerate(node_ids)},
+        zero_array(len(node_ids)),
+        zero_array(len(node_ids)),
+    )
+    placement = Placement(hierarchy, params)
+    for component in hierarchy.components:
+        placement.slots.append(placement.append(component, coordinates))
+
+    return _normalized(coordinates, placement)
+
+
+def _place_component(component: Component, x_offset: float, y_offset: float, params: LayoutParams,
+                     coordinates: Coordinates) -> float:
+    """
+    Places one component with its top-left corner at (x_offset, y_offset) and returns its height.
+
+    Roots share the height of the component in proportion to their weights, and
+    children share the vertical slice of their parent the same way, so every parent
+    is centered on its subtree.
+    """
+    levels = component.levels
+    child_map = component.child_map
+    subtree_size = component.subtree_size
+    max_lvl = len(levels) - 1
+    half_width = params.node_width / 2
+    index, xs, ys = coordinates.index, coordinates.x, coordinates.y
+
+    roots = levels[0] if levels else []
+    total_comp_weight = sum(subtree_size[r] for r in roots)
+
+    # Vertical slice allocated to every positioned node: (y_start, y_end)
+    node_y_range: Dict[str, Tuple[float, float]] = {}
+
+    current_y = y_offset
+    for r in roots:
+        size = subtree_size[r] * params.node_spacing
+        node_y_range[r] = (current_y, current_y + size)
+        xs[index[r]] = x_offset + half_width
+        ys[index[r]] = current_y + (size / 2)
+        current_y += size
+
+    for lvl in range(1, max_lvl + 1):
+        x = x_offset + (lvl * params.level_spacing) + half_width
+
+        for parent_id in levels[lvl - 1]:
+            if parent_id not in node_y_range:
+                continue
+
+            p_y_start, p_y_end = node_y_range[parent_id]
+            children = child_map[parent_id]
+            if not children:
+                continue
+
+            child_y_cursor = p_y_start
+            parent_weight = subtree_size[parent_id]
+
+            for c_id in children:
+                c_space = (subtree_size[c_id] / parent_weight) * (p_y_end - p_y_start)
+                node_y_range[c_id] = (child_y_cursor, child_y_cursor + c_space)
+                xs[index[c_id]] = x
+                ys[index[c_id]] = child_y_cursor + (c_space / 2)
+                child_y_cursor += c_space
+
+        # Safety net for nodes of this level no parent placed
+        for nid in levels[lvl]:
+            if nid not in node_y_range:
+                xs[index[nid]] = x
+                ys[index[nid]] = y_offset
+
+    return total_comp_weight * params.node_spacing
+
+
+def hierarchical_layout(graph: Graph, params: LayoutParams = LayoutParams(),
+                        cache: Optional[LayoutCache] = LAYOUT_CACHE) -> Layout:
+    """
+    Computes the layered layout of a graph.
+
+    Every component goes through BFS level assignment (horizontal positioning), a
+    bottom-up subtree weight calculation (required vertical space) and a top-down
+    coordinate assignment (see place_hierarchy).
+
+    Layouts are cached by graph structure and params, so re-rendering an unchanged
+    topology skips the layout. The hierarchy is cached by structure alone and shared
+    by every caller, whatever its params. Pass cache=None to always recompute.
+    """
+    if cache is None:
+        return place_hierarchy(build_hierarchy(graph), params)
+
+    fingerprint = graph_fingerprint(graph)
+    layout = cache.get((fingerprint, ALGORITHM, params))
+    if layout is not None:
+        return layout
+
+    hierarchy = cache.get((fingerprint, ALGORITHM))
+    if hierarchy is None:
+        hierarchy = build_hierarchy(graph)
+        cache.put((fingerprint, ALGORITHM), hierarchy)
+
+    layout = place_hierarchy(hierarchy, params)
+    cache.put((fingerprint, ALGORITHM, params), layout)
+    return layout
+
+
+def _normalized(coordinates: Coordinates, placement: Placement) -> Layout:
+    # Shifts the layout so its bounding box starts at (margin, margin)
+    node_ids = placement.hierarchy.node_ids
+    margin = placement.params.margin
+    if not node_ids:
+        empty = coordinate_array([])
+        return Layout(node_ids, empty, coordinate_array([]), 2 * margin, 2 * margin, placement, coordinates.index)
+
+    x = coordinate_array(coordinates.x)
+    y = coordinate_array(coordinates.y)
+    min_x, max_x = _bounds(x)
+    min_y, max_y = _bounds(y)
+    placement.shift = (min_x, min_y)
+
+    x = offset_array(offset_array(x, -min_x), margin)
+    y = offset_array(offset_array(y, -min_y), margin)
+    return Layout(node_ids, x, y, max_x - min_x + (2 * margin), max_y - min_y + (2 * margin), placement,
+                  coordinates.index)
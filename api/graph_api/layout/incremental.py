@@ -0,0 +1,244 @@
+"""
+Incremental updates of hierarchical layouts after small structural edits.
+
+A change set lists what happened to the graph since the previous layout, in order:
+
+    ("add_node", node_id)
+    ("add_edge", source_id, target_id)
+    ("remove_edge", source_id, target_id)
+
+Only the components touched by the changes are re-leveled and re-weighted. They
+merge (new edges) or split (removed edges) among themselves, the rest of the graph
+keeps its components, and their nodes keep their coordinates. A rebuilt component
+goes back into one of the boxes its parts used if it still fits there, otherwise it
+is placed after the last component, like a new one.
+
+Anything else (removed nodes, reordered nodes, edits the change set does not describe)
+makes update_layout give up, and incremental_layout falls back to a full layout. Edits
+the change set does not describe are caught by comparing the edges of every component
+with the fingerprint of the edges it was built from.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..model.graph import Graph
+from .cache import LAYOUT_CACHE, LayoutCache, graph_fingerprint
+from .hierarchical import (
+    ALGORITHM,
+    Component,
+    Coordinates,
+    Hierarchy,
+    Layout,
+    LayoutParams,
+    Placement,
+    _bounds,
+    build_component,
+    edge_fingerprint,
+    hierarchical_layout,
+    padded_array,
+    zero_array,
+)
+
+ADD_NODE = "add_node"
+ADD_EDGE = "add_edge"
+REMOVE_EDGE = "remove_edge"
+
+Change = Tuple[str, ...]
+
+
+def update_layout(previous: Layout, graph: Graph, changes: Sequence[Change]) -> Optional[Layout]:
+    """
+    Applies a change set to a previous layout of the graph.
+
+    Returns None when the graph does not match the previous layout plus the changes,
+    or when the previous layout has no nodes or no placement to start from.
+    """
+    placement = previous.placement
+    if placement is None or not changes or not previous.node_ids:
+        return None
+    hierarchy = placement.hierarchy
+
+    added: List[str] = []
+    touched: List[str] = []
+    edge_count = hierarchy.edge_count
+    for change in changes:
+        kind = change[0]
+        if kind == ADD_NODE:
+            added.append(change[1])
+            touched.append(change[1])
+        elif kind in (ADD_EDGE, REMOVE_EDGE):
+            edge_count += 1 if kind == ADD_EDGE else -1
+            touched.extend(change[1:3])
+        else:
+            return None
+
+    # New nodes are appended to the graph, everything else stays in order
+    node_ids = [node.node_id for node in graph.nodes]
+    old_count = len(hierarchy.node_ids)
+    if (len(graph.edges) != edge_count or node_ids[old_count:] != added
+            or node_ids[:old_count] != hierarchy.node_ids):
+        return None
+
+    # Components touched by the changes, and every node they hold now
+    component_of = dict(hierarchy.component_of)
+    affected: List[Component] = []
+    members = set(added)
+    for nid in touched:
+        component = component_of.get(nid)
+        if component is None:
+            if nid not in members:
+                return None
+        elif component not in affected:
+            affected.append(component)
+            members.update(component.nodes)
+
+    rebuilt = _rebuild_components(graph, members, previous.index, added)
+    if rebuilt is None:
+        return None
+
+    # Untouched components keep their boxes, the boxes of affected ones are up for reuse
+    components = list(hierarchy.components)
+    new_placement = placement.copy()
+    free = []
+    for component in affected:
+        index = components.index(component)
+        free.append(new_placement.slots.pop(index))
+        del components[index]
+
+    # Raw coordinates of the rebuilt components, the other entries stay unused
+    index = dict(previous.index)
+    for ordinal, nid in enumerate(added, old_count):
+        index[nid] = ordinal
+    coordinates = Coordinates(index, zero_array(len(node_ids)), zero_array(len(node_ids)))
+
+    for component in rebuilt:
+        slot = next((slot for slot in free if new_placement.fits(slot, component)), None)
+        if slot is None:
+            slot = new_placement.append(component, coordinates)
+        else:
+            free.remove(slot)
+            new_placement.place(component, slot, coordinates)
+        components.append(component)
+        new_placement.slots.append(slot)
+        for nid in component.nodes:
+            component_of[nid] = component
+
+    if not _matches_graph(graph, components, component_of):
+        return None
+
+    new_placement.hierarchy = Hierarchy(node_ids, components, edge_count, component_of)
+    return _shifted(previous, new_placement, coordinates, [nid for component in rebuilt for nid in component.nodes])
+
+
+def incremental_layout(graph: Graph, params: LayoutParams = LayoutParams(),
+                       cache: Optional[LayoutCache] = LAYOUT_CACHE, lineage: Optional[str] = None,
+                       changes: Sequence[Change] = ()) -> Layout:
+    """
+    hierarchical_layout that follows a graph through its edits.
+
+    lineage names a series of layouts of one graph (e.g. a graph ID) and changes is the
+    change log of that series, growing from the graph state the series started with.
+    The latest layout of every (lineage, params) is kept in the cache with the number
+    of changes it includes, so only the newer changes are applied to it. A lineage with
+    a different change log must use a new name. Without a lineage or a cache this is
+    hierarchical_layout.
+    """
+    if lineage is None or cache is None:
+        return hierarchical_layout(graph, params, cache)
+
+    fingerprint = graph_fingerprint(graph)
+    layout = cache.get((fingerprint, ALGORITHM, params))
+    if layout is None:
+        latest = cache.get((ALGORITHM, lineage, params))
+        if latest is not None and latest[1] <= len(changes):
+            layout = update_layout(latest[0], graph, changes[latest[1]:])
+
+        if layout is None:
+            layout = hierarchical_layout(graph, params, cache)
+        else:
+            cache.put((fingerprint, ALGORITHM), layout.placement.hierarchy)
+            cache.put((fingerprint, ALGORITHM, params), layout)
+
+    cache.put((ALGORITHM, lineage, params), (layout, len(changes)))
+    return layout
+
+
+def _rebuild_components(graph: Graph, members: set, index: Dict[str, int],
+                        added: List[str]) -> Optional[List[Component]]:
+    """
+    Components of the member nodes, as build_hierarchy would find them.
+
+    The members have to be closed under adjacency (whole components), so the BFS
+    starts from every member in graph order, exactly like get_components. Edges are
+    taken per source node, which keeps their order within every source.
+    """
+    # New nodes come last, in the order they were added
+    order = sorted((nid for nid in members if nid in index), key=index.__getitem__)
+    order.extend(nid for nid in added if nid in members)
+
+    visited = set()
+    components = []
+    for start in order:
+        if start in visited:
+            continue
+        comp_nodes = []
+        comp_edges = []
+        queue = deque([start])
+        visited.add(start)
+        while queue:
+            curr = queue.popleft()
+            comp_nodes.append(curr)
+            comp_edges.extend(graph.out_edges(curr))
+            for neighbor in graph.neighbors(curr):
+                if neighbor not in members:
+                    return None
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
+        components.append(build_component(comp_nodes, comp_edges))
+    return components
+
+
+def _matches_graph(graph: Graph, components: List[Component], component_of: Dict[str, Component]) -> bool:
+    # Every edge stays within one component and every component still has the edges it
+    # was built from, so a component left untouched by the changes really is unchanged
+    fingerprints: Dict[int, int] = {}
+    for edge in graph.edges:
+        component = component_of[edge.source]
+        if component_of[edge.target] is not component:
+            return False
+        key = id(component)
+        fingerprints[key] = fingerprints.get(key, 0) + edge_fingerprint(edge)
+    return all(fingerprints.get(id(component), 0) == component.fingerprint for component in components)
+
+
+def _shifted(previous: Layout, placement: Placement, coordinates: Coordinates, placed: List[str]) -> Layout:
+    """
+    Normalizes the placed nodes with the shift of the previous layout.
+
+    Untouched nodes keep their coordinates, unless rebuilt components reach further
+    up or left than the previous layout, then everything moves by the same amount.
+    """
+    margin = placement.params.margin
+    index = coordinates.index
+    ordinals = [index[nid] for nid in placed]
+    raw_x = [coordinates.x[ordinal] for ordinal in ordinals]
+    raw_y = [coordinates.y[ordinal] for ordinal in ordinals]
+
+    old_x, old_y = placement.shift
+    min_x = min([old_x] + raw_x)
+    min_y = min([old_y] + raw_y)
+    placement.shift = (min_x, min_y)
+
+    # Previous coordinates, moved along when the shift changed, then the placed nodes
+    padding = len(index) - len(previous)
+    x = padded_array(previous.x, old_x - min_x, padding)
+    y = padded_array(previous.y, old_y - min_y, padding)
+    for ordinal, px, py in zip(ordinals, raw_x, raw_y):
+        x[ordinal] = px - min_x + margin
+        y[ordinal] = py - min_y + margin
+
+    width = _bounds(x)[1] + margin if len(x) else 2 * margin
+    height = _bounds(y)[1] + margin if len(y) else 2 * margin
+    return Layout(placement.hierarchy.node_ids, x, y, width, height, placement, index)
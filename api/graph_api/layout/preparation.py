@@ -0,0 +1,105 @@
+"""
+Component detection, edge partitioning and BFS levels for layered layouts.
+
+Every step is linear in the size of the graph: the BFS traversals use deques and
+adjacency maps, and edges are split by component in a single pass over the graph.
+"""
+
+from collections import deque
+from typing import Dict, List
+
+from ..model.edge import Edge
+from ..model.graph import Graph
+
+
+def get_components(graph: Graph) -> List[List[str]]:
+    """
+    Detects connected components in the graph by performing a BFS traversal
+    over the graph's undirected neighbor index.
+
+    This ensures that disconnected parts of the graph are identified as
+    separate groups, allowing the visualizer to arrange them as independent
+    "islands" rather than forcing them into a single global hierarchy.
+
+    Returns:
+        List[List[str]]: A list of components, where each component
+        is represented as a list of node IDs belonging to that component,
+        in BFS order.
+    """
+    visited = set()
+    components = []
+    for node in graph.nodes:
+        if node.node_id not in visited:
+            component = []
+            queue = deque([node.node_id])
+            visited.add(node.node_id)
+            while queue:
+                curr = queue.popleft()
+                component.append(curr)
+                for neighbor in graph.neighbors(curr):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        queue.append(neighbor)
+            components.append(component)
+    return components
+
+
+def partition_edges(graph: Graph, components: List[List[str]]) -> List[List[Edge]]:
+    # Edges of every component (by source node), in graph edge order and aligned with components
+    component_of: Dict[str, int] = {}
+    for index, component in enumerate(components):
+        for node_id in component:
+            component_of[node_id] = index
+
+    edges: List[List[Edge]] = [[] for _ in components]
+    for edge in graph.edges:
+        index = component_of.get(edge.source)
+        if index is not None:
+            edges[index].append(edge)
+    return edges
+
+
+def get_levels(node_ids: List[str], edges: List[Edge]) -> Dict[str, int]:
+    """
+    Computes BFS depth levels for nodes inside a single connected component.
+
+    It determines the hierarchical depth (level) of each node starting from
+    the roots. This level is used to establish the horizontal column for each node.
+    If the component is cyclic, the first node in the list is used as a fallback root.
+
+    Returns:
+        dict[node_id -> level]: A mapping of node IDs to their depth level, in the
+        order the nodes were reached, followed by the nodes the traversal missed.
+    """
+    members = set(node_ids)
+
+    # Identify roots: nodes with no incoming edges within this component
+    incoming = {e.target for e in edges if e.target in members}
+    roots = [nid for nid in node_ids if nid not in incoming]
+
+    if not roots and node_ids:
+        roots = [node_ids[0]]
+
+    # Targets of every node in edge order, so the traversal visits children as before
+    children: Dict[str, List[str]] = {}
+    for e in edges:
+        children.setdefault(e.source, []).append(e.target)
+
+    levels = {}
+    visited = set(roots)
+    queue = deque((r, 0) for r in roots)
+
+    while queue:
+        curr, d = queue.popleft()
+        levels[curr] = d
+
+        for target in children.get(curr, ()):
+            if target not in visited:
+                visited.add(target)
+                queue.append((target, d + 1))
+
+    # Default level 0 for any node that escaped the traversal
+    for nid in node_ids:
+        if nid not in levels:
+            levels[nid] = 0
+    return levels
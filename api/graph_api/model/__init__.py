@@ -5,5 +5,9 @@ Core graph domain model (Node, Edge, Graph).
 from .node import Node
 from .edge import Edge
 from .graph import Graph
+from .store import GraphStore, CompactGraph
+from .view import GraphView
+from .binary import MappedGraph, open_graph, write_graph
 
-__all__ = ["Node", "Edge", "Graph"]
\ No newline at end of file
+__all__ = ["Node", "Edge", "Graph", "GraphStore", "CompactGraph", "GraphView",
+           "MappedGraph", "open_graph", "write_graph"]
@@ -0,0 +1,838 @@
+"""
+Binary graph snapshots (write_graph) and the memory-mapped read-only graph over them (open_graph).
+
+Layout, all integers little-endian:
+
+    header        magic, format version, flags, node/edge counts, ID counters,
+                  offset and length of the array table
+    array table   one entry per array: name, item format, offset, item count
+    arrays        8-byte aligned, read in place through memoryview casts
+
+The arrays hold an interned string table (offsets + UTF-8 data), the node and edge
+columns (string indexes, endpoints, weights, direction flags), CSR adjacency in both
+directions, ID lookup orders sorted by ID, and one block per attribute key (the rows
+that have it and their values, typed when every value has the same type).
+
+Opening a snapshot only reads the header and the array table. Everything else is
+decoded on access, so reopening a large graph is near-instant and the pages of the
+file are shared by every process that maps it.
+"""
+
+import datetime
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Any, Dict, List, Optional, Tuple
+
+from .node import Node
+from .edge import Edge
+from .graph import Graph
+from .store import CompactGraph, GraphStore
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, without it node_column returns None
+    np = None
+
+MAGIC = b"GRPHSNAP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQQQQQ")
+_TABLE_ENTRY = struct.Struct("<32s4sQQ")
+_ALIGNMENT = 8
+
+# Marks a missing string: a label equal to the node ID, or a numeric edge ID kept in edges.serial
+NO_STRING = 0xFFFFFFFF
+
+_FLAG_DIRECTED = 1
+
+# Attribute column kinds
+_KIND_INT = 1
+_KIND_FLOAT = 2
+_KIND_BOOL = 3
+_KIND_STRING = 4
+_KIND_TAGGED = 5
+
+# Value tags of tagged (mixed type) columns, the payload is one 8-byte slot per value
+_TAG_NONE = 0
+_TAG_BOOL = 1
+_TAG_INT = 2
+_TAG_FLOAT = 3
+_TAG_STRING = 4
+_TAG_DATE = 5
+_TAG_DATETIME = 6
+_TAG_JSON = 7
+
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+
+def _float_bits(value: float) -> int:
+    return struct.unpack("<q", struct.pack("<d", value))[0]
+
+
+def _bits_float(bits: int) -> float:
+    return struct.unpack("<d", struct.pack("<q", bits))[0]
+
+
+def _is_int64(value: Any) -> bool:
+    return type(value) is int and _INT64_MIN <= value <= _INT64_MAX
+
+
+# ==========================================================
+# WRITER
+# ==========================================================
+
+class _Strings:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def add(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.values)
+            self.values.append(value)
+        return position
+
+
+class _ColumnBuilder:
+    # Rows that have one attribute key and their values, in row order
+    def __init__(self, key: str):
+        self.key = key
+        self.rows = array("I")
+        self.values: List[Any] = []
+
+    def kind(self) -> int:
+        types = {type(value) for value in self.values}
+        if types == {bool}:
+            return _KIND_BOOL
+        if types == {int} and all(_INT64_MIN <= value <= _INT64_MAX for value in self.values):
+            return _KIND_INT
+        if types == {float}:
+            return _KIND_FLOAT
+        if types == {str}:
+            return _KIND_STRING
+        return _KIND_TAGGED
+
+
+class _Attributes:
+    # Columnar attribute blocks of one element kind, with shared key tables
+    def __init__(self, prefix: str, strings: _Strings):
+        self.prefix = prefix
+        self.strings = strings
+        self.columns: List[_ColumnBuilder] = []
+        self.column_index: Dict[str, int] = {}
+        self.key_tables: Dict[Tuple, int] = {(): 0}
+        self.row_keys = array("I")
+
+    def add(self, row: int, attributes: dict) -> None:
+        if not attributes:
+            self.row_keys.append(0)
+            return
+
+        keys = tuple(attributes)
+        table = self.key_tables.get(keys)
+        if table is None:
+            for key in keys:
+                if not isinstance(key, str):
+                    raise ValueError(f"Attribute key {key!r} is not a string.")
+            table = self.key_tables[keys] = len(self.key_tables)
+        self.row_keys.append(table)
+
+        for key, value in attributes.items():
+            column = self.column_index.get(key)
+            if column is None:
+                column = self.column_index[key] = len(self.columns)
+                self.columns.append(_ColumnBuilder(key))
+            builder = self.columns[column]
+            builder.rows.append(row)
+            builder.values.append(value)
+
+    def _tagged(self, value: Any) -> Tuple[int, int]:
+        if value is None:
+            return _TAG_NONE, 0
+        if isinstance(value, bool):
+            return _TAG_BOOL, int(value)
+        if _is_int64(value):
+            return _TAG_INT, value
+        if isinstance(value, float):
+            return _TAG_FLOAT, _float_bits(value)
+        if isinstance(value, str):
+            return _TAG_STRING, self.strings.add(value)
+        if isinstance(value, datetime.datetime):
+            return _TAG_DATETIME, self.strings.add(value.isoformat())
+        if isinstance(value, datetime.date):
+            return _TAG_DATE, value.toordinal()
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Attribute value {value!r} cannot be stored in a graph snapshot.")
+        return _TAG_JSON, self.strings.add(encoded)
+
+    def arrays(self, row_count: int) -> Dict[str, array]:
+        result: Dict[str, array] = {}
+
+        offsets = array("I", [0])
+        members = array("I")
+        for keys in self.key_tables:
+            members.extend(self.column_index[key] for key in keys)
+            offsets.append(len(members))
+        result[f"{self.prefix}.keytables.offsets"] = offsets
+        result[f"{self.prefix}.keytables.columns"] = members
+        result[f"{self.prefix}.keys"] = self.row_keys
+
+        # Per column: key string, kind, 1 when every row has the key (no rows array)
+        directory = array("I")
+        for position, column in enumerate(self.columns):
+            kind = column.kind()
+            dense = len(column.rows) == row_count
+            directory.extend((self.strings.add(column.key), kind, 1 if dense else 0))
+
+            name = f"{self.prefix}.col{position}"
+            if not dense:
+                result[f"{name}.rows"] = column.rows
+            if kind == _KIND_INT:
+                result[f"{name}.values"] = array("q", column.values)
+            elif kind == _KIND_FLOAT:
+                result[f"{name}.values"] = array("d", column.values)
+            elif kind == _KIND_BOOL:
+                result[f"{name}.values"] = array("B", column.values)
+            elif kind == _KIND_STRING:
+                result[f"{name}.values"] = array("I", map(self.strings.add, column.values))
+            else:
+                tags = array("B")
+                payload = array("q")
+                for value in column.values:
+                    tag, bits = self._tagged(value)
+                    tags.append(tag)
+                    payload.append(bits)
+                result[f"{name}.tags"] = tags
+                result[f"{name}.values"] = payload
+        result[f"{self.prefix}.columns"] = directory
+        return result
+
+
+def _csr(endpoints: array, node_count: int) -> Tuple[array, array]:
+    # Edge rows grouped by endpoint (counting sort), keeping edge order inside a group
+    offsets = array("Q", bytes(8 * (node_count + 1)))
+    for node in endpoints:
+        offsets[node + 1] += 1
+    for node in range(node_count):
+        offsets[node + 1] += offsets[node]
+
+    cursor = array("Q", offsets[:-1])
+    rows = array("I", bytes(4 * len(endpoints)))
+    for row, node in enumerate(endpoints):
+        rows[cursor[node]] = row
+        cursor[node] += 1
+    return offsets, rows
+
+
+def write_graph(graph: Graph, path) -> None:
+    """
+    Writes a graph to a binary snapshot file that open_graph can map.
+
+    Attribute keys must be strings. Values can be None, bool, int, float, str, date,
+    datetime or anything json.dumps accepts (lists and dicts come back from JSON).
+    """
+    strings = _Strings()
+    node_attributes = _Attributes("nodes", strings)
+    edge_attributes = _Attributes("edges", strings)
+
+    node_ids = array("I")
+    node_labels = array("I")
+    node_rows: Dict[str, int] = {}
+    for row, node in enumerate(graph.nodes):
+        node_id = node.node_id
+        node_rows.setdefault(node_id, row)
+        node_ids.append(strings.add(node_id))
+        label = node.label
+        node_labels.append(NO_STRING if not label or label == node_id else strings.add(label))
+        node_attributes.add(row, node.attributes)
+    node_count = len(node_ids)
+
+    edge_ids = array("I")
+    edge_serials = array("q")
+    sources = array("I")
+    targets = array("I")
+    weights = array("d")
+    directed = array("B")
+    for row, edge in enumerate(graph.edges):
+        edge_id = edge.edge_id
+        if edge_id.isascii() and edge_id.isdigit() and edge_id == str(int(edge_id)) and int(edge_id) <= _INT64_MAX:
+            edge_ids.append(NO_STRING)
+            edge_serials.append(int(edge_id))
+        else:
+            edge_ids.append(strings.add(edge_id))
+            edge_serials.append(0)
+        sources.append(node_rows[edge.source])
+        targets.append(node_rows[edge.target])
+        weights.append(edge.weight)
+        directed.append(1 if edge.directed else 0)
+        edge_attributes.add(row, edge.attributes)
+    edge_count = len(edge_ids)
+
+    def edge_key(row: int) -> str:
+        return strings.values[edge_ids[row]] if edge_ids[row] != NO_STRING else str(edge_serials[row])
+
+    arrays: Dict[str, array] = {
+        "nodes.id": node_ids,
+        "nodes.label": node_labels,
+        "nodes.by_id": array("I", sorted(range(node_count), key=lambda row: strings.values[node_ids[row]])),
+        "edges.id": edge_ids,
+        "edges.serial": edge_serials,
+        "edges.source": sources,
+        "edges.target": targets,
+        "edges.weight": weights,
+        "edges.directed": directed,
+        "edges.by_id": array("I", sorted(range(edge_count), key=edge_key)),
+    }
+    arrays["out.offsets"], arrays["out.edges"] = _csr(sources, node_count)
+    arrays["in.offsets"], arrays["in.edges"] = _csr(targets, node_count)
+    arrays.update(node_attributes.arrays(node_count))
+    arrays.update(edge_attributes.arrays(edge_count))
+
+    # The string table goes last, attribute blocks above may still add strings
+    encoded = [value.encode("utf-8") for value in strings.values]
+    string_offsets = array("Q", [0])
+    total = 0
+    for item in encoded:
+        total += len(item)
+        string_offsets.append(total)
+    arrays["strings.offsets"] = string_offsets
+    arrays["strings.data"] = array("B", b"".join(encoded))
+
+    _write_arrays(path, graph, node_count, edge_count, arrays)
+
+
+def _write_arrays(path, graph: Graph, node_count: int, edge_count: int, arrays: Dict[str, array]) -> None:
+    table_offset = _HEADER.size
+    position = table_offset + _TABLE_ENTRY.size * len(arrays)
+
+    entries = []
+    for name, values in arrays.items():
+        position += -position % _ALIGNMENT
+        entries.append((name, values, position))
+        position += len(values) * values.itemsize
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, _FLAG_DIRECTED if graph.directed else 0, node_count, edge_count,
+        graph._node_counter, graph._edge_counter, table_offset, len(arrays),
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        for name, values, offset in entries:
+            f.write(_TABLE_ENTRY.pack(name.encode("ascii"), values.typecode.encode("ascii"), offset, len(values)))
+        for name, values, offset in entries:
+            f.write(bytes(offset - f.tell()))
+            if sys.byteorder != "little" and values.itemsize > 1:
+                values = array(values.typecode, values)
+                values.byteswap()
+            values.tofile(f)
+
+
+# ==========================================================
+# READER
+# ==========================================================
+
+class MappedNode(Node):
+    """Read-only Node view over one row of a MappedGraph."""
+
+    __slots__ = ("_graph", "_row")
+
+    def __init__(self, graph: "MappedGraph", row: int):
+        self._graph = graph
+        self._row = row
+
+    @property
+    def node_id(self) -> str:
+        return self._graph._string(self._graph._arrays["nodes.id"][self._row])
+
+    @property
+    def label(self) -> str:
+        label = self._graph._arrays["nodes.label"][self._row]
+        return self.node_id if label == NO_STRING else self._graph._string(label)
+
+    @property
+    def attributes(self) -> dict:
+        return self._graph._node_attributes.row(self._row)
+
+    def __eq__(self, other):
+        if isinstance(other, MappedNode):
+            return self._graph is other._graph and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._graph), self._row))
+
+    def __reduce__(self):
+        return type(self), (self._graph, self._row)
+
+
+class MappedEdge(Edge):
+    """Read-only Edge view over one row of a MappedGraph."""
+
+    __slots__ = ("_graph", "_row")
+
+    def __init__(self, graph: "MappedGraph", row: int):
+        self._graph = graph
+        self._row = row
+
+    @property
+    def edge_id(self) -> str:
+        return self._graph._edge_id(self._row)
+
+    @property
+    def source(self) -> str:
+        return self._graph._node_id(self._graph._arrays["edges.source"][self._row])
+
+    @property
+    def target(self) -> str:
+        return self._graph._node_id(self._graph._arrays["edges.target"][self._row])
+
+    @property
+    def weight(self) -> float:
+        return self._graph._arrays["edges.weight"][self._row]
+
+    @property
+    def directed(self) -> bool:
+        return bool(self._graph._arrays["edges.directed"][self._row])
+
+    @property
+    def attributes(self) -> dict:
+        return self._graph._edge_attributes.row(self._row)
+
+    def __eq__(self, other):
+        if isinstance(other, MappedEdge):
+            return self._graph is other._graph and self._row == other._row
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._graph), self._row))
+
+    def __reduce__(self):
+        return type(self), (self._graph, self._row)
+
+
+class _MappedSequence(Sequence):
+    # Read-only list-like access to the rows of a MappedGraph, views are built on demand
+
+    def __init__(self, graph: "MappedGraph", view_cls: type, count: int):
+        self._graph = graph
+        self._view_cls = view_cls
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view_cls(self._graph, i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("graph element index out of range")
+        return self._view_cls(self._graph, index)
+
+    def __iter__(self):
+        graph, view_cls = self._graph, self._view_cls
+        for i in range(self._count):
+            yield view_cls(graph, i)
+
+    def __repr__(self) -> str:
+        return f"<{self._view_cls.__name__} sequence of {self._count}>"
+
+
+class _MappedAttributes:
+    # Decodes the attribute blocks of one element kind
+
+    def __init__(self, graph: "MappedGraph", prefix: str):
+        self._graph = graph
+        arrays = graph._arrays
+        self._row_keys = arrays[f"{prefix}.keys"]
+        self._table_offsets = arrays[f"{prefix}.keytables.offsets"]
+        self._table_columns = arrays[f"{prefix}.keytables.columns"]
+
+        directory = arrays[f"{prefix}.columns"]
+        self.columns = []
+        for position in range(len(directory) // 3):
+            key, kind, dense = directory[3 * position:3 * position + 3]
+            name = f"{prefix}.col{position}"
+            self.columns.append((
+                graph._string(key),
+                kind,
+                None if dense else arrays[f"{name}.rows"],
+                arrays[f"{name}.values"],
+                arrays.get(f"{name}.tags"),
+            ))
+
+    def row(self, row: int) -> dict:
+        table = self._row_keys[row]
+        start, stop = self._table_offsets[table], self._table_offsets[table + 1]
+        attributes = {}
+        for column in self._table_columns[start:stop]:
+            key, kind, rows, values, tags = self.columns[column]
+            position = row if rows is None else bisect_left(rows, row)
+            attributes[key] = self._value(kind, values, tags, position)
+        return attributes
+
+    def _value(self, kind: int, values, tags, position: int) -> Any:
+        value = values[position]
+        if kind == _KIND_INT or kind == _KIND_FLOAT:
+            return value
+        if kind == _KIND_BOOL:
+            return bool(value)
+        if kind == _KIND_STRING:
+            return self._graph._string(value)
+
+        tag = tags[position]
+        if tag == _TAG_NONE:
+            return None
+        if tag == _TAG_BOOL:
+            return bool(value)
+        if tag == _TAG_INT:
+            return value
+        if tag == _TAG_FLOAT:
+            return _bits_float(value)
+        if tag == _TAG_STRING:
+            return self._graph._string(value)
+        if tag == _TAG_DATE:
+            return datetime.date.fromordinal(value)
+        if tag == _TAG_DATETIME:
+            return datetime.datetime.fromisoformat(self._graph._string(value))
+        return json.loads(self._graph._string(value))
+
+    def dense_column(self, key: str) -> Optional[Tuple[int, Any]]:
+        # (kind, values) of a numeric column every row has, used for typed node columns
+        for column_key, kind, rows, values, _ in self.columns:
+            if column_key == key:
+                if rows is None and kind in (_KIND_INT, _KIND_FLOAT):
+                    return kind, values
+                return None
+        return None
+
+    def column_values(self, column: int, strings: List[str]) -> list:
+        # Every value of one column in row order, strings is the decoded string table
+        _, kind, _, values, tags = self.columns[column]
+        if kind == _KIND_INT or kind == _KIND_FLOAT:
+            return values.tolist()
+        if kind == _KIND_BOOL:
+            return [bool(value) for value in values]
+        if kind == _KIND_STRING:
+            return [strings[value] for value in values]
+        return [self._value(kind, values, tags, position) for position in range(len(values))]
+
+    def key_tables(self) -> List[Tuple[str, ...]]:
+        offsets, members = self._table_offsets, self._table_columns
+        return [
+            tuple(self.columns[column][0] for column in members[offsets[table]:offsets[table + 1]])
+            for table in range(len(offsets) - 1)
+        ]
+
+    def row_values(self, strings: List[str]) -> List[tuple]:
+        # Attribute value tuples of every row, decoded a column at a time. The rows of a
+        # column are in ascending order, so one cursor per column finds each row's value.
+        decoded = [self.column_values(column, strings) for column in range(len(self.columns))]
+        cursors = [0] * len(self.columns)
+        offsets, members = self._table_offsets, self._table_columns
+        tables = [tuple(members[offsets[table]:offsets[table + 1]]) for table in range(len(offsets) - 1)]
+
+        rows = []
+        for table in self._row_keys:
+            values = []
+            for column in tables[table]:
+                values.append(decoded[column][cursors[column]])
+                cursors[column] += 1
+            rows.append(tuple(values))
+        return rows
+
+
+class MappedGraph(Graph):
+    """
+    Read-only graph over a memory-mapped snapshot written by write_graph.
+
+    Nodes and edges are MappedNode/MappedEdge views decoded from the file on access.
+    Lookups by ID binary search the sorted ID orders, adjacency comes from the CSR
+    arrays, so nothing is built when the file is opened. Dense numeric node attributes
+    are available as zero-copy NumPy columns. Any change raises ValueError: wrap the
+    graph in a GraphView, or materialize it with to_graph(), to edit it.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+
+        buffer = memoryview(self._mmap)
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"'{self.path}' is not a graph snapshot.")
+        (magic, version, flags, node_count, edge_count, node_counter, edge_counter,
+         table_offset, table_count) = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"'{self.path}' is not a graph snapshot.")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot version {version} in '{self.path}'.")
+
+        self.directed = bool(flags & _FLAG_DIRECTED)
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self._node_counter = node_counter
+        self._edge_counter = edge_counter
+        self._node_columns: Dict[str, Any] = {}
+
+        self._arrays: Dict[str, Any] = {}
+        for entry in range(table_count):
+            name, typecode, offset, count = _TABLE_ENTRY.unpack_from(buffer, table_offset + entry * _TABLE_ENTRY.size)
+            typecode = typecode.rstrip(b"\0").decode("ascii")
+            size = count * array(typecode).itemsize
+            view = buffer[offset:offset + size].cast(typecode)
+            if sys.byteorder != "little" and view.itemsize > 1:
+                view = array(typecode, view)
+                view.byteswap()
+            self._arrays[name.rstrip(b"\0").decode("ascii")] = view
+
+        self._string_offsets = self._arrays["strings.offsets"]
+        self._string_data = self._arrays["strings.data"]
+        self._node_attributes = _MappedAttributes(self, "nodes")
+        self._edge_attributes = _MappedAttributes(self, "edges")
+
+    def close(self) -> None:
+        # Views and arrays taken from the graph must not be used after this
+        self._arrays = {}
+        self._string_data = self._string_offsets = None
+        self._node_attributes = self._edge_attributes = None
+        self._node_columns = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Still exported to a NumPy column somewhere, the mapping goes with it
+            pass
+        self._file.close()
+
+    def __enter__(self) -> "MappedGraph":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __reduce__(self):
+        # Pickled as a reference to the file, every process maps the same pages
+        return type(self), (self.path,)
+
+    # -----------------
+    # DECODING
+    # -----------------
+
+    def _string(self, index: int) -> str:
+        return str(self._string_data[self._string_offsets[index]:self._string_offsets[index + 1]], "utf-8")
+
+    def _node_id(self, row: int) -> str:
+        return self._string(self._arrays["nodes.id"][row])
+
+    def _edge_id(self, row: int) -> str:
+        index = self._arrays["edges.id"][row]
+        return str(self._arrays["edges.serial"][row]) if index == NO_STRING else self._string(index)
+
+    def _node_row(self, node_id: str) -> Optional[int]:
+        by_id = self._arrays["nodes.by_id"]
+        position = bisect_left(by_id, node_id, key=self._node_id)
+        if position < len(by_id) and self._node_id(by_id[position]) == node_id:
+            return by_id[position]
+        return None
+
+    def _edge_row(self, edge_id: str) -> Optional[int]:
+        by_id = self._arrays["edges.by_id"]
+        position = bisect_left(by_id, edge_id, key=self._edge_id)
+        if position < len(by_id) and self._edge_id(by_id[position]) == edge_id:
+            return by_id[position]
+        return None
+
+    def _rows(self, direction: str, node_row: int) -> memoryview:
+        offsets = self._arrays[f"{direction}.offsets"]
+        return self._arrays[f"{direction}.edges"][offsets[node_row]:offsets[node_row + 1]]
+
+    # -----------------
+    # GRAPH INTERFACE
+    # -----------------
+
+    @property
+    def nodes(self) -> Sequence:
+        return _MappedSequence(self, MappedNode, self.node_count)
+
+    @nodes.setter
+    def nodes(self, nodes) -> None:
+        self._read_only()
+
+    @property
+    def edges(self) -> Sequence:
+        return _MappedSequence(self, MappedEdge, self.edge_count)
+
+    @edges.setter
+    def edges(self, edges) -> None:
+        self._read_only()
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        row = self._node_row(node_id)
+        return None if row is None else MappedNode(self, row)
+
+    def has_node(self, node_id: str) -> bool:
+        return self._node_row(node_id) is not None
+
+    def get_edge(self, edge_id: str) -> Optional[Edge]:
+        row = self._edge_row(edge_id)
+        return None if row is None else MappedEdge(self, row)
+
+    def _edge_position(self, edge: Edge) -> int:
+        return edge._row
+
+    def node_position(self, node_id: str) -> int:
+        row = self._node_row(node_id)
+        if row is None:
+            raise ValueError(f"Node '{node_id}' does not exist.")
+        return row
+
+    def edge_position(self, edge_id: str) -> int:
+        row = self._edge_row(edge_id)
+        if row is None:
+            raise ValueError(f"Edge '{edge_id}' does not exist.")
+        return row
+
+    def out_edges(self, node_id: str) -> List[Edge]:
+        row = self._node_row(node_id)
+        if row is None:
+            return []
+        return [MappedEdge(self, edge_row) for edge_row in self._rows("out", row)]
+
+    def in_edges(self, node_id: str) -> List[Edge]:
+        row = self._node_row(node_id)
+        if row is None:
+            return []
+        return [MappedEdge(self, edge_row) for edge_row in self._rows("in", row)]
+
+    def neighbors(self, node_id: str) -> List[str]:
+        row = self._node_row(node_id)
+        if row is None:
+            return []
+
+        sources, targets = self._arrays["edges.source"], self._arrays["edges.target"]
+        neighbors = {}
+        for edge_row in sorted(list(self._rows("out", row)) + list(self._rows("in", row))):
+            other = targets[edge_row] if sources[edge_row] == row else sources[edge_row]
+            neighbors.setdefault(self._node_id(other), None)
+        return list(neighbors)
+
+    def degree(self, node_id: str) -> int:
+        row = self._node_row(node_id)
+        if row is None:
+            return 0
+        return len(self._rows("out", row)) + len(self._rows("in", row))
+
+    def node_column(self, key: str) -> Optional[Any]:
+        column = self._node_columns.get(key)
+        if column is not None or np is None:
+            return column
+
+        dense = self._node_attributes.dense_column(key)
+        if dense is None:
+            return None
+        kind, values = dense
+        column = np.frombuffer(values, dtype="<i8" if kind == _KIND_INT else "<f8")
+        self._node_columns[key] = column
+        return column
+
+    def to_graph(self) -> Graph:
+        # Materialize a regular, editable Graph with plain Node/Edge objects
+        graph = Graph(directed=self.directed)
+        graph.add_nodes_bulk(
+            Node(node_id=node.node_id, label=node.label, attributes=node.attributes) for node in self.nodes
+        )
+        graph.add_edges_bulk(
+            Edge(
+                source=edge.source,
+                target=edge.target,
+                edge_id=edge.edge_id,
+                weight=edge.weight,
+                directed=edge.directed,
+                attributes=edge.attributes,
+            )
+            for edge in self.edges
+        )
+        graph._node_counter = self._node_counter
+        graph._edge_counter = self._edge_counter
+        return graph
+
+    def _decode_strings(self) -> List[str]:
+        offsets = self._string_offsets
+        data = bytes(self._string_data)
+        if data.isascii():
+            # Byte offsets are character offsets, one decode for the whole table
+            text = data.decode("ascii")
+            return [sys.intern(text[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+        return [sys.intern(data[offsets[i]:offsets[i + 1]].decode("utf-8")) for i in range(len(offsets) - 1)]
+
+    def to_compact_graph(self) -> CompactGraph:
+        """
+        Copies the snapshot into an editable CompactGraph.
+
+        The store columns are filled directly from the arrays of the file, one column
+        at a time, without building Node/Edge objects or validating them again.
+        Dense numeric node attributes become typed node columns when NumPy is available.
+        """
+        strings = self._decode_strings()
+        arrays = self._arrays
+        store = GraphStore(directed=self.directed)
+
+        node_tables = [store._key_table(keys) for keys in self._node_attributes.key_tables()]
+        edge_tables = [store._key_table(keys) for keys in self._edge_attributes.key_tables()]
+
+        store.node_ids = [strings[index] for index in arrays["nodes.id"]]
+        store.node_labels = [None if index == NO_STRING else strings[index] for index in arrays["nodes.label"]]
+        store.node_keys = array("I", [node_tables[table] for table in arrays["nodes.keys"]])
+        store.node_values = self._node_attributes.row_values(strings)
+        store.node_index = dict(zip(store.node_ids, range(self.node_count)))
+
+        store.edge_ids = [None if index == NO_STRING else strings[index] for index in arrays["edges.id"]]
+        store.edge_serials = array("q", arrays["edges.serial"])
+        store.edge_sources = array("q", arrays["edges.source"])
+        store.edge_targets = array("q", arrays["edges.target"])
+        store.edge_weights = array("d", arrays["edges.weight"])
+        store.edge_directed = array("b", arrays["edges.directed"])
+        store.edge_keys = array("I", [edge_tables[table] for table in arrays["edges.keys"]])
+        store.edge_values = self._edge_attributes.row_values(strings)
+
+        graph = CompactGraph(directed=self.directed, store=store)
+        graph._node_counter = self._node_counter
+        graph._edge_counter = self._edge_counter
+
+        if np is not None:
+            for key, *_ in self._node_attributes.columns:
+                dense = self._node_attributes.dense_column(key)
+                if dense is not None:
+                    kind, values = dense
+                    graph.set_node_column(key, np.array(values, dtype=np.int64 if kind == _KIND_INT else np.float64))
+        return graph
+
+    # -----------------
+    # CHANGES
+    # -----------------
+
+    def _read_only(self, *args, **kwargs):
+        raise ValueError(f"Graph snapshot '{self.path}' is read-only.")
+
+    add_node = remove_node = add_edge = remove_edge = _read_only
+    add_nodes_bulk = add_edges_bulk = _read_only
+    mutable_node = mutable_edge = _read_only
+
+
+def open_graph(path) -> MappedGraph:
+    # Maps a snapshot written by write_graph, see MappedGraph
+    return MappedGraph(path)
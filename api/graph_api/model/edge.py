@@ -1,4 +1,7 @@
 class Edge:
+    # Fixed slots instead of a per-instance __dict__ keep large graphs small
+    __slots__ = ("edge_id", "source", "target", "weight", "directed", "attributes")
+
     def __init__(self, source: str, target: str, 
                 edge_id: str = None,
                 weight: float = 1.0,
@@ -1,56 +1,480 @@
-from typing import List
+from typing import Any, Container, Dict, Iterable, List
 from .node import Node
 from .edge import Edge
-from typing import Optional
+from typing import Optional, Tuple
+
+# Bulk validation errors beyond this count are summarized instead of listed
+MAX_REPORTED_ERRORS = 20
+
+
+def _batch_error(kind: str, errors: List[str]) -> ValueError:
+    shown = "; ".join(errors[:MAX_REPORTED_ERRORS])
+    if len(errors) > MAX_REPORTED_ERRORS:
+        shown += f"; ... and {len(errors) - MAX_REPORTED_ERRORS} more"
+    return ValueError(f"Invalid {kind} batch, {len(errors)} error(s): {shown}")
+
+
+def _batch_ids(ids: Iterable[Optional[str]], counter: int) -> Tuple[List[str], int]:
+    # The IDs a batch will get: explicit IDs as they are, the next counter values for the
+    # rest. Returns them with the new counter, so nothing is assigned before validation.
+    batch_ids = []
+    for element_id in ids:
+        if not element_id:
+            counter += 1
+            element_id = str(counter)
+        batch_ids.append(element_id)
+    return batch_ids, counter
+
+
+def _duplicate_errors(kind: str, ids: List[str], existing_ids: Container[str]) -> List[str]:
+    # Collects every duplicate ID in the batch, against the graph and within the batch itself
+    errors = []
+    seen = set()
+    for element_id in ids:
+        if element_id in seen or element_id in existing_ids:
+            errors.append(f"{kind} '{element_id}' already exists.")
+        seen.add(element_id)
+    return errors
+
+
+def _node_batch_errors(node_ids: List[str], existing_ids: Container[str]) -> List[str]:
+    return _duplicate_errors("Node", node_ids, existing_ids)
+
+
+def _edge_batch_errors(
+    edges: List[Edge], edge_ids: List[str], node_ids: Container[str], existing_ids: Container[str]
+) -> List[str]:
+    # Endpoints are checked with one set difference per side instead of a lookup per edge.
+    # edge_ids are the IDs the edges will get, generated ones included.
+    errors = []
+
+    sources = {e.source for e in edges}
+    targets = {e.target for e in edges}
+    for node_id in sorted(sources.difference(node_ids), key=str):
+        errors.append(f"Source node '{node_id}' does not exist.")
+    for node_id in sorted(targets.difference(node_ids), key=str):
+        errors.append(f"Target node '{node_id}' does not exist.")
+
+    errors.extend(_duplicate_errors("Edge", edge_ids, existing_ids))
+    return errors
+
+
+class _HoleCounter:
+    """
+    Counts the holes before a position of a backing list in O(log n) (a Fenwick tree).
+
+    Slots are 1-based internally. grow() adds empty slots for appended elements.
+    """
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, holes: Iterable[bool]):
+        tree = [0]
+        tree.extend(1 if hole else 0 for hole in holes)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def grow(self, size: int) -> None:
+        # A new slot i sums the (empty) slots (i - lowbit(i), i], all of which already exist
+        tree = self._tree
+        while len(tree) <= size:
+            i = len(tree)
+            tree.append(self.before(i - 1) - self.before(i - (i & -i)))
+
+    def add(self, position: int) -> None:
+        tree = self._tree
+        i = position + 1
+        while i < len(tree):
+            tree[i] += 1
+            i += i & -i
+
+    def before(self, position: int) -> int:
+        # Number of holes at positions < position
+        tree = self._tree
+        total = 0
+        i = position
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+
+class _ElementList:
+    """
+    Ordered nodes or edges with O(1) removal by position.
+
+    A removed element leaves a hole (None) in the backing list, so the positions of the
+    other elements stay valid and no shifting or searching happens. The hole-free list
+    handed out by view() is rebuilt when it is asked for after a removal, and the backing
+    list is compacted once half of it is holes. index() gives the position of an element
+    in view() from its backing position and a count of the holes before it.
+    """
+
+    __slots__ = ("_items", "_positions", "_holes", "_view", "_hole_counter")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        self._items: List[Any] = list(items)
+        # id(element) -> position in _items, built on the first removal
+        self._positions: Optional[Dict[int, int]] = None
+        self._holes = 0
+        self._view: Optional[List[Any]] = None
+        # Built on the first index() call and kept up to date after that
+        self._hole_counter: Optional[_HoleCounter] = None
+
+    def __len__(self) -> int:
+        return len(self._items) - self._holes
+
+    def __reduce__(self):
+        # Positions are keyed by object identity, which does not survive pickling
+        return _ElementList, (self.view(),)
+
+    def view(self) -> List[Any]:
+        if self._view is None:
+            self._view = [item for item in self._items if item is not None] if self._holes else self._items
+        return self._view
+
+    def append(self, item: Any) -> None:
+        if self._positions is not None:
+            self._positions[id(item)] = len(self._items)
+        self._items.append(item)
+        if self._view is not None and self._view is not self._items:
+            self._view.append(item)
+        if self._hole_counter is not None:
+            self._hole_counter.grow(len(self._items))
+
+    def extend(self, items: List[Any]) -> None:
+        if self._positions is not None:
+            start = len(self._items)
+            for offset, item in enumerate(items):
+                self._positions[id(item)] = start + offset
+        self._items.extend(items)
+        if self._view is not None and self._view is not self._items:
+            self._view.extend(items)
+        if self._hole_counter is not None:
+            self._hole_counter.grow(len(self._items))
+
+    def remove(self, item: Any) -> None:
+        position = self._position(item)
+        if self._view is self._items:
+            # The list was handed out without holes, keep it that way
+            self._items = list(self._items)
+        self._view = None
+        del self._positions[id(item)]
+        self._items[position] = None
+        self._holes += 1
+        if self._hole_counter is not None:
+            self._hole_counter.add(position)
+        if self._holes * 2 > len(self._items):
+            self._items = [element for element in self._items if element is not None]
+            self._positions = None
+            self._holes = 0
+            self._hole_counter = None
+
+    def index(self, item: Any) -> int:
+        position = self._position(item)
+        if not self._holes:
+            return position
+        if self._hole_counter is None:
+            self._hole_counter = _HoleCounter(element is None for element in self._items)
+        return position - self._hole_counter.before(position)
+
+    def replace(self, old: Any, new: Any) -> None:
+        # Puts new in the place of old, lists handed out see the change like before
+        position = self._position(old)
+        self._items[position] = new
+        if self._view is not None and self._view is not self._items:
+            self._view = None
+        del self._positions[id(old)]
+        self._positions[id(new)] = position
+
+    def _position(self, item: Any) -> int:
+        if self._positions is None:
+            self._positions = {id(element): i for i, element in enumerate(self._items) if element is not None}
+        return self._positions[id(item)]
 
 
 class Graph:
     def __init__(self, directed: bool = True):
         self.directed = directed
-        self.nodes: List[Node] = []
-        self.edges: List[Edge] = []
+        self._nodes = _ElementList()
+        self._edges = _ElementList()
+        self._reindex()
         self._edge_counter = 0
         self._node_counter = 0
 
+    # -----------------
+    # INDEXES
+    # -----------------
+
+    # The ordered lists stay the public API, the dictionaries next to them
+    # give O(1) lookups by ID and O(degree) access to the edges of a node.
+    # Assigning a new list (e.g. graph.nodes = [...]) rebuilds every index. The lists
+    # must not be changed in place, removals only update the list handed out next.
+
+    @property
+    def nodes(self) -> List[Node]:
+        return self._nodes.view()
+
+    @nodes.setter
+    def nodes(self, nodes: List[Node]) -> None:
+        self._nodes = _ElementList(nodes)
+        self._reindex()
+
+    @property
+    def edges(self) -> List[Edge]:
+        return self._edges.view()
+
+    @edges.setter
+    def edges(self, edges: List[Edge]) -> None:
+        self._edges = _ElementList(edges)
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._nodes_by_id: Dict[str, Node] = {}
+        self._edges_by_id: Dict[str, Edge] = {}
+        self._out_edges: Dict[str, List[Edge]] = {}
+        self._in_edges: Dict[str, List[Edge]] = {}
+        # neighbor id -> number of edges between the two nodes (either direction),
+        # the count lets us drop a neighbor only when its last edge is removed
+        self._neighbors: Dict[str, Dict[str, int]] = {}
+        self._node_columns: Dict[str, Any] = {}
+
+        for node in self._nodes.view():
+            self._index_node(node)
+        for edge in self._edges.view():
+            self._edges_by_id.setdefault(edge.edge_id, edge)
+            self._index_edge(edge)
+
+    def _index_node(self, node: Node) -> None:
+        if node.node_id in self._nodes_by_id:
+            return
+        self._nodes_by_id[node.node_id] = node
+        self._out_edges[node.node_id] = []
+        self._in_edges[node.node_id] = []
+        self._neighbors[node.node_id] = {}
+
+    def _index_edge(self, edge: Edge) -> None:
+        self._out_edges.setdefault(edge.source, []).append(edge)
+        self._in_edges.setdefault(edge.target, []).append(edge)
+
+        source_neighbors = self._neighbors.setdefault(edge.source, {})
+        source_neighbors[edge.target] = source_neighbors.get(edge.target, 0) + 1
+        if edge.source != edge.target:
+            target_neighbors = self._neighbors.setdefault(edge.target, {})
+            target_neighbors[edge.source] = target_neighbors.get(edge.source, 0) + 1
+
+    def _unindex_edge(self, edge: Edge) -> None:
+        # The edge lists of a node being removed are already gone
+        out_edges = self._out_edges.get(edge.source)
+        if out_edges is not None:
+            out_edges.remove(edge)
+        in_edges = self._in_edges.get(edge.target)
+        if in_edges is not None:
+            in_edges.remove(edge)
+
+        for node_id, other_id in ((edge.source, edge.target), (edge.target, edge.source)):
+            counts = self._neighbors[node_id]
+            counts[other_id] -= 1
+            if counts[other_id] <= 0:
+                del counts[other_id]
+            if edge.source == edge.target:
+                break
+
     # -----------------
     # NODE OPERATIONS
     # -----------------
 
     def add_node(self, node: Node):
-        if node.node_id and any(n.node_id == node.node_id for n in self.nodes):
-            raise ValueError(f"Node '{node.node_id}' already exists.")
+        (node_id,), counter = _batch_ids([node.node_id], self._node_counter)
+        if node_id in self._nodes_by_id:
+            raise ValueError(f"Node '{node_id}' already exists.")
 
         if not node.node_id:
-            self._node_counter += 1
-            node.node_id = str(self._node_counter)
-
-        self.nodes.append(node)
+            node.node_id = node_id
+        self._node_counter = counter
+        self._nodes.append(node)
+        self._index_node(node)
+        self._node_columns.clear()
 
     def get_node(self, node_id: str) -> Optional[Node]:
-        for node in self.nodes:
-            if node.node_id == node_id:
-                return node
-        return None
+        return self._nodes_by_id.get(node_id)
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self._nodes_by_id
+
+    def remove_node(self, node_id: str) -> Node:
+        # Removes the node together with every edge attached to it
+        node = self._nodes_by_id.get(node_id)
+        if node is None:
+            raise ValueError(f"Node '{node_id}' does not exist.")
+
+        attached = self._out_edges.pop(node_id) + self._in_edges.pop(node_id)
+        for edge in dict.fromkeys(attached):
+            self._drop_edge(edge)
+
+        self._nodes.remove(node)
+        del self._nodes_by_id[node_id]
+        del self._neighbors[node_id]
+        self._node_columns.clear()
+        return node
+
+    # -----------------
+    # ADJACENCY
+    # -----------------
+
+    def out_edges(self, node_id: str) -> List[Edge]:
+        return list(self._out_edges.get(node_id, ()))
+
+    def in_edges(self, node_id: str) -> List[Edge]:
+        return list(self._in_edges.get(node_id, ()))
+
+    def neighbors(self, node_id: str) -> List[str]:
+        # Adjacent node IDs ignoring edge direction, in the order they were first connected
+        return list(self._neighbors.get(node_id, ()))
+
+    def degree(self, node_id: str) -> int:
+        return len(self._out_edges.get(node_id, ())) + len(self._in_edges.get(node_id, ()))
+
+    # -----------------
+    # ATTRIBUTE COLUMNS
+    # -----------------
+
+    # Optional typed arrays (e.g. from NumPy) holding one node attribute for every node,
+    # in node order, so filters can compare whole columns at once. They are only valid
+    # while the node list stays the same: adding or removing nodes drops all of them,
+    # and code that edits node attributes must call drop_node_columns for those keys.
+
+    def node_column(self, key: str) -> Optional[Any]:
+        return self._node_columns.get(key)
+
+    def set_node_column(self, key: str, column: Any) -> None:
+        if len(column) != len(self.nodes):
+            raise ValueError(f"Column '{key}' has {len(column)} values for {len(self.nodes)} nodes.")
+        self._node_columns[key] = column
+
+    def drop_node_columns(self, keys: Optional[Iterable[str]] = None) -> None:
+        if keys is None:
+            self._node_columns.clear()
+            return
+        for key in keys:
+            self._node_columns.pop(key, None)
+
+    # -----------------
+    # IN-PLACE CHANGES
+    # -----------------
+
+    # Code that changes a node or edge in place (attributes, label, weight) looks it up
+    # through these, so graphs sharing elements with another graph (GraphView) can
+    # copy the element first. Plain graphs own their elements and return them as they are.
+
+    def mutable_node(self, node_id: str) -> Optional[Node]:
+        return self.get_node(node_id)
+
+    def mutable_edge(self, edge_id: str) -> Optional[Edge]:
+        return self.get_edge(edge_id)
+
+    def _edge_position(self, edge: Edge) -> int:
+        # Sort key that puts edges of this graph in the order of self.edges
+        return self._edges._position(edge)
+
+    # -----------------
+    # POSITIONS
+    # -----------------
+
+    # Where an element sits in self.nodes / self.edges, found without searching the list
+
+    def node_position(self, node_id: str) -> int:
+        node = self._nodes_by_id.get(node_id)
+        if node is None:
+            raise ValueError(f"Node '{node_id}' does not exist.")
+        return self._nodes.index(node)
+
+    def edge_position(self, edge_id: str) -> int:
+        edge = self._edges_by_id.get(edge_id)
+        if edge is None:
+            raise ValueError(f"Edge '{edge_id}' does not exist.")
+        return self._edges.index(edge)
 
     # -----------------
     # EDGE OPERATIONS
     # -----------------
 
     def add_edge(self, edge: Edge):
-        if not any(n.node_id == edge.source for n in self.nodes):
+        if edge.source not in self._nodes_by_id:
             raise ValueError(f"Source node '{edge.source}' does not exist.")
 
-        if not any(n.node_id == edge.target for n in self.nodes):
+        if edge.target not in self._nodes_by_id:
             raise ValueError(f"Target node '{edge.target}' does not exist.")
 
-        if edge.edge_id and any(e.edge_id == edge.edge_id for e in self.edges):
-            raise ValueError(f"Edge '{edge.edge_id}' already exists.")
+        (edge_id,), counter = _batch_ids([edge.edge_id], self._edge_counter)
+        if edge_id in self._edges_by_id:
+            raise ValueError(f"Edge '{edge_id}' already exists.")
 
         if not edge.edge_id:
-            self._edge_counter += 1
-            edge.edge_id = str(self._edge_counter)
+            edge.edge_id = edge_id
+        self._edge_counter = counter
+        self._edges.append(edge)
+        self._edges_by_id.setdefault(edge.edge_id, edge)
+        self._index_edge(edge)
+
+    def get_edge(self, edge_id: str) -> Optional[Edge]:
+        return self._edges_by_id.get(edge_id)
+
+    def remove_edge(self, edge_id: str) -> Edge:
+        edge = self._edges_by_id.get(edge_id)
+        if edge is None:
+            raise ValueError(f"Edge '{edge_id}' does not exist.")
+
+        self._drop_edge(edge)
+        return edge
+
+    def _drop_edge(self, edge: Edge) -> None:
+        if self._edges_by_id.get(edge.edge_id) is edge:
+            del self._edges_by_id[edge.edge_id]
+        self._edges.remove(edge)
+        self._unindex_edge(edge)
+
+    # -----------------
+    # BULK OPERATIONS
+    # -----------------
+
+    # The whole batch is validated before anything is added and every problem is
+    # reported in a single ValueError, so a batch is either added completely or not at all.
+    # Generated IDs are worked out first and validated like explicit ones.
+
+    def add_nodes_bulk(self, nodes: Iterable[Node]) -> None:
+        batch = list(nodes)
+        node_ids, counter = _batch_ids((n.node_id for n in batch), self._node_counter)
+        errors = _node_batch_errors(node_ids, self._nodes_by_id)
+        if errors:
+            raise _batch_error("node", errors)
+
+        self._node_counter = counter
+        for node, node_id in zip(batch, node_ids):
+            if not node.node_id:
+                node.node_id = node_id
+            self._index_node(node)
+        self._nodes.extend(batch)
+        if batch:
+            self._node_columns.clear()
+
+    def add_edges_bulk(self, edges: Iterable[Edge]) -> None:
+        batch = list(edges)
+        edge_ids, counter = _batch_ids((e.edge_id for e in batch), self._edge_counter)
+        errors = _edge_batch_errors(batch, edge_ids, self._nodes_by_id, self._edges_by_id)
+        if errors:
+            raise _batch_error("edge", errors)
 
-        self.edges.append(edge)
+        self._edge_counter = counter
+        for edge, edge_id in zip(batch, edge_ids):
+            if not edge.edge_id:
+                edge.edge_id = edge_id
+            self._edges_by_id[edge_id] = edge
+            self._index_edge(edge)
+        self._edges.extend(batch)
 
     def get_edges(self) -> List[Edge]:
         return self.edges
@@ -60,4 +484,4 @@ class Graph:
             "directed": self.directed,
             "nodes": [node.to_dict() for node in self.nodes],
             "edges": [edge.to_dict() for edge in self.edges],
-        }
\ No newline at end of file
+        }
@@ -1,4 +1,7 @@
 class Node:
+    # Fixed slots instead of a per-instance __dict__ keep large graphs small
+    __slots__ = ("node_id", "label", "attributes")
+
     def __init__(self, node_id: str, label: str = "", attributes: dict = None):
         self.node_id = node_id
         self.label = label or node_id
@@ -9,4 +12,4 @@ class Node:
             "id": self.node_id,
             "label": self.label,
             "attributes": self.attributes,
-        }
\ No newline at end of file
+        }
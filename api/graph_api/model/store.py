@@ -0,0 +1,903 @@
+"""
+Columnar graph storage (GraphStore) and the compact Graph built on top of it.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from copy import deepcopy
+from typing import Callable, Dict, Iterable, List, Optional, Sequence as SequenceType, Tuple, Union
+
+from .node import Node
+from .edge import Edge
+from .graph import Graph, _HoleCounter, _batch_error, _batch_ids, _edge_batch_errors, _node_batch_errors
+
+
+class GraphStore:
+    """
+    Column-oriented storage for the nodes and edges of one graph.
+
+    Node IDs are interned once and edges refer to their endpoints by integer
+    node index. Weights and direction flags live in typed arrays. Attributes
+    are kept as a tuple of values plus an index into a table of shared key
+    tuples, so every element with the same attribute names shares one key tuple.
+
+    Removing a row leaves a hole (node ID None, edge source -1), so no other row
+    moves. node_rows()/edge_rows() list the rows that are left and compact()
+    drops the holes, renumbering rows and edge endpoints.
+    """
+
+    def __init__(self, directed: bool = True):
+        self.directed = directed
+
+        # Shared attribute key tables, index 0 is the empty table
+        self.key_tables: List[Tuple[str, ...]] = [()]
+        self.key_positions: List[Dict[str, int]] = [{}]
+        self._key_table_index: Dict[Tuple[str, ...], int] = {(): 0}
+
+        # Node columns, a label of None means "same as the node ID"
+        self.node_ids: List[str] = []
+        self.node_labels: List[Optional[str]] = []
+        self.node_keys = array("I")
+        self.node_values: List[tuple] = []
+        self.node_index: Dict[str, int] = {}
+
+        # Edge columns, endpoints are node indices.
+        # Auto-numbered edges store None as ID and keep their number in edge_serials,
+        # so the common "no edge ID column" case costs no string per edge.
+        self.edge_ids: List[Optional[str]] = []
+        self.edge_serials = array("q")
+        self.edge_sources = array("q")
+        self.edge_targets = array("q")
+        self.edge_weights = array("d")
+        self.edge_directed = array("b")
+        self.edge_keys = array("I")
+        self.edge_values: List[tuple] = []
+        self._edge_index: Optional[Dict[str, int]] = None
+        self._explicit_edge_ids: Optional[set] = None
+
+        # Holes left by removals. The row lists and hole counters are built when asked
+        # for while there are holes, and kept up to date after that.
+        self.removed_nodes = 0
+        self.removed_edges = 0
+        self._node_rows: Optional[List[int]] = None
+        self._edge_rows: Optional[List[int]] = None
+        self._node_holes: Optional[_HoleCounter] = None
+        self._edge_holes: Optional[_HoleCounter] = None
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids) - self.removed_nodes
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_ids) - self.removed_edges
+
+    def edge_id(self, index: int) -> str:
+        edge_id = self.edge_ids[index]
+        return edge_id if edge_id is not None else str(self.edge_serials[index])
+
+    def edge_key(self, index: int) -> Union[str, int]:
+        # The edge ID, or the serial number of an auto-numbered edge without building its string
+        edge_id = self.edge_ids[index]
+        return edge_id if edge_id is not None else self.edge_serials[index]
+
+    @property
+    def edge_index(self) -> Dict[str, int]:
+        # Built on the first lookup by edge ID and kept up to date after that
+        if self._edge_index is None:
+            self._edge_index = {}
+            for i in self.edge_rows():
+                self._edge_index.setdefault(self.edge_id(i), i)
+        return self._edge_index
+
+    @property
+    def explicit_edge_ids(self) -> set:
+        # IDs of the edges that are not auto-numbered, enough to check a new auto-numbered
+        # ID (always above every serial so far) without building edge_index
+        if self._explicit_edge_ids is None:
+            self._explicit_edge_ids = {edge_id for edge_id in self.edge_ids if edge_id is not None}
+        return self._explicit_edge_ids
+
+    # -----------------
+    # ROWS AND POSITIONS
+    # -----------------
+
+    def node_rows(self) -> SequenceType[int]:
+        # Rows of the remaining nodes, in order
+        if not self.removed_nodes:
+            return range(len(self.node_ids))
+        if self._node_rows is None:
+            self._node_rows = [row for row, node_id in enumerate(self.node_ids) if node_id is not None]
+        return self._node_rows
+
+    def edge_rows(self) -> SequenceType[int]:
+        # Rows of the remaining edges, in order
+        if not self.removed_edges:
+            return range(len(self.edge_ids))
+        if self._edge_rows is None:
+            self._edge_rows = [row for row, source in enumerate(self.edge_sources) if source >= 0]
+        return self._edge_rows
+
+    def node_position(self, index: int) -> int:
+        # Position of a row in node_rows(), from the number of holes before it
+        if not self.removed_nodes:
+            return index
+        if self._node_holes is None:
+            self._node_holes = _HoleCounter(node_id is None for node_id in self.node_ids)
+        return index - self._node_holes.before(index)
+
+    def edge_position(self, index: int) -> int:
+        if not self.removed_edges:
+            return index
+        if self._edge_holes is None:
+            self._edge_holes = _HoleCounter(source < 0 for source in self.edge_sources)
+        return index - self._edge_holes.before(index)
+
+    # -----------------
+    # ATTRIBUTES
+    # -----------------
+
+    def _key_table(self, keys: Tuple[str, ...]) -> int:
+        table = self._key_table_index.get(keys)
+        if table is None:
+            table = len(self.key_tables)
+            interned = tuple(sys.intern(k) if isinstance(k, str) else k for k in keys)
+            self.key_tables.append(interned)
+            self.key_positions.append({key: position for position, key in enumerate(interned)})
+            self._key_table_index[keys] = table
+        return table
+
+    def _split_attributes(self, attributes: Optional[dict]) -> Tuple[int, tuple]:
+        if not attributes:
+            return 0, ()
+        return self._key_table(tuple(attributes.keys())), tuple(attributes.values())
+
+    def node_attributes(self, index: int) -> dict:
+        return dict(zip(self.key_tables[self.node_keys[index]], self.node_values[index]))
+
+    def node_attribute_row(self, index: int) -> "_AttributeRow":
+        return _AttributeRow(self.key_positions[self.node_keys[index]], self.node_values[index])
+
+    def set_node_attributes(self, index: int, attributes: dict) -> None:
+        self.node_keys[index], self.node_values[index] = self._split_attributes(attributes)
+
+    def edge_attributes(self, index: int) -> dict:
+        return dict(zip(self.key_tables[self.edge_keys[index]], self.edge_values[index]))
+
+    def edge_attribute_row(self, index: int) -> "_AttributeRow":
+        return _AttributeRow(self.key_positions[self.edge_keys[index]], self.edge_values[index])
+
+    def set_edge_attributes(self, index: int, attributes: dict) -> None:
+        self.edge_keys[index], self.edge_values[index] = self._split_attributes(attributes)
+
+    # -----------------
+    # ROWS
+    # -----------------
+
+    def append_node(self, node_id: str, label: Optional[str] = None, attributes: Optional[dict] = None) -> int:
+        index = len(self.node_ids)
+        node_id = sys.intern(node_id)
+        keys, values = self._split_attributes(attributes)
+
+        self.node_ids.append(node_id)
+        self.node_labels.append(None if not label or label == node_id else label)
+        self.node_keys.append(keys)
+        self.node_values.append(values)
+        self.node_index.setdefault(node_id, index)
+        if self._node_rows is not None:
+            self._node_rows.append(index)
+        if self._node_holes is not None:
+            self._node_holes.grow(len(self.node_ids))
+        return index
+
+    def append_edge(
+        self,
+        edge_id: Optional[str],
+        source: int,
+        target: int,
+        weight: float = 1.0,
+        directed: bool = True,
+        attributes: Optional[dict] = None,
+        serial: int = 0,
+    ) -> int:
+        # Pass edge_id=None with a serial number for auto-numbered edges
+        index = len(self.edge_ids)
+        edge_id = sys.intern(edge_id) if edge_id is not None else None
+        keys, values = self._split_attributes(attributes)
+
+        self.edge_ids.append(edge_id)
+        self.edge_serials.append(serial)
+        self.edge_sources.append(source)
+        self.edge_targets.append(target)
+        self.edge_weights.append(weight)
+        self.edge_directed.append(1 if directed else 0)
+        self.edge_keys.append(keys)
+        self.edge_values.append(values)
+        if self._edge_index is not None:
+            self._edge_index.setdefault(self.edge_id(index), index)
+        if edge_id is not None and self._explicit_edge_ids is not None:
+            self._explicit_edge_ids.add(edge_id)
+        if self._edge_rows is not None:
+            self._edge_rows.append(index)
+        if self._edge_holes is not None:
+            self._edge_holes.grow(len(self.edge_ids))
+        return index
+
+    def remove_edge(self, index: int) -> None:
+        edge_id = self.edge_id(index)
+        if self._edge_index is not None and self._edge_index.get(edge_id) == index:
+            del self._edge_index[edge_id]
+        if self._explicit_edge_ids is not None:
+            self._explicit_edge_ids.discard(self.edge_ids[index])
+
+        self.edge_ids[index] = None
+        self.edge_sources[index] = self.edge_targets[index] = -1
+        self.edge_keys[index], self.edge_values[index] = 0, ()
+        self.removed_edges += 1
+        self._edge_rows = None
+        if self._edge_holes is not None:
+            self._edge_holes.add(index)
+
+    def remove_node(self, index: int) -> None:
+        # The caller is responsible for removing attached edges first
+        node_id = self.node_ids[index]
+        if self.node_index.get(node_id) == index:
+            del self.node_index[node_id]
+
+        self.node_ids[index] = self.node_labels[index] = None
+        self.node_keys[index], self.node_values[index] = 0, ()
+        self.removed_nodes += 1
+        self._node_rows = None
+        if self._node_holes is not None:
+            self._node_holes.add(index)
+
+    def compact(self) -> None:
+        # Drops the holes, the remaining rows move up and edges follow their nodes
+        node_rows, edge_rows = self.node_rows(), self.edge_rows()
+        if self.removed_nodes:
+            renumbered = array("q", bytes(8 * len(self.node_ids)))
+            for new, old in enumerate(node_rows):
+                renumbered[old] = new
+            self.node_ids = _select(self.node_ids, node_rows)
+            self.node_labels = _select(self.node_labels, node_rows)
+            self.node_keys = _select(self.node_keys, node_rows)
+            self.node_values = _select(self.node_values, node_rows)
+            self.node_index = {}
+            for i, node_id in enumerate(self.node_ids):
+                self.node_index.setdefault(node_id, i)
+            self.edge_sources = array("q", [renumbered[source] for source in _select(self.edge_sources, edge_rows)])
+            self.edge_targets = array("q", [renumbered[target] for target in _select(self.edge_targets, edge_rows)])
+        else:
+            self.edge_sources = _select(self.edge_sources, edge_rows)
+            self.edge_targets = _select(self.edge_targets, edge_rows)
+
+        if self.removed_edges:
+            self.edge_ids = _select(self.edge_ids, edge_rows)
+            self.edge_serials = _select(self.edge_serials, edge_rows)
+            self.edge_weights = _select(self.edge_weights, edge_rows)
+            self.edge_directed = _select(self.edge_directed, edge_rows)
+            self.edge_keys = _select(self.edge_keys, edge_rows)
+            self.edge_values = _select(self.edge_values, edge_rows)
+            self._edge_index = None
+
+        self.removed_nodes = self.removed_edges = 0
+        self._node_rows = self._edge_rows = None
+        self._node_holes = self._edge_holes = None
+
+
+def _select(column: Union[list, array], rows: SequenceType[int]) -> Union[list, array]:
+    # The values of a column at the given rows, as a column of the same kind
+    if isinstance(column, array):
+        return array(column.typecode, [column[row] for row in rows])
+    return [column[row] for row in rows]
+
+
+class _AttributeRow(Mapping):
+    # Read-only mapping over one attribute row: the shared key positions of its key table
+    # and the row's value tuple, so reading attributes allocates no dict
+    __slots__ = ("_positions", "_values")
+
+    def __init__(self, positions: Dict[str, int], values: tuple):
+        self._positions = positions
+        self._values = values
+
+    def __getitem__(self, key):
+        return self._values[self._positions[key]]
+
+    def get(self, key, default=None):
+        position = self._positions.get(key)
+        return default if position is None else self._values[position]
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def copy(self) -> dict:
+        return dict(zip(self._positions, self._values))
+
+    def __copy__(self) -> dict:
+        return self.copy()
+
+    def __deepcopy__(self, memo) -> dict:
+        return deepcopy(self.copy(), memo)
+
+    def __reduce__(self):
+        return dict, (self.copy(),)
+
+    def __repr__(self) -> str:
+        return repr(self.copy())
+
+
+class _StoredAttributes(dict):
+    # Plain dict copy of one attribute row that writes every change back to the store,
+    # so code that does node.attributes[key] = value keeps working on mutable_node/mutable_edge
+    __slots__ = ("_write_back",)
+
+    def __init__(self, values: dict, write_back: Callable[[dict], None]):
+        super().__init__(values)
+        self._write_back = write_back
+
+    def _sync(self) -> None:
+        self._write_back(self)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._sync()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._sync()
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        self._sync()
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._sync()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._sync()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._sync()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._sync()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._sync()
+
+
+class StoredNode(Node):
+    """
+    Lightweight Node view over one row of a GraphStore.
+
+    Views are created on access and hold the store, the node ID and the row it was
+    last seen at. The row is looked up again by ID when compaction moved it, so a
+    view keeps pointing at its own node, and using it after that node was removed
+    raises ValueError. Views are equal when they show the same node ID of one store.
+    """
+
+    __slots__ = ("_store", "_index", "_node_id")
+
+    def __init__(self, store: GraphStore, index: int):
+        self._store = store
+        self._index = index
+        self._node_id = store.node_ids[index]
+
+    def _row(self) -> int:
+        store, row = self._store, self._index
+        if row < len(store.node_ids) and store.node_ids[row] == self._node_id:
+            return row
+        row = store.node_index.get(self._node_id)
+        if row is None:
+            raise ValueError(f"Node '{self._node_id}' does not exist.")
+        self._index = row
+        return row
+
+    @property
+    def node_id(self) -> str:
+        return self._node_id
+
+    @property
+    def label(self) -> str:
+        label = self._store.node_labels[self._row()]
+        return self._node_id if label is None else label
+
+    @label.setter
+    def label(self, value: str) -> None:
+        self._store.node_labels[self._row()] = None if not value or value == self._node_id else value
+
+    @property
+    def attributes(self) -> Mapping:
+        # Read-only, use CompactGraph.mutable_node to change attributes in place
+        return self._store.node_attribute_row(self._row())
+
+    @attributes.setter
+    def attributes(self, value: dict) -> None:
+        self._set_attributes(value or {})
+
+    def _set_attributes(self, attributes: dict) -> None:
+        self._store.set_node_attributes(self._row(), attributes)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data["attributes"] = self._store.node_attributes(self._row())
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, StoredNode):
+            return self._store is other._store and self._node_id == other._node_id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._store), self._node_id))
+
+    def __reduce__(self):
+        # Pickled as the row it points at, not as a copy of its values
+        return type(self), (self._store, self._row())
+
+
+class StoredEdge(Edge):
+    """
+    Lightweight Edge view over one row of a GraphStore.
+
+    Like StoredNode, views hold the edge's ID (the serial number for auto-numbered
+    edges) and find their row again after compaction.
+    """
+
+    __slots__ = ("_store", "_index", "_key")
+
+    def __init__(self, store: GraphStore, index: int):
+        self._store = store
+        self._index = index
+        self._key = store.edge_key(index)
+
+    def _row(self) -> int:
+        store, row = self._store, self._index
+        if row < len(store.edge_ids) and store.edge_sources[row] >= 0 and store.edge_key(row) == self._key:
+            return row
+        row = store.edge_index.get(self.edge_id)
+        if row is None:
+            raise ValueError(f"Edge '{self.edge_id}' does not exist.")
+        self._index = row
+        return row
+
+    @property
+    def edge_id(self) -> str:
+        key = self._key
+        return key if isinstance(key, str) else str(key)
+
+    @property
+    def source(self) -> str:
+        return self._store.node_ids[self._store.edge_sources[self._row()]]
+
+    @property
+    def target(self) -> str:
+        return self._store.node_ids[self._store.edge_targets[self._row()]]
+
+    @property
+    def weight(self) -> float:
+        return self._store.edge_weights[self._row()]
+
+    @weight.setter
+    def weight(self, value: float) -> None:
+        self._store.edge_weights[self._row()] = float(value)
+
+    @property
+    def directed(self) -> bool:
+        return bool(self._store.edge_directed[self._row()])
+
+    @directed.setter
+    def directed(self, value: bool) -> None:
+        self._store.edge_directed[self._row()] = 1 if value else 0
+
+    @property
+    def attributes(self) -> Mapping:
+        # Read-only, use CompactGraph.mutable_edge to change attributes in place
+        return self._store.edge_attribute_row(self._row())
+
+    @attributes.setter
+    def attributes(self, value: dict) -> None:
+        self._set_attributes(value or {})
+
+    def _set_attributes(self, attributes: dict) -> None:
+        self._store.set_edge_attributes(self._row(), attributes)
+
+    def to_dict(self) -> dict:
+        data = super().to_dict()
+        data["attributes"] = self._store.edge_attributes(self._row())
+        return data
+
+    def __eq__(self, other):
+        if isinstance(other, StoredEdge):
+            return self._store is other._store and self.edge_id == other.edge_id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((id(self._store), self.edge_id))
+
+    def __reduce__(self):
+        # Pickled as the row it points at, not as a copy of its values
+        return type(self), (self._store, self._row())
+
+
+class _MutableStoredNode(StoredNode):
+    # Returned by CompactGraph.mutable_node, its attributes write every change back
+    __slots__ = ()
+
+    @property
+    def attributes(self) -> dict:
+        return _StoredAttributes(self._store.node_attributes(self._row()), self._set_attributes)
+
+    @attributes.setter
+    def attributes(self, value: dict) -> None:
+        self._set_attributes(value or {})
+
+
+class _MutableStoredEdge(StoredEdge):
+    # Returned by CompactGraph.mutable_edge, its attributes write every change back
+    __slots__ = ()
+
+    @property
+    def attributes(self) -> dict:
+        return _StoredAttributes(self._store.edge_attributes(self._row()), self._set_attributes)
+
+    @attributes.setter
+    def attributes(self, value: dict) -> None:
+        self._set_attributes(value or {})
+
+
+class _StoredSequence(Sequence):
+    # Read-only list-like access to the remaining rows of a store, views are built on demand
+
+    def __init__(self, store: GraphStore, view_cls: type, rows: Callable[[], SequenceType[int]]):
+        self._store = store
+        self._view_cls = view_cls
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows())
+
+    def __getitem__(self, index):
+        rows = self._rows()
+        if isinstance(index, slice):
+            return [self._view_cls(self._store, row) for row in rows[index]]
+        if index < 0:
+            index += len(rows)
+        if not 0 <= index < len(rows):
+            raise IndexError("graph element index out of range")
+        return self._view_cls(self._store, rows[index])
+
+    def __iter__(self):
+        store, view_cls = self._store, self._view_cls
+        for row in self._rows():
+            yield view_cls(store, row)
+
+    def __repr__(self) -> str:
+        return f"<{self._view_cls.__name__} sequence of {len(self)}>"
+
+
+class CompactGraph(Graph):
+    """
+    Graph whose nodes and edges live in a columnar GraphStore.
+
+    nodes/edges are read-only sequences of StoredNode/StoredEdge views, so code that
+    reads node_id, label, attributes, source, target and weight works unchanged.
+    Nodes and edges passed to add_node/add_edge are copied into the store.
+    Adjacency is built lazily from the edge columns and kept up to date after that.
+    Removals leave holes in the store, which is compacted once half of its rows are
+    holes, like the element lists of Graph.
+    """
+
+    def __init__(self, directed: bool = True, store: Optional[GraphStore] = None):
+        self.directed = directed
+        self.store = store if store is not None else GraphStore(directed=directed)
+        self._adjacency = None
+        self._node_columns = {}
+        self._edge_counter = 0
+        self._node_counter = 0
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "CompactGraph":
+        compact = cls(directed=graph.directed)
+        for node in graph.nodes:
+            compact.add_node(node)
+        for edge in graph.edges:
+            compact.add_edge(edge)
+        return compact
+
+    def to_graph(self) -> Graph:
+        # Materialize a regular Graph with plain Node/Edge objects
+        graph = Graph(directed=self.directed)
+        for node in self.nodes:
+            graph.add_node(Node(node_id=node.node_id, label=node.label, attributes=dict(node.attributes)))
+        for edge in self.edges:
+            graph.add_edge(
+                Edge(
+                    source=edge.source,
+                    target=edge.target,
+                    edge_id=edge.edge_id,
+                    weight=edge.weight,
+                    directed=edge.directed,
+                    attributes=dict(edge.attributes),
+                )
+            )
+        return graph
+
+    # -----------------
+    # ELEMENT SEQUENCES
+    # -----------------
+
+    @property
+    def nodes(self) -> Sequence:
+        return _StoredSequence(self.store, StoredNode, self.store.node_rows)
+
+    @nodes.setter
+    def nodes(self, nodes) -> None:
+        self._rebuild(list(nodes), [self._detach_edge(e) for e in self.edges])
+
+    @property
+    def edges(self) -> Sequence:
+        return _StoredSequence(self.store, StoredEdge, self.store.edge_rows)
+
+    @edges.setter
+    def edges(self, edges) -> None:
+        self._rebuild([self._detach_node(n) for n in self.nodes], list(edges))
+
+    def _rebuild(self, nodes: list, edges: list) -> None:
+        self.store = GraphStore(directed=self.directed)
+        self._adjacency = None
+        self._node_columns.clear()
+        for node in nodes:
+            self.store.append_node(node.node_id, node.label, node.attributes)
+        for edge in edges:
+            self.add_edge(edge)
+
+    @staticmethod
+    def _detach_node(node: Node) -> Node:
+        return Node(node_id=node.node_id, label=node.label, attributes=dict(node.attributes))
+
+    @staticmethod
+    def _detach_edge(edge: Edge) -> Edge:
+        return Edge(
+            source=edge.source,
+            target=edge.target,
+            edge_id=edge.edge_id,
+            weight=edge.weight,
+            directed=edge.directed,
+            attributes=dict(edge.attributes),
+        )
+
+    # -----------------
+    # NODE OPERATIONS
+    # -----------------
+
+    def add_node(self, node: Node):
+        (node_id,), counter = _batch_ids([node.node_id], self._node_counter)
+        if node_id in self.store.node_index:
+            raise ValueError(f"Node '{node_id}' already exists.")
+
+        if not node.node_id:
+            node.node_id = node_id
+        self._node_counter = counter
+        self.store.append_node(node_id, node.label, node.attributes)
+        self._adjacency_add_nodes()
+        self._node_columns.clear()
+
+    def get_node(self, node_id: str) -> Optional[Node]:
+        index = self.store.node_index.get(node_id)
+        return None if index is None else StoredNode(self.store, index)
+
+    def has_node(self, node_id: str) -> bool:
+        return node_id in self.store.node_index
+
+    def mutable_node(self, node_id: str) -> Optional[Node]:
+        index = self.store.node_index.get(node_id)
+        return None if index is None else _MutableStoredNode(self.store, index)
+
+    def remove_node(self, node_id: str) -> Node:
+        index = self.store.node_index.get(node_id)
+        if index is None:
+            raise ValueError(f"Node '{node_id}' does not exist.")
+
+        detached = self._detach_node(StoredNode(self.store, index))
+        out_rows, in_rows = self._adjacency_rows(index)
+        for row in set(out_rows) | set(in_rows):
+            self._remove_edge_row(row)
+        self.store.remove_node(index)
+        self._node_columns.clear()
+        self._compact_if_sparse()
+        return detached
+
+    def _compact_if_sparse(self) -> None:
+        store = self.store
+        if store.removed_nodes * 2 > len(store.node_ids) or store.removed_edges * 2 > len(store.edge_ids):
+            store.compact()
+            self._adjacency = None
+
+    # -----------------
+    # ADJACENCY
+    # -----------------
+
+    def _adjacency_rows(self, index: int) -> Tuple[List[int], List[int]]:
+        # Lazily built per-node lists of edge rows, rebuilt after compaction
+        if self._adjacency is None:
+            out_rows: List[List[int]] = [[] for _ in range(len(self.store.node_ids))]
+            in_rows: List[List[int]] = [[] for _ in range(len(self.store.node_ids))]
+            for row, (source, target) in enumerate(zip(self.store.edge_sources, self.store.edge_targets)):
+                if source >= 0:
+                    out_rows[source].append(row)
+                    in_rows[target].append(row)
+            self._adjacency = (out_rows, in_rows)
+        return self._adjacency[0][index], self._adjacency[1][index]
+
+    def _adjacency_add_nodes(self) -> None:
+        # Empty lists for the node rows appended since the adjacency was built
+        if self._adjacency is not None:
+            for rows in self._adjacency:
+                rows.extend([] for _ in range(len(self.store.node_ids) - len(rows)))
+
+    def _adjacency_add_edge(self, row: int) -> None:
+        if self._adjacency is not None:
+            self._adjacency[0][self.store.edge_sources[row]].append(row)
+            self._adjacency[1][self.store.edge_targets[row]].append(row)
+
+    def _remove_edge_row(self, row: int) -> None:
+        # O(degree), the rows of the other edges stay where they are
+        if self._adjacency is not None:
+            self._adjacency[0][self.store.edge_sources[row]].remove(row)
+            self._adjacency[1][self.store.edge_targets[row]].remove(row)
+        self.store.remove_edge(row)
+
+    def out_edges(self, node_id: str) -> List[Edge]:
+        index = self.store.node_index.get(node_id)
+        if index is None:
+            return []
+        return [StoredEdge(self.store, row) for row in self._adjacency_rows(index)[0]]
+
+    def in_edges(self, node_id: str) -> List[Edge]:
+        index = self.store.node_index.get(node_id)
+        if index is None:
+            return []
+        return [StoredEdge(self.store, row) for row in self._adjacency_rows(index)[1]]
+
+    def neighbors(self, node_id: str) -> List[str]:
+        index = self.store.node_index.get(node_id)
+        if index is None:
+            return []
+
+        out_rows, in_rows = self._adjacency_rows(index)
+        neighbors = {}
+        for row in sorted(out_rows + in_rows):
+            other = self.store.edge_targets[row] if self.store.edge_sources[row] == index else self.store.edge_sources[row]
+            neighbors.setdefault(self.store.node_ids[other], None)
+        return list(neighbors)
+
+    def degree(self, node_id: str) -> int:
+        index = self.store.node_index.get(node_id)
+        if index is None:
+            return 0
+        out_rows, in_rows = self._adjacency_rows(index)
+        return len(out_rows) + len(in_rows)
+
+    # -----------------
+    # EDGE OPERATIONS
+    # -----------------
+
+    def add_edge(self, edge: Edge):
+        source = self.store.node_index.get(edge.source)
+        if source is None:
+            raise ValueError(f"Source node '{edge.source}' does not exist.")
+
+        target = self.store.node_index.get(edge.target)
+        if target is None:
+            raise ValueError(f"Target node '{edge.target}' does not exist.")
+
+        if edge.edge_id:
+            if edge.edge_id in self.store.edge_index:
+                raise ValueError(f"Edge '{edge.edge_id}' already exists.")
+            row = self.store.append_edge(edge.edge_id, source, target, edge.weight, edge.directed, edge.attributes)
+        else:
+            (edge_id,), counter = _batch_ids([None], self._edge_counter)
+            if edge_id in self.store.explicit_edge_ids:
+                raise ValueError(f"Edge '{edge_id}' already exists.")
+            self._edge_counter = counter
+            edge.edge_id = edge_id
+            row = self.store.append_edge(
+                None, source, target, edge.weight, edge.directed, edge.attributes, serial=counter
+            )
+        self._adjacency_add_edge(row)
+
+    # -----------------
+    # BULK OPERATIONS
+    # -----------------
+
+    def add_nodes_bulk(self, nodes: Iterable[Node]) -> None:
+        batch = list(nodes)
+        node_ids, counter = _batch_ids((n.node_id for n in batch), self._node_counter)
+        errors = _node_batch_errors(node_ids, self.store.node_index)
+        if errors:
+            raise _batch_error("node", errors)
+
+        self._node_counter = counter
+        for node, node_id in zip(batch, node_ids):
+            if not node.node_id:
+                node.node_id = node_id
+            self.store.append_node(node_id, node.label, node.attributes)
+        self._adjacency_add_nodes()
+        if batch:
+            self._node_columns.clear()
+
+    def add_edges_bulk(self, edges: Iterable[Edge]) -> None:
+        batch = list(edges)
+        edge_ids, counter = _batch_ids((e.edge_id for e in batch), self._edge_counter)
+        # Only build the edge ID index when the batch carries explicit IDs, generated
+        # ones can only collide with the explicit IDs of earlier edges
+        has_ids = any(e.edge_id for e in batch)
+        existing_ids = self.store.edge_index if has_ids else self.store.explicit_edge_ids
+        errors = _edge_batch_errors(batch, edge_ids, self.store.node_index, existing_ids)
+        if errors:
+            raise _batch_error("edge", errors)
+
+        node_index = self.store.node_index
+        for edge, edge_id in zip(batch, edge_ids):
+            source, target = node_index[edge.source], node_index[edge.target]
+            if edge.edge_id:
+                row = self.store.append_edge(edge_id, source, target, edge.weight, edge.directed, edge.attributes)
+            else:
+                edge.edge_id = edge_id
+                row = self.store.append_edge(
+                    None, source, target, edge.weight, edge.directed, edge.attributes, serial=int(edge_id)
+                )
+            self._adjacency_add_edge(row)
+        self._edge_counter = counter
+
+    def get_edge(self, edge_id: str) -> Optional[Edge]:
+        index = self.store.edge_index.get(edge_id)
+        return None if index is None else StoredEdge(self.store, index)
+
+    def mutable_edge(self, edge_id: str) -> Optional[Edge]:
+        index = self.store.edge_index.get(edge_id)
+        return None if index is None else _MutableStoredEdge(self.store, index)
+
+    def _edge_position(self, edge: Edge) -> int:
+        # Rows are in the order of self.edges, holes or not
+        return edge._row()
+
+    def node_position(self, node_id: str) -> int:
+        index = self.store.node_index.get(node_id)
+        if index is None:
+            raise ValueError(f"Node '{node_id}' does not exist.")
+        return self.store.node_position(index)
+
+    def edge_position(self, edge_id: str) -> int:
+        index = self.store.edge_index.get(edge_id)
+        if index is None:
+            raise ValueError(f"Edge '{edge_id}' does not exist.")
+        return self.store.edge_position(index)
+
+    def remove_edge(self, edge_id: str) -> Edge:
+        index = self.store.edge_index.get(edge_id)
+        if index is None:
+            raise ValueError(f"Edge '{edge_id}' does not exist.")
+
+        detached = self._detach_edge(StoredEdge(self.store, index))
+        self._remove_edge_row(index)
+        self._compact_if_sparse()
+        return detached
@@ -0,0 +1,111 @@
+"""
+Subgraph views (GraphView) that share nodes and edges with a parent graph.
+"""
+
+from copy import deepcopy
+from typing import Iterable, Optional, Set
+
+from .node import Node
+from .edge import Edge
+from .graph import Graph, _ElementList
+
+
+class GraphView(Graph):
+    """
+    Subgraph of a parent graph that shares its node and edge objects.
+
+    The view keeps the parent and the set of node IDs it was narrowed to (node_mask).
+    Building it only touches the kept nodes and their out-edges, so narrowing a large
+    graph costs O(matches) instead of a copy of every attribute dictionary. Edges keep
+    the order they have in the parent.
+
+    Shared elements are never written to: mutable_node/mutable_edge replace an element
+    with a private copy the first time it is changed, and structural changes (add/remove)
+    only affect the view. The parent must not be changed structurally while the view is
+    in use, elements of a CompactGraph parent are row views into its store.
+    """
+
+    def __init__(self, parent: Graph, node_ids: Optional[Iterable[str]] = None):
+        # node_ids are kept in the order given, pass them in parent order to keep the node
+        # order of the parent. None keeps every node and the parent's edge order.
+        super().__init__(directed=parent.directed)
+        self.parent = parent
+        self._node_counter = parent._node_counter
+        self._edge_counter = parent._edge_counter
+        self._owned_nodes: Set[str] = set()
+        self._owned_edges: Set[str] = set()
+
+        if node_ids is None:
+            nodes = list(parent.nodes)
+            self.node_mask = frozenset(node.node_id for node in nodes)
+            self._nodes = _ElementList(nodes)
+            for node in nodes:
+                self._index_node(node)
+            edges = list(parent.edges)
+        else:
+            nodes = []
+            for node_id in dict.fromkeys(node_ids):
+                node = parent.get_node(node_id)
+                if node is not None:
+                    nodes.append(node)
+            self.node_mask = frozenset(node.node_id for node in nodes)
+            self._nodes = _ElementList(nodes)
+            for node in nodes:
+                self._index_node(node)
+
+            # Only edges leaving a kept node can survive, put back in parent order
+            edges = []
+            for node in nodes:
+                for edge in parent.out_edges(node.node_id):
+                    if edge.target in self.node_mask:
+                        edges.append(edge)
+            edges.sort(key=parent._edge_position)
+
+        self._edges = _ElementList(edges)
+        for edge in edges:
+            self._edges_by_id.setdefault(edge.edge_id, edge)
+            self._index_edge(edge)
+
+    # -----------------
+    # COPY ON WRITE
+    # -----------------
+
+    def mutable_node(self, node_id: str) -> Optional[Node]:
+        node = self._nodes_by_id.get(node_id)
+        if node is None or node_id in self._owned_nodes:
+            return node
+
+        copy = Node(node_id=node.node_id, label=node.label, attributes=deepcopy(node.attributes))
+        self._nodes.replace(node, copy)
+        self._nodes_by_id[node_id] = copy
+        self._owned_nodes.add(node_id)
+        return copy
+
+    def mutable_edge(self, edge_id: str) -> Optional[Edge]:
+        edge = self._edges_by_id.get(edge_id)
+        if edge is None or edge_id in self._owned_edges:
+            return edge
+
+        copy = Edge(
+            source=edge.source,
+            target=edge.target,
+            edge_id=edge.edge_id,
+            weight=edge.weight,
+            directed=edge.directed,
+            attributes=deepcopy(edge.attributes),
+        )
+        self._edges.replace(edge, copy)
+        for edges in (self._out_edges[edge.source], self._in_edges[edge.target]):
+            edges[edges.index(edge)] = copy
+        self._edges_by_id[edge_id] = copy
+        self._owned_edges.add(edge_id)
+        return copy
+
+    def remove_node(self, node_id: str) -> Node:
+        node = super().remove_node(node_id)
+        self._owned_nodes.discard(node_id)
+        return node
+
+    def _drop_edge(self, edge: Edge) -> None:
+        super()._drop_edge(edge)
+        self._owned_edges.discard(edge.edge_id)
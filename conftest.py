@@ -0,0 +1,50 @@
+import datetime
+import json
+
+import pytest
+
+from api.graph_api.model import Edge, Graph, Node
+
+
+def _graph_snapshot(graph):
+    # Everything a graph holds: order, IDs, labels, weights and typed attributes
+    return json.dumps(graph.to_dict(), default=lambda value: [type(value).__name__, str(value)])
+
+
+def _random_attributes(rng, first):
+    attributes = {
+        "age": rng.choice([rng.randint(18, 70), rng.randint(18, 70), None, "n/a"]),
+        "score": rng.choice([round(rng.uniform(0, 10), 2), rng.randint(0, 10), True]),
+        "city": rng.choice(["Paris", "Rome", "Oslo", "Novi Sad", 7]),
+        "joined": rng.choice([datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randrange(900)), None]),
+    }
+    if first:
+        # The first value decides the type a filter compares with, the rest are mixed in
+        attributes.update(age=30, score=4.25, city="Paris")
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def _random_graph(rng, count, attributes=False):
+    # Nodes "n0".."n<count-1>" and up to count random edges "e0".., with mixed-type attributes if asked
+    graph = Graph(directed=True)
+    graph.add_nodes_bulk(
+        Node(f"n{i}", label=rng.choice(["Ana", "Bojan", "Cvijeta", "Đorđe", "Élodie"]),
+             attributes=_random_attributes(rng, i == 0))
+        if attributes else Node(f"n{i}")
+        for i in range(count)
+    )
+    graph.add_edges_bulk(
+        Edge(f"n{rng.randrange(count)}", f"n{rng.randrange(count)}", edge_id=f"e{k}")
+        for k in range(rng.randint(0, count))
+    )
+    return graph
+
+
+@pytest.fixture
+def graph_snapshot():
+    return _graph_snapshot
+
+
+@pytest.fixture
+def random_graph():
+    return _random_graph
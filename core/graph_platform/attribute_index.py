@@ -0,0 +1,125 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Tuple
+
+from api.graph_api.model import Node
+
+# Range operators, answered from the sorted part of an index
+RANGE_OPERATORS = {">", ">=", "<", "<="}
+
+
+class AttributeIndex:
+    """
+    Index over the normalized values of one node attribute.
+
+    Equality uses a hash of value -> node positions. Numeric and date attributes also
+    get a sorted index, so range operators are a bisect plus a slice. Results come back
+    in node order, like a full scan would return them.
+    """
+
+    def __init__(self, nodes: List[Node], target_type: type, entries: List[Tuple[int, Any]], ordered: bool):
+        # entries are (node position, normalized value) for every node that has the attribute
+        self.nodes = nodes
+        self.target_type = target_type
+        self._positions = [position for position, _ in entries]
+
+        self._by_value: Dict[Any, List[int]] = {}
+        for position, value in entries:
+            self._by_value.setdefault(value, []).append(position)
+
+        self._keys: List[Any] = []
+        self._sorted_positions: List[int] = []
+        if ordered:
+            # NaN does not compare to anything, so it never matches a range
+            ranked = sorted((value, position) for position, value in entries if value == value)
+            self._keys = [value for value, _ in ranked]
+            self._sorted_positions = [position for _, position in ranked]
+
+    def find(self, operator: str, value: Any) -> List[Node]:
+        return [self.nodes[p] for p in self.positions(operator, value)]
+
+    def positions(self, operator: str, value: Any) -> List[int]:
+        # Positions of the matching nodes, in node order
+        if operator == "==":
+            return self._by_value.get(value, [])
+        if operator == "!=":
+            equal = set(self._by_value.get(value, ()))
+            return [p for p in self._positions if p not in equal]
+        if operator in RANGE_OPERATORS:
+            start, stop = self._range(operator, value)
+            return sorted(self._sorted_positions[start:stop])
+        raise ValueError(f"Unsupported operator: {operator}")
+
+    def count(self, operator: str, value: Any) -> int:
+        # Number of matching nodes, without collecting them
+        if operator == "==":
+            return len(self._by_value.get(value, ()))
+        if operator == "!=":
+            return len(self._positions) - len(self._by_value.get(value, ()))
+        if operator in RANGE_OPERATORS:
+            start, stop = self._range(operator, value)
+            return stop - start
+        raise ValueError(f"Unsupported operator: {operator}")
+
+    def _range(self, operator: str, value: Any) -> Tuple[int, int]:
+        # Slice of the sorted index that matches a range operator
+        if operator == ">":
+            return bisect_right(self._keys, value), len(self._keys)
+        if operator == ">=":
+            return bisect_left(self._keys, value), len(self._keys)
+        if operator == "<":
+            return 0, bisect_left(self._keys, value)
+        return 0, bisect_right(self._keys, value)
+
+
+class ColumnIndex:
+    """
+    Sorted index over a typed numeric node column (see Graph.node_column).
+
+    The column is argsorted once and every operator is answered with searchsorted or
+    one vectorized comparison, so nothing is converted back to Python values.
+    """
+
+    def __init__(self, nodes: List[Node], target_type: type, column: Any):
+        self.nodes = nodes
+        self.target_type = target_type
+        self._column = column
+
+        order = column.argsort(kind="stable")
+        keys = column[order]
+        # NaN sorts last and never matches a range
+        valid = int((keys == keys).sum())
+        self._keys = keys[:valid]
+        self._order = order[:valid]
+
+    def find(self, operator: str, value: Any) -> List[Node]:
+        return [self.nodes[p] for p in self.positions(operator, value)]
+
+    def positions(self, operator: str, value: Any) -> List[int]:
+        # Positions of the matching nodes, in node order
+        if operator == "!=":
+            return (self._column != value).nonzero()[0].tolist()
+        start, stop = self._range(operator, value)
+        selected = self._order[start:stop].copy()
+        selected.sort()
+        return selected.tolist()
+
+    def count(self, operator: str, value: Any) -> int:
+        # Number of matching nodes, without collecting them
+        if operator == "!=":
+            return int((self._column != value).sum())
+        start, stop = self._range(operator, value)
+        return stop - start
+
+    def _range(self, operator: str, value: Any) -> Tuple[int, int]:
+        # Slice of the sorted keys that matches an equality or range operator
+        if operator == "==":
+            return int(self._keys.searchsorted(value, "left")), int(self._keys.searchsorted(value, "right"))
+        if operator == ">":
+            return int(self._keys.searchsorted(value, "right")), len(self._keys)
+        if operator == ">=":
+            return int(self._keys.searchsorted(value, "left")), len(self._keys)
+        if operator == "<":
+            return 0, int(self._keys.searchsorted(value, "left"))
+        if operator == "<=":
+            return 0, int(self._keys.searchsorted(value, "right"))
+        raise ValueError(f"Unsupported operator: {operator}")
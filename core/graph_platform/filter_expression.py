@@ -0,0 +1,274 @@
+# Compound filter expressions such as "Age>30 && (City==Paris || !Active==true)"
+#
+# An expression is parsed into a tree of conditions joined by AND, OR and NOT.
+# Conditions are bound to the attribute indexes of a Workspace, which also gives an
+# estimate of how many nodes each one matches. The tree is then evaluated as set
+# operations on node positions, most selective conditions of an AND first.
+
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+# Supported boolean operators: && / AND, || / OR, ! / NOT (keywords are upper case)
+_KEYWORD = re.compile(r"(AND|OR|NOT)(?=[\s(]|$)")
+_CONDITION_END = re.compile(r"&&|\|\||\s+(?:AND|OR)(?=[\s(]|$)")
+_CONDITION = re.compile(r"^(.+?)(==|!=|>=|<=|>|<|=)(.+)$")
+
+
+def parse_filter_condition(condition: str) -> Tuple[str, str, str]:
+    # Parse one filter condition into (attribute, operator, value).
+    condition = condition.strip()
+
+    match = _CONDITION.match(condition)
+    if not match:
+        raise ValueError(f"Invalid filter condition: '{condition}'")
+
+    attribute = match.group(1).strip()
+    operator = match.group(2).strip()
+    value = match.group(3).strip()
+
+    if operator == "=":
+        operator = "=="
+
+    return attribute, operator, value
+
+
+# ==========================================================
+# PLAN
+# ==========================================================
+
+class FilterNode(ABC):
+    @abstractmethod
+    def bind(self, binder: Callable[[str, str, str], Any]) -> None:
+        """Bind every condition below this node with binder(attribute, operator, value)."""
+
+    @abstractmethod
+    def estimate(self, total: int) -> int:
+        """Return the expected number of matching nodes out of total."""
+
+    @abstractmethod
+    def evaluate(self, total: int) -> Set[int]:
+        """Return the positions of the matching nodes."""
+
+
+class Condition(FilterNode):
+    def __init__(self, attribute: str, operator: str, value: str):
+        self.attribute = attribute
+        self.operator = operator
+        self.value = value
+        # (index, coerced value), or None when no node has a filterable value for the attribute
+        self._bound: Optional[Tuple[Any, Any]] = None
+
+    def bind(self, binder: Callable[[str, str, str], Any]) -> None:
+        self._bound = binder(self.attribute, self.operator, self.value)
+
+    def estimate(self, total: int) -> int:
+        if self._bound is None:
+            return 0
+        index, value = self._bound
+        return index.count(self.operator, value)
+
+    def evaluate(self, total: int) -> Set[int]:
+        if self._bound is None:
+            return set()
+        index, value = self._bound
+        return set(index.positions(self.operator, value))
+
+
+class Not(FilterNode):
+    def __init__(self, operand: FilterNode):
+        self.operand = operand
+
+    def bind(self, binder: Callable[[str, str, str], Any]) -> None:
+        self.operand.bind(binder)
+
+    def estimate(self, total: int) -> int:
+        return total - self.operand.estimate(total)
+
+    def evaluate(self, total: int) -> Set[int]:
+        return set(range(total)).difference(self.operand.evaluate(total))
+
+
+class And(FilterNode):
+    def __init__(self, operands: List[FilterNode]):
+        self.operands = operands
+
+    def bind(self, binder: Callable[[str, str, str], Any]) -> None:
+        for operand in self.operands:
+            operand.bind(binder)
+
+    def estimate(self, total: int) -> int:
+        return min(operand.estimate(total) for operand in self.operands)
+
+    def evaluate(self, total: int) -> Set[int]:
+        # Most selective first, so the running intersection is small from the start and an
+        # empty one skips the remaining operands. A negated operand only removes its matches.
+        ordered = sorted(self.operands, key=lambda operand: operand.estimate(total))
+        positives = [operand for operand in ordered if not isinstance(operand, Not)]
+        negatives = [operand.operand for operand in ordered if isinstance(operand, Not)]
+
+        if positives:
+            result = positives[0].evaluate(total)
+            rest = positives[1:]
+        else:
+            result = set(range(total))
+            rest = []
+
+        for operand in rest:
+            if not result:
+                return result
+            result.intersection_update(operand.evaluate(total))
+        for operand in negatives:
+            if not result:
+                return result
+            result.difference_update(operand.evaluate(total))
+        return result
+
+
+class Or(FilterNode):
+    def __init__(self, operands: List[FilterNode]):
+        self.operands = operands
+
+    def bind(self, binder: Callable[[str, str, str], Any]) -> None:
+        for operand in self.operands:
+            operand.bind(binder)
+
+    def estimate(self, total: int) -> int:
+        return min(total, sum(operand.estimate(total) for operand in self.operands))
+
+    def evaluate(self, total: int) -> Set[int]:
+        # Largest first, so the running union is already complete as early as possible
+        ordered = sorted(self.operands, key=lambda operand: operand.estimate(total), reverse=True)
+        result: Set[int] = set()
+        for operand in ordered:
+            if len(result) == total:
+                break
+            result.update(operand.evaluate(total))
+        return result
+
+
+# ==========================================================
+# PARSER
+# ==========================================================
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    # Tokens are ("AND" | "OR" | "NOT" | "(" | ")" | "COND", text).
+    # A parenthesis that is opened inside a condition (e.g. "Name==Foo (Bar)") is part of its value.
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    length = len(expression)
+
+    while position < length:
+        char = expression[position]
+        if char.isspace():
+            position += 1
+            continue
+        if expression.startswith("&&", position):
+            tokens.append(("AND", "&&"))
+            position += 2
+            continue
+        if expression.startswith("||", position):
+            tokens.append(("OR", "||"))
+            position += 2
+            continue
+        if char in "()":
+            tokens.append((char, char))
+            position += 1
+            continue
+        if char == "!" and not expression.startswith("!=", position):
+            tokens.append(("NOT", "!"))
+            position += 1
+            continue
+        keyword = _KEYWORD.match(expression, position)
+        if keyword:
+            tokens.append((keyword.group(1), keyword.group(1)))
+            position = keyword.end()
+            continue
+
+        # Condition text runs until a boolean operator or a parenthesis it did not open
+        depth = 0
+        end = position
+        while end < length:
+            if _CONDITION_END.match(expression, end):
+                break
+            if expression[end] == "(":
+                depth += 1
+            elif expression[end] == ")":
+                if depth == 0:
+                    break
+                depth -= 1
+            end += 1
+        tokens.append(("COND", expression[position:end].strip()))
+        position = end
+
+    return tokens
+
+
+class _Parser:
+    # expression := or ; or := and ("||" and)* ; and := unary ("&&" unary)*
+    # unary := "!" unary | "(" expression ")" | condition
+    def __init__(self, tokens: List[Tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][0]
+        return None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def parse(self) -> FilterNode:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected '{self.tokens[self.position][1]}' in filter expression")
+        return node
+
+    def parse_or(self) -> FilterNode:
+        operands = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else Or(operands)
+
+    def parse_and(self) -> FilterNode:
+        operands = [self.parse_unary()]
+        while self.peek() == "AND":
+            self.take()
+            operands.append(self.parse_unary())
+        return operands[0] if len(operands) == 1 else And(operands)
+
+    def parse_unary(self) -> FilterNode:
+        kind = self.peek()
+        if kind is None:
+            raise ValueError("Incomplete filter expression")
+
+        kind, text = self.take()
+        if kind == "NOT":
+            return Not(self.parse_unary())
+        if kind == "(":
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise ValueError("Missing ')' in filter expression")
+            self.take()
+            return node
+        if kind == "COND":
+            return Condition(*parse_filter_condition(text))
+        raise ValueError(f"Unexpected '{text}' in filter expression")
+
+
+def parse_filter_expression(expression: str) -> FilterNode:
+    """
+    Parses a filter expression into a plan.
+
+    Conditions have the form attribute<op>value with ==, =, !=, >, >=, < or <=. They are
+    combined with && (AND), || (OR), ! (NOT) and parentheses; NOT binds tighter than
+    AND, and AND tighter than OR.
+    """
+    tokens = _tokenize(expression.strip())
+    if not tokens:
+        raise ValueError("Empty filter expression")
+    return _Parser(tokens).parse()
@@ -0,0 +1,306 @@
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, List, Optional, Tuple
+
+from api.graph_api.model import CompactGraph, Edge, Graph, GraphView, MappedGraph, Node
+
+# Default limits of the Workspace undo history (None disables a limit)
+DEFAULT_HISTORY_DEPTH = 100
+DEFAULT_HISTORY_BYTES = 64 * 1024 * 1024
+
+class _Missing:
+    # Pickles as a reference to _MISSING, so history entries of a pickled workspace
+    # (e.g. a shared explorer session) still compare against the same object
+    def __reduce__(self):
+        return "_MISSING"
+
+    def __repr__(self) -> str:
+        return "<missing>"
+
+
+# Marks an attribute that did not exist before a patch
+_MISSING = _Missing()
+
+
+def _element_bytes(element: Any) -> int:
+    # Rough size of a node/edge kept alive by the history: the object, its attribute
+    # dictionary and the list slot pointing at it
+    return sys.getsizeof(element) + sys.getsizeof(element.attributes) + 8
+
+
+def _detach_node(node: Node) -> Node:
+    return Node(node_id=node.node_id, label=node.label, attributes=dict(node.attributes))
+
+
+def _detach_edge(edge: Edge) -> Edge:
+    return Edge(
+        source=edge.source,
+        target=edge.target,
+        edge_id=edge.edge_id,
+        weight=edge.weight,
+        directed=edge.directed,
+        attributes=dict(edge.attributes),
+    )
+
+
+def _own_node(node: Node) -> Node:
+    # Views of a compact or mapped graph are copied, plain nodes are kept as they are
+    return node if type(node) is Node else _detach_node(node)
+
+
+def _own_edge(edge: Edge) -> Edge:
+    return edge if type(edge) is Edge else _detach_edge(edge)
+
+
+def _same_node(a: Node, b: Node) -> bool:
+    return a.node_id == b.node_id and a.label == b.label and a.attributes == b.attributes
+
+
+def _same_edge(a: Edge, b: Edge) -> bool:
+    return (
+        a.edge_id == b.edge_id
+        and a.source == b.source
+        and a.target == b.target
+        and a.weight == b.weight
+        and a.directed == b.directed
+        and a.attributes == b.attributes
+    )
+
+
+def _merge(kept: List[Any], removed: List[Tuple[int, Any]]) -> List[Any]:
+    # Puts removed elements back at their original positions between the kept ones
+    merged = []
+    kept_iter = iter(kept)
+    removed_iter = iter(removed)
+    next_removed = next(removed_iter, None)
+    for position in range(len(kept) + len(removed)):
+        if next_removed is not None and next_removed[0] == position:
+            merged.append(next_removed[1])
+            next_removed = next(removed_iter, None)
+        else:
+            merged.append(next(kept_iter))
+    return merged
+
+
+def _insert_at(graph: Graph, kind: str, element: Any, index: int) -> None:
+    # Adds a node/edge back and moves it to its old position in the ordered list
+    if kind == "node":
+        graph.add_node(element)
+        elements = list(graph.nodes)
+    else:
+        graph.add_edge(element)
+        elements = list(graph.edges)
+
+    if index >= len(elements) - 1:
+        return
+
+    elements.insert(index, elements.pop())
+    if isinstance(graph, CompactGraph):
+        elements = [_detach_node(e) if kind == "node" else _detach_edge(e) for e in elements]
+    if kind == "node":
+        graph.nodes = elements
+    else:
+        graph.edges = elements
+
+
+# ==========================================================
+# HISTORY ENTRIES
+# ==========================================================
+
+# Every entry knows how to turn the current graph back into the graph that was
+# current before the operation, and roughly how many bytes it keeps alive.
+
+
+class HistoryEntry(ABC):
+    nbytes = 0
+
+    @abstractmethod
+    def undo(self, graph: Graph) -> Graph:
+        """Return the graph that was current before the operation."""
+
+
+class GraphSnapshot(HistoryEntry):
+    # The previous graph kept as a whole, used when it cannot be described as a delta
+    def __init__(self, previous: Graph, shared: bool = False):
+        self.previous = previous
+        if not shared:
+            self.nbytes = sum(_element_bytes(n) for n in previous.nodes) + sum(
+                _element_bytes(e) for e in previous.edges
+            )
+
+    def undo(self, graph: Graph) -> Graph:
+        return self.previous
+
+
+class GraphReplaced(HistoryEntry):
+    """
+    A graph replaced by a subgraph of itself (search and filter results).
+
+    Only the nodes and edges missing from the new graph are kept, with their old
+    positions. The subgraph keeps the order of both nodes and edges.
+    """
+
+    def __init__(self, previous: Graph, removed_nodes: list, removed_edges: list):
+        # A view or a read-only snapshot is restored as the plain graph it behaves like
+        self.graph_cls = Graph if isinstance(previous, (GraphView, MappedGraph)) else type(previous)
+        self.directed = previous.directed
+        self.node_counter = previous._node_counter
+        self.edge_counter = previous._edge_counter
+        self.removed_nodes = removed_nodes
+        self.removed_edges = removed_edges
+
+        self.nbytes = sum(_element_bytes(n) for _, n in removed_nodes) + sum(
+            _element_bytes(e) for _, e in removed_edges
+        )
+
+    @classmethod
+    def capture(cls, previous: Graph, new: Graph) -> Optional["GraphReplaced"]:
+        # Returns None when new is not an unchanged subset of previous in the same order
+        if new.directed != previous.directed:
+            return None
+
+        new_nodes = new.nodes
+        removed_nodes = []
+        kept = 0
+        for index, node in enumerate(previous.nodes):
+            if kept < len(new_nodes) and new_nodes[kept].node_id == node.node_id:
+                if not _same_node(node, new_nodes[kept]):
+                    return None
+                kept += 1
+            else:
+                removed_nodes.append((index, _own_node(node)))
+        if kept != len(new_nodes):
+            return None
+
+        new_edges = new.edges
+        removed_edges = []
+        kept = 0
+        for index, edge in enumerate(previous.edges):
+            if kept < len(new_edges) and new_edges[kept].edge_id == edge.edge_id:
+                if not _same_edge(edge, new_edges[kept]):
+                    return None
+                kept += 1
+            else:
+                removed_edges.append((index, _own_edge(edge)))
+        if kept != len(new_edges):
+            return None
+
+        return cls(previous, removed_nodes, removed_edges)
+
+    def undo(self, graph: Graph) -> Graph:
+        restored = self.graph_cls(directed=self.directed)
+        nodes = list(graph.nodes)
+        edges = list(graph.edges)
+        if self.graph_cls is Graph:
+            # A plain graph edits its elements in place, so it must not hold views
+            nodes = [_own_node(node) for node in nodes]
+            edges = [_own_edge(edge) for edge in edges]
+        restored.add_nodes_bulk(_merge(nodes, self.removed_nodes))
+        restored.add_edges_bulk(_merge(edges, self.removed_edges))
+        restored._node_counter = self.node_counter
+        restored._edge_counter = self.edge_counter
+        return restored
+
+
+class ElementAdded(HistoryEntry):
+    def __init__(self, kind: str, element_id: str):
+        self.kind = kind
+        self.element_id = element_id
+
+    def undo(self, graph: Graph) -> Graph:
+        if self.kind == "node":
+            graph.remove_node(self.element_id)
+        else:
+            graph.remove_edge(self.element_id)
+        return graph
+
+
+class ElementRemoved(HistoryEntry):
+    def __init__(self, kind: str, element: Any, index: int):
+        self.kind = kind
+        self.element = element
+        self.index = index
+        self.nbytes = _element_bytes(element)
+
+    def undo(self, graph: Graph) -> Graph:
+        _insert_at(graph, self.kind, self.element, self.index)
+        return graph
+
+
+class AttributesPatched(HistoryEntry):
+    # Old values of the attributes (and edge weight) an edit overwrote
+    def __init__(self, kind: str, element_id: str, old_values: dict, old_weight: Any = _MISSING):
+        self.kind = kind
+        self.element_id = element_id
+        self.old_values = old_values
+        self.old_weight = old_weight
+        self.nbytes = sys.getsizeof(old_values)
+
+    @classmethod
+    def capture(cls, kind: str, element: Any, keys, weight_changed: bool = False) -> "AttributesPatched":
+        old_values = {key: element.attributes.get(key, _MISSING) for key in keys}
+        return cls(kind, element.node_id if kind == "node" else element.edge_id, old_values,
+                   element.weight if weight_changed else _MISSING)
+
+    def undo(self, graph: Graph) -> Graph:
+        if self.kind == "node":
+            element = graph.mutable_node(self.element_id)
+            graph.drop_node_columns(self.old_values.keys())
+        else:
+            element = graph.mutable_edge(self.element_id)
+
+        for key, value in self.old_values.items():
+            if value is _MISSING:
+                element.attributes.pop(key, None)
+            else:
+                element.attributes[key] = value
+        if self.old_weight is not _MISSING:
+            element.weight = self.old_weight
+        return graph
+
+
+# ==========================================================
+# HISTORY
+# ==========================================================
+
+class GraphHistory:
+    """
+    Bounded stack of undo entries.
+
+    When the number of entries or their estimated size goes over the limits, the oldest
+    entries are dropped. A limit of None means no limit.
+    """
+
+    def __init__(self, max_depth: Optional[int] = DEFAULT_HISTORY_DEPTH,
+                 max_bytes: Optional[int] = DEFAULT_HISTORY_BYTES):
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self._entries: "deque[HistoryEntry]" = deque()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def push(self, entry: HistoryEntry) -> None:
+        self._entries.append(entry)
+        self.nbytes += entry.nbytes
+        self._trim()
+
+    def pop(self) -> Optional[HistoryEntry]:
+        if not self._entries:
+            return None
+        entry = self._entries.pop()
+        self.nbytes -= entry.nbytes
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nbytes = 0
+
+    def _trim(self) -> None:
+        while self._entries and (
+            (self.max_depth is not None and len(self._entries) > self.max_depth)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            self.nbytes -= self._entries.popleft().nbytes
@@ -0,0 +1,113 @@
+import datetime
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from api.graph_api.model import Node
+
+# Length of the n-grams kept in the inverted index
+NGRAM_SIZE = 3
+
+
+def stringify(value) -> str:
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if value is None:
+        return ""
+    return str(value)
+
+
+def searchable_fields(node: Node) -> Tuple[str, ...]:
+    # Everything a text search looks at: label, ID, attribute keys and attribute values
+    fields = [stringify(node.label).casefold(), stringify(node.node_id).casefold()]
+    attributes = node.attributes if isinstance(node.attributes, Mapping) else {}
+    for key, value in attributes.items():
+        fields.append(stringify(key).casefold())
+        fields.append(stringify(value).casefold())
+    return tuple(fields)
+
+
+def _ngrams(fields: Iterable[str]) -> Set[str]:
+    grams = set()
+    for field in fields:
+        for i in range(len(field) - NGRAM_SIZE + 1):
+            grams.add(field[i:i + NGRAM_SIZE])
+    return grams
+
+
+class TextIndex:
+    """
+    Trigram inverted index over the searchable fields of every node.
+
+    A query of at least three characters only looks at nodes that contain all of its
+    trigrams (the intersection of their posting sets), then checks the substring on
+    those fields. Shorter queries scan the cached, already casefolded fields.
+    add/update/remove keep the index in sync with single node changes.
+    """
+
+    def __init__(self, nodes: Iterable[Node] = ()):
+        self._postings: Dict[str, Set[str]] = {}
+        self._fields: Dict[str, Tuple[str, ...]] = {}
+        # Insertion sequence per node, results are returned in node order
+        self._order: Dict[str, int] = {}
+        self._next_order = 0
+
+        for node in nodes:
+            self.add(node)
+
+    def add(self, node: Node) -> None:
+        node_id = node.node_id
+        fields = searchable_fields(node)
+        self._fields[node_id] = fields
+        self._order[node_id] = self._next_order
+        self._next_order += 1
+        for gram in _ngrams(fields):
+            self._postings.setdefault(gram, set()).add(node_id)
+
+    def remove(self, node_id: str) -> None:
+        fields = self._fields.pop(node_id, None)
+        if fields is None:
+            return
+        del self._order[node_id]
+        for gram in _ngrams(fields):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(node_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def update(self, node: Node) -> None:
+        # Re-indexes a node in place, keeping its position in the result order
+        node_id = node.node_id
+        order = self._order.get(node_id)
+        self.remove(node_id)
+        self.add(node)
+        if order is not None:
+            self._order[node_id] = order
+
+    def search(self, normalized_query: str, allowed_node_ids: Optional[set] = None) -> List[str]:
+        # normalized_query is already stripped and casefolded
+        if len(normalized_query) >= NGRAM_SIZE:
+            postings = []
+            for gram in _ngrams((normalized_query,)):
+                posting = self._postings.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates.intersection_update(posting)
+                if not candidates:
+                    return []
+        else:
+            candidates = self._fields.keys()
+
+        if allowed_node_ids is not None:
+            candidates = [node_id for node_id in candidates if node_id in allowed_node_ids]
+
+        matches = [
+            node_id for node_id in candidates
+            if any(normalized_query in field for field in self._fields[node_id])
+        ]
+        matches.sort(key=self._order.__getitem__)
+        return matches
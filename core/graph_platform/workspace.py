@@ -1,6 +1,19 @@
 import datetime
 from typing import Optional, List, Callable
-from api.graph_api.model import Graph, Node, Edge
+from api.graph_api.model import Graph, GraphView, MappedGraph, Node, Edge
+from .attribute_index import AttributeIndex, ColumnIndex
+from .filter_expression import parse_filter_expression
+from .history import (
+    DEFAULT_HISTORY_BYTES,
+    DEFAULT_HISTORY_DEPTH,
+    AttributesPatched,
+    ElementAdded,
+    ElementRemoved,
+    GraphHistory,
+    GraphReplaced,
+    GraphSnapshot,
+)
+from .text_index import TextIndex
 
 
 class Workspace:
@@ -9,43 +22,85 @@ class Workspace:
 
     Responsibilities:
     - Manage current graph state
-    - Maintain history (undo support)
+    - Maintain history (undo support, stored as deltas and bounded in depth and bytes)
     - Provide backend search/filter capabilities
     - Act as stable integration layer for CLI and Web
     """
 
-    def __init__(self):
+    def __init__(self, max_history: Optional[int] = DEFAULT_HISTORY_DEPTH,
+                 max_history_bytes: Optional[int] = DEFAULT_HISTORY_BYTES):
         self._current_graph: Optional[Graph] = None
-        self._history: List[Graph] = []
+        self._history = GraphHistory(max_history, max_history_bytes)
+        self._attribute_indexes: dict = {}
+        self._search_index: Optional[TextIndex] = None
+
+    def __getstate__(self) -> dict:
+        # Indexes are caches, a pickled workspace rebuilds them on the first search
+        state = self.__dict__.copy()
+        state["_attribute_indexes"] = {}
+        state["_search_index"] = None
+        return state
 
     # ==========================================================
     # GRAPH STATE MANAGEMENT
     # ==========================================================
 
     def set_graph(self, graph: Graph) -> None:
-        if self._current_graph is not None:
-            self._history.append(self._current_graph)
+        # Search/filter results are subgraphs of the current graph, for those only the
+        # removed part is remembered. Anything else keeps the previous graph as a whole.
+        previous = self._current_graph
+        if previous is not None:
+            entry = None
+            if isinstance(graph, GraphView) and graph.parent is previous:
+                # The view keeps the previous graph alive anyway and never writes to it
+                entry = GraphSnapshot(previous, shared=True)
+            elif graph is not previous:
+                entry = GraphReplaced.capture(previous, graph)
+            self._history.push(entry or GraphSnapshot(previous, shared=graph is previous))
+        if graph is not previous:
+            self._drop_attribute_indexes()
+            self._search_index = None
         self._current_graph = graph
 
     def get_graph(self) -> Optional[Graph]:
         return self._current_graph
 
+    def _editable_graph(self) -> Graph:
+        # A memory-mapped snapshot (e.g. a graph session loaded from a shared backend) is
+        # read-only, the first change swaps it for a GraphView sharing its nodes and edges
+        if isinstance(self._current_graph, MappedGraph):
+            self._current_graph = GraphView(self._current_graph)
+            self._drop_attribute_indexes()
+            self._search_index = None
+        return self._current_graph
+
     def has_graph(self) -> bool:
         return self._current_graph is not None
 
     def clear(self) -> None:
         self._current_graph = None
         self._history.clear()
+        self._drop_attribute_indexes()
+        self._search_index = None
 
     def undo(self) -> Optional[Graph]:
-        if not self._history:
+        entry = self._history.pop()
+        if entry is None:
             return None
-        self._current_graph = self._history.pop()
+        if self._current_graph is not None:
+            self._editable_graph()
+        self._current_graph = entry.undo(self._current_graph)
+        self._drop_attribute_indexes()
+        self._search_index = None
         return self._current_graph
 
     def history_size(self) -> int:
         return len(self._history)
 
+    def history_bytes(self) -> int:
+        # Estimated memory kept alive by the undo history
+        return self._history.nbytes
+
     # ==========================================================
     # NODE OPERATIONS
     # ==========================================================
@@ -56,12 +111,17 @@ class Workspace:
         # If an id already exists throw error
         if not self._current_graph:
             raise ValueError("No active graph loaded")
+        self._editable_graph()
 
         if self._current_graph.get_node(str(node_id)) is not None:
             raise ValueError(f"Node '{node_id}' already exists")
 
         node = Node(node_id=str(node_id), attributes=properties or {})
         self._current_graph.add_node(node)
+        self._history.push(ElementAdded("node", node.node_id))
+        self._drop_attribute_indexes()
+        if self._search_index is not None:
+            self._search_index.add(node)
 
     # Method for editing an existing Node for CLI implementation
     def edit_node(self, node_id: str, properties: dict) -> None:
@@ -69,33 +129,50 @@ class Workspace:
 
         if not self._current_graph:
             raise ValueError("No active graph loaded")
+        self._editable_graph()
 
-        node = self._current_graph.get_node(str(node_id))
-        if node is None:
+        previous = self._current_graph.get_node(str(node_id))
+        if previous is None:
             raise ValueError(f"Node '{node_id}' not found")
 
+        # A graph sharing its nodes (GraphView) hands out a private copy to change
+        node = self._current_graph.mutable_node(str(node_id))
+        self._history.push(AttributesPatched.capture("node", node, (properties or {}).keys()))
         for k, v in (properties or {}).items():
             node.attributes[k] = v # update
 
+        # Typed columns and indexes of the edited attributes no longer match the nodes,
+        # a copied node is not the one the other indexes hold either
+        self._current_graph.drop_node_columns((properties or {}).keys())
+        self._drop_attribute_indexes((properties or {}).keys() if node == previous else None)
+        if self._search_index is not None:
+            self._search_index.update(node)
+
     # Method for deleting an existing Node for CLI implementation
     def delete_node(self, node_id: str) -> None:
         # Deleting a Node only if he is not connected to any edge
         if not self._current_graph:
             raise ValueError("No active graph loaded")
+        self._editable_graph()
 
         node_id = str(node_id)
         node = self._current_graph.get_node(node_id)
         if node is None:
             raise ValueError(f"Node '{node_id}' not found")
 
-        attached = [e for e in self._current_graph.edges if e.source == node_id or e.target == node_id]
+        attached = self._current_graph.degree(node_id)
         if attached:
             raise ValueError(
-                f"Node '{node_id}' has {len(attached)} connected edge(s)"
+                f"Node '{node_id}' has {attached} connected edge(s)"
                 f"Delete edges first"
             )
 
-        self._current_graph.nodes = [n for n in self._current_graph.nodes if n.node_id != node_id]
+        index = self._current_graph.node_position(node_id)
+        removed = self._current_graph.remove_node(node_id)
+        self._history.push(ElementRemoved("node", removed, index))
+        self._drop_attribute_indexes()
+        if self._search_index is not None:
+            self._search_index.remove(node_id)
 
     def list_nodes(self) -> List[Node]:
         if not self._current_graph:
@@ -149,36 +226,18 @@ class Workspace:
         if not normalized_query:
             return []
 
-        def stringify(value) -> str:
-            if isinstance(value, (datetime.date, datetime.datetime)):
-                return value.isoformat()
-            if value is None:
-                return ""
-            return str(value)
-
-        matched_nodes: List[Node] = []
-        for node in self._current_graph.nodes:
-            if allowed_node_ids is not None and node.node_id not in allowed_node_ids:
-                continue
-
-            if normalized_query in stringify(node.label).casefold():
-                matched_nodes.append(node)
-                continue
-
-            if normalized_query in stringify(node.node_id).casefold():
-                matched_nodes.append(node)
-                continue
-
-            attributes = node.attributes if isinstance(node.attributes, dict) else {}
-            for key, value in attributes.items():
-                if normalized_query in stringify(key).casefold():
-                    matched_nodes.append(node)
-                    break
-                if normalized_query in stringify(value).casefold():
-                    matched_nodes.append(node)
-                    break
+        index = self._text_index()
+        return [
+            self._current_graph.get_node(node_id)
+            for node_id in index.search(normalized_query, allowed_node_ids)
+        ]
 
-        return matched_nodes
+    # The text index is built on the first search and kept up to date by
+    # create/edit/delete_node. Replacing the graph (set_graph, undo, clear) drops it.
+    def _text_index(self) -> TextIndex:
+        if self._search_index is None:
+            self._search_index = TextIndex(self._current_graph.nodes)
+        return self._search_index
 
     @staticmethod
     def _resolve_node_filter_value(node: Node, attribute: str):
@@ -282,31 +341,34 @@ class Workspace:
     # Filters nodes by comparing a selected attribute with a given value using the chosen operator.
     # It first detects the attribute type, validates which operators are allowed for that type, and then returns all matching nodes.
     def find_nodes_by_attribute(self, attribute: str, operator: str, value):
-        ops = {
-            "==": lambda a, b: a == b,
-            "!=": lambda a, b: a != b,
-            ">":  lambda a, b: a > b,
-            ">=": lambda a, b: a >= b,
-            "<":  lambda a, b: a < b,
-            "<=": lambda a, b: a <= b,
-        }
+        bound = self._bind_attribute_filter(attribute, operator, value)
+        if bound is None:
+            return []
+        index, coerced_value = bound
+        return index.find(operator, coerced_value)
 
-        op_fn = ops.get(operator)
-        if op_fn is None:
-            raise ValueError(f"Unsupported operator: {operator}")
+    # Evaluates a compound filter expression (see filter_expression) against the current
+    # graph. Every condition is validated first, then the plan is evaluated on node positions.
+    def find_nodes_by_filter_expression(self, expression: str) -> List[Node]:
+        if not self._current_graph:
+            return []
 
-        target_type = None
-        for node in self.list_nodes():
-            raw = self._resolve_node_filter_value(node, attribute)
-            if raw is None:
-                continue
+        plan = parse_filter_expression(expression)
+        plan.bind(self._bind_attribute_filter)
 
-            target_type = self._detect_filter_type(raw)
-            if target_type is not None:
-                break
+        nodes = list(self.list_nodes())
+        return [nodes[p] for p in sorted(plan.evaluate(len(nodes)))]
+
+    # Checks the operator and value of a filter against the attribute type and returns the
+    # attribute index with the converted value, or None when no node has a filterable value.
+    def _bind_attribute_filter(self, attribute: str, operator: str, value):
+        if operator not in ("==", "!=", ">", ">=", "<", "<="):
+            raise ValueError(f"Unsupported operator: {operator}")
 
+        index = self._attribute_index(attribute)
+        target_type = index.target_type if index is not None else None
         if target_type is None:
-            return []
+            return None
 
         allowed_operators_by_type = {
             str: {"==", "!="},
@@ -324,21 +386,61 @@ class Workspace:
             )
 
         coerced_value = self._convert_filter_value(value, target_type, attribute)
-        result = []
+        return index, coerced_value
 
-        for node in self.list_nodes():
+    # Indexes are built the first time an attribute is filtered on and reused until the
+    # graph changes. create/edit/delete_node drop the indexes they affect, replacing the
+    # graph (set_graph, undo, clear) drops all of them.
+    def _attribute_index(self, attribute: str):
+        if not self._current_graph:
+            return None
+
+        index = self._attribute_indexes.get(attribute)
+        if index is not None:
+            return index
+
+        nodes = list(self.list_nodes())
+
+        # The attribute type is the type of the first value that has a filterable type
+        target_type = None
+        for node in nodes:
             raw = self._resolve_node_filter_value(node, attribute)
             if raw is None:
                 continue
 
-            normalized_raw = self._normalize_raw_for_type(raw, target_type)
-            if normalized_raw is None:
-                continue
+            target_type = self._detect_filter_type(raw)
+            if target_type is not None:
+                break
+
+        if target_type is None:
+            return None
+
+        # Numeric attributes stored as a typed array are indexed without leaving the array
+        column = self._current_graph.node_column(attribute)
+        if column is not None and target_type in (int, float) and column.dtype.kind in "iuf":
+            index = ColumnIndex(nodes, target_type, column)
+        else:
+            entries = []
+            for position, node in enumerate(nodes):
+                raw = self._resolve_node_filter_value(node, attribute)
+                if raw is None:
+                    continue
 
-            if op_fn(normalized_raw, coerced_value):
-                result.append(node)
+                normalized_raw = self._normalize_raw_for_type(raw, target_type)
+                if normalized_raw is not None:
+                    entries.append((position, normalized_raw))
 
-        return result
+            index = AttributeIndex(nodes, target_type, entries, ordered=target_type is not str)
+
+        self._attribute_indexes[attribute] = index
+        return index
+
+    def _drop_attribute_indexes(self, attributes=None) -> None:
+        if attributes is None:
+            self._attribute_indexes.clear()
+            return
+        for attribute in attributes:
+            self._attribute_indexes.pop(attribute, None)
 
 
     # -----------------
@@ -370,6 +472,7 @@ class Workspace:
     def create_edge(self, source_id: str, target_id: str, edge_id: Optional[str], properties: dict) -> None:
         if not self._current_graph:
             raise ValueError("No active graph loaded")
+        self._editable_graph()
 
         # Check if nodes exist
         if not self._current_graph.get_node(source_id):
@@ -378,7 +481,7 @@ class Workspace:
             raise ValueError(f"Target node '{target_id}' does not exist")
 
         # ID check
-        if edge_id and any(e.edge_id == edge_id for e in self._current_graph.edges):
+        if edge_id and self._current_graph.get_edge(edge_id) is not None:
             raise ValueError(f"Edge '{edge_id}' already exists")
 
         # Get weight if exist in properties
@@ -392,16 +495,22 @@ class Workspace:
             attributes=properties
         )
         self._current_graph.add_edge(edge)
+        self._history.push(ElementAdded("edge", edge.edge_id))
 
     def edit_edge(self, edge_id: str, properties: dict) -> None:
         if not self._current_graph:
             raise ValueError("No active graph loaded")
+        self._editable_graph()
 
         # Find
-        edge = next((e for e in self._current_graph.edges if e.edge_id == edge_id), None)
+        edge = self._current_graph.mutable_edge(edge_id)
         if edge is None:
             raise ValueError(f"Edge '{edge_id}' not found")
 
+        self._history.push(
+            AttributesPatched.capture("edge", edge, properties.keys() - {"weight"}, "weight" in properties)
+        )
+
         # Update weight if sent
         if "weight" in properties:
             edge.weight = float(properties.pop("weight"))
@@ -413,9 +522,11 @@ class Workspace:
     def delete_edge(self, edge_id: str) -> None:
         if not self._current_graph:
             raise ValueError("No active graph loaded")
+        self._editable_graph()
 
-        initial_count = len(self._current_graph.edges)
-        self._current_graph.edges = [e for e in self._current_graph.edges if e.edge_id != edge_id]
-
-        if len(self._current_graph.edges) == initial_count:
+        if self._current_graph.get_edge(edge_id) is None:
             raise ValueError(f"Edge '{edge_id}' not found")
+
+        index = self._current_graph.edge_position(edge_id)
+        removed = self._current_graph.remove_edge(edge_id)
+        self._history.push(ElementRemoved("edge", removed, index))
@@ -0,0 +1 @@
+"""Binary snapshot datasource plugin package."""
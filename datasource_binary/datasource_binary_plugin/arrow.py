@@ -0,0 +1,199 @@
+# Apache Arrow IPC and Parquet tables loaded straight into a GraphStore
+#
+# pyarrow is an optional dependency (pip install datasource-binary-plugin[arrow]).
+# Tables are converted a column at a time with to_pylist(), rows go into the store
+# columns directly, so no Node/Edge objects are built for them.
+#
+# A table with source and target columns is an edge list (its endpoints become the
+# nodes, in order of appearance), a table with an id column is a node list. As with the
+# CSV plugin, every other column is an attribute and empty (null) cells are skipped.
+# In a node list, a reference column (parent, manager, *_id, ...) whose value is the
+# ID of another node gives an edge instead of an attribute, like CSV node lists do.
+
+from typing import Any, Dict, List, Optional
+
+from api.graph_api.datasource_common.type_inference import infer_type
+from api.graph_api.model import CompactGraph, GraphStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ID_COLUMNS = ("id", "ID", "@id")
+LABEL_COLUMNS = ("label", "name", "title")
+EDGE_COLUMNS = {"source", "target", "id", "weight", "directed"}
+
+# Same reference columns as the CSV plugin
+REFERENCE_COLUMNS = {
+    "parent", "ref", "reference",
+    "source", "target", "from", "to",
+    "friend", "best_friend", "also_knows",
+    "manager", "owner", "connects_to", "backup_to",
+    "next_city", "next", "linked_to",
+}
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ValueError("Reading Arrow and Parquet files needs pyarrow (pip install pyarrow).")
+
+
+def read_table(path: str, file_format: str) -> "pa.Table":
+    require_pyarrow()
+    if file_format == "parquet":
+        return pa.parquet.read_table(path, memory_map=True)
+
+    # Arrow IPC, either the file (random access) or the stream format
+    source = pa.memory_map(path, "r")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def table_to_graph(table: "pa.Table", directed: bool = True) -> CompactGraph:
+    lower = {name.lower(): name for name in table.column_names}
+    if "source" in lower and "target" in lower:
+        return _edge_table_to_graph(table, lower, directed)
+
+    id_column = next((name for name in ID_COLUMNS if name in table.column_names), None)
+    if id_column is None:
+        raise ValueError("Arrow table needs either source/target columns (edges) or an id column (nodes).")
+    return _node_table_to_graph(table, id_column, directed)
+
+
+def is_reference_column(name: str) -> bool:
+    normalized = name.strip().lower()
+    return normalized in REFERENCE_COLUMNS or normalized.endswith("_id") or normalized.endswith("_ref")
+
+
+def _weight(value: Any) -> float:
+    # Weights that are missing or not numbers are 1.0, as in the CSV and JSON plugins
+    if isinstance(value, str):
+        value = infer_type(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def _column(table: "pa.Table", name: Optional[str]) -> Optional[List[Any]]:
+    return None if name is None else table.column(name).to_pylist()
+
+
+def _typed_column(table: "pa.Table", name: str) -> Optional[Any]:
+    # Numeric columns without nulls are kept as typed node columns, as infer_column does for CSV
+    if np is None:
+        return None
+    column = table.column(name)
+    if column.null_count or not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+        return None
+    return column.to_numpy().astype(np.int64 if pa.types.is_integer(column.type) else np.float64)
+
+
+def _rows(columns: Dict[str, List[Any]], count: int):
+    # Attribute dictionaries of every row, null cells left out
+    names = list(columns)
+    values = [columns[name] for name in names]
+    for row in range(count):
+        yield {name: column[row] for name, column in zip(names, values) if column[row] is not None}
+
+
+def _node_table_to_graph(table: "pa.Table", id_column: str, directed: bool) -> CompactGraph:
+    store = GraphStore(directed=directed)
+    label_column = next((name for name in LABEL_COLUMNS if name in table.column_names), None)
+    attribute_names = [
+        name for name in table.column_names
+        if name not in ID_COLUMNS and name not in LABEL_COLUMNS
+    ]
+
+    node_ids = [
+        f"row_{row + 1}" if node_id in (None, "") else str(node_id)
+        for row, node_id in enumerate(_column(table, id_column))
+    ]
+    labels = _column(table, label_column) or [None] * table.num_rows
+    attributes = _rows({name: _column(table, name) for name in attribute_names}, table.num_rows)
+
+    # Reference values are checked against every ID of the table, so they may point forward
+    id_registry = set(node_ids)
+    reference_names = [name for name in attribute_names if is_reference_column(name)]
+    references = []
+    linked_columns = set()
+
+    for node_id, label, values in zip(node_ids, labels, attributes):
+        if node_id in store.node_index:
+            raise ValueError(f"Node '{node_id}' already exists.")
+
+        for name in reference_names:
+            value = values.get(name)
+            if value is None:
+                continue
+            target = str(value).strip()
+            if target and target in id_registry and target != node_id:
+                del values[name]
+                references.append((node_id, target))
+                linked_columns.add(name)
+
+        store.append_node(node_id, None if label is None else str(label), values)
+
+    # Reference edges come after all nodes, in row order, with generated IDs
+    node_index = store.node_index
+    for serial, (source, target) in enumerate(references, 1):
+        store.append_edge(None, node_index[source], node_index[target], 1.0, True, None, serial=serial)
+
+    graph = CompactGraph(directed=directed, store=store)
+    graph._edge_counter = len(references)
+    for name in attribute_names:
+        # A column that gave edges has gaps where the values were
+        column = None if name in linked_columns else _typed_column(table, name)
+        if column is not None:
+            graph.set_node_column(name, column)
+    return graph
+
+
+def _edge_table_to_graph(table: "pa.Table", lower: Dict[str, str], directed: bool) -> CompactGraph:
+    store = GraphStore(directed=directed)
+    attribute_names = [name for name in table.column_names if name.lower() not in EDGE_COLUMNS]
+
+    sources = _column(table, lower["source"])
+    targets = _column(table, lower["target"])
+    edge_ids = _column(table, lower.get("id")) or [None] * table.num_rows
+    weights = _column(table, lower.get("weight")) or [None] * table.num_rows
+    attributes = _rows({name.lower(): _column(table, name) for name in attribute_names}, table.num_rows)
+
+    serial = 0
+    seen_edge_ids = set()
+    for source, target, edge_id, weight, values in zip(sources, targets, edge_ids, weights, attributes):
+        if source in (None, "") or target in (None, ""):
+            continue
+
+        endpoints = []
+        for node_id in (str(source), str(target)):
+            index = store.node_index.get(node_id)
+            if index is None:
+                index = store.append_node(node_id)
+            endpoints.append(index)
+
+        weight = _weight(weight)
+        if edge_id in (None, ""):
+            serial += 1
+            store.append_edge(None, endpoints[0], endpoints[1], weight, directed, values, serial=serial)
+        else:
+            edge_id = str(edge_id)
+            if edge_id in seen_edge_ids:
+                raise ValueError(f"Edge '{edge_id}' already exists.")
+            seen_edge_ids.add(edge_id)
+            store.append_edge(edge_id, endpoints[0], endpoints[1], weight, directed, values)
+
+    graph = CompactGraph(directed=directed, store=store)
+    graph._edge_counter = serial
+    return graph
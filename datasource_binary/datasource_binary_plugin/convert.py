@@ -0,0 +1,53 @@
+# Converts a graph file to a snapshot once, so later loads skip parsing:
+#
+#     python -m datasource_binary_plugin.convert export.csv export.gsnap
+#     python -m datasource_binary_plugin.convert data.json data.gsnap --datasource json --option directed=false
+#
+# The input is loaded by any registered datasource plugin, picked from the extension
+# unless --datasource is given. Options are passed to it as strings, "true"/"false"
+# become booleans.
+
+import argparse
+import os.path
+import sys
+from api.graph_api.model.binary import write_graph
+from core.graph_platform.registry import PluginRegistry
+
+
+def _option_value(value: str) -> object:
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    return value
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Convert a graph file to a binary graph snapshot.")
+    parser.add_argument("source", help="Input file")
+    parser.add_argument("output", help="Snapshot file to write (.gsnap)")
+    parser.add_argument("--datasource", help="Datasource plugin to load the input with (default: from the extension)")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE", help="Datasource option")
+    args = parser.parse_args(argv)
+
+    registry = PluginRegistry()
+    datasource_name = args.datasource or os.path.splitext(args.source)[1].lstrip(".").lower()
+    datasource_cls = registry.get_datasource(datasource_name)
+    if datasource_cls is None:
+        available = ", ".join(sorted(registry.list_datasources()))
+        parser.error(f"No datasource plugin '{datasource_name}'. Available: {available}.")
+
+    options = {}
+    for option in args.option:
+        key, separator, value = option.partition("=")
+        if not separator:
+            parser.error(f"Option '{option}' is not KEY=VALUE.")
+        options[key.strip()] = _option_value(value)
+
+    graph = datasource_cls().load_graph(args.source, **options)
+    write_graph(graph, args.output)
+    print(f"Wrote {len(graph.nodes)} nodes and {len(graph.edges)} edges to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
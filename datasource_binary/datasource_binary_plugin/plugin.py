@@ -0,0 +1,110 @@
+import os.path
+from typing import Any
+from api.graph_api.datasource_common.base import BaseDatasourcePlugin
+from api.graph_api.model import Graph
+from api.graph_api.model.binary import MAGIC, open_graph
+from . import arrow
+
+FORMAT_BY_EXTENSION = {
+    ".gsnap": "snapshot",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".parquet": "parquet",
+}
+
+# Leading bytes of each format, for files with another extension (e.g. uploads)
+FORMAT_BY_MAGIC = {
+    MAGIC: "snapshot",
+    b"ARROW1": "arrow",
+    b"PAR1": "parquet",
+}
+
+
+class BinaryDatasourcePlugin(BaseDatasourcePlugin):
+    """
+        Loads pre-processed graphs without parsing text
+
+        Supported formats:
+            Graph snapshots written by api.graph_api.write_graph (.gsnap)
+            Apache Arrow IPC (.arrow/.feather/.ipc) and Parquet tables, when pyarrow is installed
+
+        Graphs are loaded straight into columnar storage (CompactGraph). A snapshot can
+        also be opened memory-mapped and read-only, which makes loading near-instant.
+        See datasource_binary_plugin.convert for turning CSV/JSON exports into snapshots.
+        """
+
+    @property
+    def plugin_id(self) -> str:
+        return "binary"
+
+    @property
+    def display_name(self) -> str:
+        return "Binary graph snapshot"
+
+    def parameters_schema(self) -> dict:
+        return {
+            "file_path": {
+                "type": "str",
+                "label": "Path to snapshot, Arrow or Parquet file",
+                "required": True
+            },
+            "format": {
+                "type": "str",
+                "label": "Format: snapshot, arrow or parquet (leave empty for auto-detect)",
+                "required": False
+            },
+            "directed": {
+                "type": "bool",
+                "label": "Directed graph (Arrow/Parquet only, snapshots keep their own)",
+                "required": False,
+                "default": True
+            },
+            "mapped": {
+                "type": "bool",
+                "label": "Read-only memory-mapped snapshot (the file must stay in place)",
+                "required": False,
+                "default": False
+            }
+        }
+
+    def load_graph(self, source: Any, **options: Any) -> Graph:
+        # The parsed source already is the graph, nothing goes through the dict based
+        # node/edge building of the base class
+        return self._parse_source(source, **options)
+
+    def _parse_source(self, source: Any, **options: Any) -> Graph:
+        # Reads a snapshot, Arrow or Parquet file straight into a graph
+        path = self._resolve_path(source, options)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Graph file not found: {path}")
+
+        file_format = options.get("format") or self._detect_format(path)
+        if file_format == "snapshot":
+            snapshot = open_graph(path)
+            if options.get("mapped"):
+                return snapshot
+            try:
+                return snapshot.to_compact_graph()
+            finally:
+                snapshot.close()
+
+        if file_format not in ("arrow", "parquet"):
+            raise ValueError(f"Unknown binary graph format '{file_format}'. Available: arrow, parquet, snapshot.")
+        if options.get("mapped"):
+            raise ValueError("Only graph snapshots can be memory-mapped.")
+        table = arrow.read_table(path, file_format)
+        return arrow.table_to_graph(table, directed=bool(options.get("directed", True)))
+
+    @staticmethod
+    def _detect_format(path: str) -> str:
+        file_format = FORMAT_BY_EXTENSION.get(os.path.splitext(path)[1].lower())
+        if file_format is not None:
+            return file_format
+
+        with open(path, "rb") as f:
+            head = f.read(len(MAGIC))
+        for magic, file_format in FORMAT_BY_MAGIC.items():
+            if head.startswith(magic):
+                return file_format
+        raise ValueError(f"Unrecognized binary graph file: {path}")
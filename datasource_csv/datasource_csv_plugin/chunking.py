@@ -0,0 +1,79 @@
+# Helpers for splitting a CSV file into byte ranges that can be parsed independently
+#
+# A newline only ends a record when it is outside a quoted field. Quotes inside a
+# field are escaped by doubling them (""), so we are outside of quotes exactly when
+# the number of quote characters seen since the last record boundary is even.
+
+import os
+from typing import List
+
+BLOCK_SIZE = 1 << 20
+
+
+def _next_record_end(f, pos: int, inside_quotes: bool = False) -> int:
+    # Returns the offset just after the first record-ending newline at or after pos
+    # (or the file size if there is none). inside_quotes is the quote state at pos.
+    f.seek(pos)
+
+    while True:
+        block = f.read(BLOCK_SIZE)
+        if not block:
+            return pos
+
+        start = 0
+        while True:
+            newline = block.find(b"\n", start)
+            if newline == -1:
+                inside_quotes ^= bool(block.count(b'"', start) & 1)
+                break
+
+            inside_quotes ^= bool(block.count(b'"', start, newline) & 1)
+            if not inside_quotes:
+                return pos + newline + 1
+            start = newline + 1
+
+        pos += len(block)
+
+
+def header_end(path: str) -> int:
+    # Byte offset where the first data row starts
+    with open(path, "rb") as f:
+        return _next_record_end(f, 0)
+
+
+def find_chunk_boundaries(path: str, start: int, chunks: int) -> List[int]:
+    """
+    Splits the byte range [start, file size) into roughly equal chunks that begin
+    and end on record boundaries.
+
+    Returns the sorted list of boundary offsets, including start and the file size,
+    so chunk i is [boundaries[i], boundaries[i + 1]).
+    """
+    size = os.path.getsize(path)
+    boundaries = [start]
+
+    with open(path, "rb") as f:
+        pos = start
+        for i in range(1, chunks):
+            target = start + (size - start) * i // chunks
+            if target <= pos:
+                continue
+
+            # Quote state at the target offset, counted from the last boundary
+            inside_quotes = False
+            f.seek(pos)
+            while pos < target:
+                block = f.read(min(BLOCK_SIZE, target - pos))
+                if not block:
+                    break
+                inside_quotes ^= bool(block.count(b'"') & 1)
+                pos += len(block)
+
+            boundary = _next_record_end(f, pos, inside_quotes)
+            if boundary >= size:
+                break
+            boundaries.append(boundary)
+            pos = boundary
+
+    boundaries.append(size)
+    return boundaries
@@ -1,7 +1,83 @@
 import csv
+import io
 import os.path
-from typing import Any, List, Dict
-from api.graph_api.datasource_common.base import BaseDatasourcePlugin
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from api.graph_api.datasource_common.base import BaseDatasourcePlugin, iter_batches
+from api.graph_api.datasource_common.type_inference import concat_columns, infer_column
+from api.graph_api.model import Edge
+from .chunking import find_chunk_boundaries, header_end
+
+# Size of the byte ranges an edge list is split into for the worker processes
+# Files that do not fill two of them are parsed in the current process
+CHUNK_BYTES = 1 << 22
+
+# Chunks every worker may have queued or finished ahead of the one the graph needs next
+CHUNKS_AHEAD = 2
+
+# sources, targets, edge IDs (None when no row has one), weights, directed flags,
+# attribute name -> one value per edge (None where the row does not have it)
+EdgeColumns = Tuple[List[str], List[str], Optional[List[Optional[str]]], array, bytearray, Dict[str, list]]
+
+
+def _parse_edge_chunk(path: str, start: int, end: int, fieldnames: List[str], delimiter: str, directed: bool) -> EdgeColumns:
+    # Runs in a worker process, parses and type-infers one byte range of an edge list
+    # The edges go back as columns, which pickle far smaller and faster than Edge objects
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    text = io.StringIO(data.decode('utf-8'), newline=None)
+    rows = csv.DictReader(text, fieldnames=fieldnames, delimiter=delimiter, skipinitialspace=True)
+    plugin = CsvDatasourcePlugin()
+
+    sources: List[str] = []
+    targets: List[str] = []
+    ids: List[Optional[str]] = []
+    weights = array("d")
+    flags = bytearray()
+    attributes: Dict[str, list] = {}
+    for count, edge in enumerate(plugin._iter_edges(plugin._parse_edge_list(rows), directed)):
+        sources.append(edge.source)
+        targets.append(edge.target)
+        ids.append(edge.edge_id)
+        weights.append(edge.weight)
+        flags.append(edge.directed)
+        for key, value in edge.attributes.items():
+            column = attributes.get(key)
+            if column is None:
+                column = attributes[key] = [None] * count
+            column.append(value)
+        for column in attributes.values():
+            if len(column) == count:
+                column.append(None)
+
+    if not any(ids):
+        ids = None
+    return sources, targets, ids, weights, flags, attributes
+
+
+def _edges_from_columns(columns: EdgeColumns) -> List[Edge]:
+    # Turns the columns of one chunk back into edges, in the order of the file
+    sources, targets, ids, weights, flags, attributes = columns
+    keys = list(attributes)
+    values = list(zip(*attributes.values())) if keys else [()] * len(sources)
+    if ids is None:
+        ids = [None] * len(sources)
+
+    return [
+        Edge(
+            source=source,
+            target=target,
+            edge_id=edge_id,
+            weight=weight,
+            directed=bool(flag),
+            attributes={key: value for key, value in zip(keys, row) if value is not None},
+        )
+        for source, target, edge_id, weight, flag, row in zip(sources, targets, ids, weights, flags, values)
+    ]
 
 
 class CsvDatasourcePlugin(BaseDatasourcePlugin):
@@ -42,6 +118,18 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
                 "label": "Directed graph",
                 "required": False,
                 "default": True
+            },
+            "compact": {
+                "type": "bool",
+                "label": "Compact in-memory storage (for large files)",
+                "required": False,
+                "default": False
+            },
+            "workers": {
+                "type": "int",
+                "label": "Worker processes for large edge lists",
+                "required": False,
+                "default": 1
             }
         }
 
@@ -65,6 +153,7 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
 
     def _parse_source(self, source: Any, **kwargs) -> dict:
         # Reads the CSV file and returns the expected dict
+        # Edge lists are not read here, their rows are streamed into the graph by the base class
 
         delimiter = kwargs.get("delimiter")
 
@@ -85,26 +174,74 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
                     delimiter = ','  # fallback to comma
 
             reader = csv.DictReader(f, delimiter=delimiter, skipinitialspace=True)
-            rows = list(reader)
+            fieldnames = reader.fieldnames or []
+            has_rows = next(reader, None) is not None
 
-        if not rows:
+        if not has_rows:
             return {"nodes": [], "edges": []}
 
         # Detect format based on column names
-        normalized = {name.lower() for name in rows[0].keys() if isinstance(name, str)}
+        normalized = {name.lower() for name in fieldnames if isinstance(name, str)}
 
         if "source" in normalized and "target" in normalized:
             # Each row describes an edge
-            return self._parse_edge_list(rows)
+            # Nodes are implicit, the base class creates them from edge endpoints as rows arrive
+            workers = int(kwargs.get("workers") or 1)
+            if workers > 1:
+                directed = bool(kwargs.get("directed", True))
+                edge_batches = self._parse_edge_list_parallel(path, delimiter, fieldnames, workers, directed)
+                if edge_batches is not None:
+                    return {"nodes": [], "edge_batches": edge_batches, "implicit_nodes": True}
+
+            return {
+                "nodes": [],
+                "edges": self._parse_edge_list(self._iter_rows(path, delimiter)),
+                "implicit_nodes": True,
+            }
         else:
             # Each row describes a node
-            return self._parse_node_list(rows)
+            return self._parse_node_list(path, delimiter, fieldnames)
 
-    def _parse_edge_list(self, rows: List[Dict]) -> dict:
+    @staticmethod
+    def _iter_rows(path: str, delimiter: str) -> Iterator[Dict]:
+        # Yields CSV rows one at a time, the file stays open only while rows are being consumed
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from csv.DictReader(f, delimiter=delimiter, skipinitialspace=True)
+
+    def _parse_edge_list_parallel(
+        self, path: str, delimiter: str, fieldnames: List[str], workers: int, directed: bool
+    ) -> Optional[Iterator[List[Edge]]]:
+        # Splits the file at record boundaries into chunks of about CHUNK_BYTES and parses
+        # them in a process pool. The graph takes the chunks in file order while the workers
+        # parse the next ones, so edge order and auto IDs match the serial path and only
+        # CHUNKS_AHEAD chunks per worker wait in memory.
+        # Returns None when the file is too small to be worth splitting
+
+        data_start = header_end(path)
+        chunks = -(-(os.path.getsize(path) - data_start) // CHUNK_BYTES)
+        if chunks < 2:
+            return None
+
+        boundaries = find_chunk_boundaries(path, data_start, chunks)
+        workers = min(workers, len(boundaries) - 1)
+
+        def edge_batches() -> Iterator[List[Edge]]:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for start, end in zip(boundaries, boundaries[1:]):
+                    pending.append(
+                        executor.submit(_parse_edge_chunk, path, start, end, fieldnames, delimiter, directed)
+                    )
+                    if len(pending) > workers * CHUNKS_AHEAD:
+                        yield _edges_from_columns(pending.popleft().result())
+                while pending:
+                    yield _edges_from_columns(pending.popleft().result())
+
+        return edge_batches()
+
+    def _parse_edge_list(self, rows: Iterable[Dict]) -> Iterator[dict]:
         # Parses a CSV where each row describes one graph edge
-
-        nodes = {}  # dict to avoid duplicate nodes
-        edges = []
+        # Generator, so only the row currently being converted is held in memory
 
         for row in rows:
             # Normalize keys to lowercase to handle Source/SOURCE/source etc.
@@ -116,12 +253,6 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
             if not src or not dst:
                 continue
 
-            # Register nodes implicitly edge list has no node attributes
-            if src not in nodes:
-                nodes[src] = {"id": src, "label": src}
-            if dst not in nodes:
-                nodes[dst] = {"id": dst, "label": dst}
-
             # directed defaults to True if column missing or empty
             directed_raw = row_lower.get("directed", "")
             directed = directed_raw not in ("False", "false", "0")
@@ -148,34 +279,87 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
                 edge_dict["weight"] = weight
 
             edge_dict.update(attributes)
-            edges.append(edge_dict)
+            yield edge_dict
 
-        return {"nodes": list(nodes.values()), "edges": edges}
-
-    def _parse_node_list(self, rows: List[Dict]) -> dict:
+    def _parse_node_list(self, path: str, delimiter: str, fieldnames: List[str]) -> dict:
         # Parses a CSV where each row describes one graph node
-        # Two passes here, one for collecting all ids and the other for building nodes and detecting edges
+        # Two streaming passes over the file, one for collecting all ids and the other for
+        # building nodes and detecting edges. Only the set of ids is kept between the passes.
+
+        id_columns = [key for key in ("id", "ID", "@id") if key in fieldnames]
 
-        nodes = []
-        edges = []
-        id_registry = set()
+        # Classify every column once per header instead of once per cell
+        reserved = {"id", "ID", "@id", "label", "name", "title"}
+        attribute_columns = [
+            (key, self._is_reference_field(key))
+            for key in dict.fromkeys(fieldnames)
+            if key is not None and key not in reserved
+        ]
 
         # First pass collect all node IDs
-        for i, row in enumerate(rows):
-            node_id = self._get_row_id(row, i)
-            id_registry.add(node_id)
+        id_registry = {
+            self._get_row_id(row, i, id_columns)
+            for i, row in enumerate(self._iter_rows(path, delimiter))
+        }
 
-        # Second pass build nodes and edges
-        for i, row in enumerate(rows):
-            node_id = self._get_row_id(row, i)
+        # Second pass is lazy, the base class consumes the nodes first and the
+        # reference edges found along the way are appended to this list
+        edges: List[dict] = []
+        node_columns: Dict[str, Any] = {}
+        rows = self._iter_node_list(path, delimiter, id_columns, attribute_columns, id_registry, edges)
+        nodes = self._type_node_columns(rows, [key for key, _ in attribute_columns], node_columns)
+        return {"nodes": nodes, "edges": edges, "node_columns": node_columns, "typed_nodes": True}
+
+    @staticmethod
+    def _type_node_columns(nodes: Iterable[dict], keys: List[str], node_columns: Dict[str, Any]) -> Iterator[dict]:
+        # Types the attribute columns a batch of rows at a time with infer_column, which is the
+        # only inference pass: the typed values go back into the rows, and the base class
+        # takes them as they are (typed_nodes)
+        # Columns that are typed arrays in every batch end up in node_columns once all rows are read
+        # Columns with empty cells, reference values or text are dropped at the first batch that has them
+        parts: Dict[str, list] = {key: [] for key in keys}
+
+        for batch in iter_batches(nodes):
+            for key in keys:
+                column = infer_column([node.get(key) for node in batch])
+                if isinstance(column, list):
+                    parts.pop(key, None)
+                    values = column
+                else:
+                    if key in parts:
+                        parts[key].append(column)
+                    values = column.tolist()
+
+                # A row without the value has None here and keeps going without the attribute
+                for node, value in zip(batch, values):
+                    if value is not None:
+                        node[key] = value
+
+            yield from batch
+
+        for key, columns in parts.items():
+            column = concat_columns(columns)
+            if column is not None:
+                node_columns[key] = column
+
+    def _iter_node_list(
+        self,
+        path: str,
+        delimiter: str,
+        id_columns: List[str],
+        attribute_columns: List[tuple],
+        id_registry: set,
+        edges: List[dict],
+    ) -> Iterator[dict]:
+        # Second pass, streams the file again and yields one node dict per row
+        for i, row in enumerate(self._iter_rows(path, delimiter)):
+            node_id = self._get_row_id(row, i, id_columns)
             label = row.get("label") or row.get("name") or row.get("title") or node_id
 
             attributes = {}
-            reserved = {"id", "ID", "@id", "label", "name", "title"}
 
-            for key, value in row.items():
-                if key is None or key in reserved:
-                    continue
+            for key, is_reference in attribute_columns:
+                value = row.get(key)
                 if value is None:
                     continue
 
@@ -186,9 +370,9 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
 
                 # Becomes an edge only if value is a known ID AND
                 # column name explicitly suggests a reference
-                if (val_str in id_registry
-                        and val_str != node_id
-                        and self._is_reference_field(key)):
+                if (is_reference
+                        and val_str in id_registry
+                        and val_str != node_id):
                     edges.append({
                         "source":   node_id,
                         "target":   val_str,
@@ -199,17 +383,14 @@ class CsvDatasourcePlugin(BaseDatasourcePlugin):
 
             node_dict: Dict[str, Any] = {"id": node_id, "label": label}
             node_dict.update(attributes)
-            nodes.append(node_dict)
-
-        return {"nodes": nodes, "edges": edges}
+            yield node_dict
 
-    def _get_row_id(self, row: dict, index: int) -> str:
-        if "id" in row and row["id"] not in (None, ""):
-            return str(row["id"]).strip()
-        if "ID" in row and row["ID"] not in (None, ""):
-            return str(row["ID"]).strip()
-        if "@id" in row and row["@id"] not in (None, ""):
-            return str(row["@id"]).strip()
+    def _get_row_id(self, row: dict, index: int, id_columns: List[str]) -> str:
+        # id_columns are the ID columns present in the header, in priority order
+        for key in id_columns:
+            value = row.get(key)
+            if value not in (None, ""):
+                return str(value).strip()
 
         # No ID column  generate based on row position
-        return f"row_{index + 1}"
\ No newline at end of file
+        return f"row_{index + 1}"
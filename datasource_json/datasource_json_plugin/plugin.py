@@ -1,6 +1,9 @@
 import json
-from typing import Any
-from api.graph_api.datasource_common.base import BaseDatasourcePlugin
+from typing import Any, Iterable, Iterator
+from api.graph_api.datasource_common.base import BaseDatasourcePlugin, iter_batches
+from api.graph_api.model import Graph, Node
+from .streaming import JsonStreamReader, JsonSyntaxError
+from .traversal import JsonGraphBuilder
 
 class JsonDatasourcePlugin(BaseDatasourcePlugin):
     """
@@ -38,6 +41,18 @@ class JsonDatasourcePlugin(BaseDatasourcePlugin):
                 "label": "Directed graph",
                 "required": False,
                 "default": True
+            },
+            "compact": {
+                "type": "bool",
+                "label": "Compact in-memory storage (for large files)",
+                "required": False,
+                "default": False
+            },
+            "stream": {
+                "type": "bool",
+                "label": "Stream the file item by item (for very large files)",
+                "required": False,
+                "default": False
             }
         }
 
@@ -71,6 +86,112 @@ class JsonDatasourcePlugin(BaseDatasourcePlugin):
         )
 
 
+    def load_graph(self, source: Any, **options: Any) -> Graph:
+        # stream=True builds the graph while the file is being read, for flat lists
+        # and nodes/edges documents. Only one item of the file is decoded at a time.
+        if not options.get("stream"):
+            return super().load_graph(source, **options)
+
+        path = self._resolve_path(source, options)
+        graph = self._new_graph(options)
+        with open(path, 'r', encoding='utf-8') as f:
+            reader = JsonStreamReader(f)
+            first = reader.peek()
+
+            if first == "[":
+                self._stream_flat_list(reader.iter_array(), graph)
+                return graph
+
+            if first == "{":
+                try:
+                    structured = self._stream_structured(reader, graph)
+                except JsonSyntaxError:
+                    # The regular load would read the whole file only to fail the same way
+                    raise
+                except ValueError:
+                    # Nodes are added before it is known whether the file is a nodes/edges
+                    # document, the regular load raises the error again if it is one
+                    structured = False
+                if structured:
+                    return graph
+
+        # A nested hierarchy only makes sense as a whole, so it is loaded the regular way
+        return super().load_graph(source, **options)
+
+    def _stream_flat_list(self, items: Iterable[Any], graph: Graph) -> None:
+        # Nodes are added in batches as soon as their objects are read
+        builder = JsonGraphBuilder(self._is_reference_field)
+        nodes = (node for obj in items for node in builder.add(obj))
+        for batch in iter_batches(nodes):
+            self._apply_renames(builder.take_renames(), graph, batch)
+            graph.add_nodes_bulk(self._iter_nodes(batch))
+        self._apply_renames(builder.take_renames(), graph, [])
+
+        # References to nodes defined further down the file were stored as attributes
+        # until their target was seen, drop those attributes now that they are edges
+        edges, resolved_attributes = builder.finish()
+        for node_id, key in resolved_attributes:
+            graph.mutable_node(node_id).attributes.pop(key, None)
+
+        graph.add_edges_bulk(self._iter_edges(edges, graph.directed))
+
+    def _stream_structured(self, reader: JsonStreamReader, graph: Graph) -> bool:
+        # Every root key is read, in any order. Like _parse_source, only a root object with
+        # both 'nodes' and 'edges' is a nodes/edges document, for anything else this returns
+        # False and the graph is left half-built, the file is a nested hierarchy then.
+        # Edges that come before the node section have to wait until all nodes exist
+        nodes_loaded = False
+        early_edges = []
+        keys = set()
+
+        for key in reader.iter_object():
+            keys.add(key)
+            if key == "nodes":
+                for batch in iter_batches(self._iter_section(reader)):
+                    graph.add_nodes_bulk(self._iter_nodes(batch))
+                nodes_loaded = True
+            elif key == "edges" and nodes_loaded:
+                for batch in iter_batches(self._iter_section(reader)):
+                    graph.add_edges_bulk(self._iter_edges(batch, graph.directed))
+            elif key == "edges":
+                early_edges.extend(self._iter_section(reader))
+            else:
+                # Other keys are not part of the graph
+                reader.read_value()
+
+        if "nodes" not in keys or "edges" not in keys:
+            return False
+        if early_edges:
+            graph.add_edges_bulk(self._iter_edges(early_edges, graph.directed))
+        return True
+
+    @staticmethod
+    def _apply_renames(renames: list, graph: Graph, batch: list) -> None:
+        # A generated ID claimed by a later object moves its node to a new ID, the node is
+        # either in the graph already or still waiting in the batch
+        if not renames:
+            return
+        nodes = list(graph.nodes)
+        positions = {node.node_id: i for i, node in enumerate(nodes)}
+        for old_id, new_id in renames:
+            i = positions.pop(old_id, None)
+            if i is None:
+                _rename_node_dict(batch, old_id, new_id)
+                continue
+            node = nodes[i]
+            label = new_id if node.label == old_id else node.label
+            nodes[i] = Node(node_id=new_id, label=label, attributes=dict(node.attributes))
+            positions[new_id] = i
+        graph.nodes = nodes
+
+    @staticmethod
+    def _iter_section(reader: JsonStreamReader) -> Iterator[Any]:
+        if reader.peek() == "[":
+            yield from reader.iter_array()
+        else:
+            # Not a list, there is nothing to load from it
+            reader.read_value()
+
     def _parse_source(self, source, **kwargs) -> dict:
         # This is the only step that the JSON plugin will be doing differently from the CSV plugin
         # The idea is to read a JSON file and return a dictionary that will have keys 'nodes' and 'edges' with data
@@ -78,7 +199,12 @@ class JsonDatasourcePlugin(BaseDatasourcePlugin):
         # Read JSON file
         path = self._resolve_path(source, kwargs)
         with open(path, 'r', encoding='utf-8') as f:
-            raw_json = json.load(f)
+            try:
+                raw_json = json.load(f)
+            except RecursionError:
+                # Nested deeper than the json module can decode, read it with an explicit stack instead
+                f.seek(0)
+                raw_json = JsonStreamReader(f).read_value()
 
         # If the JSON already has 'nodes' and 'edges' keys
         if isinstance(raw_json, dict) and "nodes" in raw_json and "edges" in raw_json:
@@ -96,141 +222,40 @@ class JsonDatasourcePlugin(BaseDatasourcePlugin):
 
     def _convert_flat_list(self, raw_list: list) -> dict:
         # Every object in a list is a node
-        # We do two passes through the list one where we collect all ids, and the other where we call the _traverse method
-
+        # IDs are collected while the objects are visited, so the list is walked only once
+        builder = JsonGraphBuilder(self._is_reference_field)
         nodes = []
-        edges = []
-
-        # Collect all ids in the file
-        id_registry = set()
-        created_nodes = set()
-        counter = [0] # for if an object has not id
-
         for obj in raw_list:
-            self._collect_all_ids(obj, id_registry)
-
-        # Create nodes and edges
-        for obj in  raw_list:
-            if isinstance(obj, dict):
-                self._traverse(obj, nodes, edges, id_registry, created_nodes, parent_id=None, counter=counter)
+            nodes.extend(builder.add(obj))
 
-        return {"nodes": nodes, "edges": edges}
+        return self._finish_conversion(builder, nodes)
 
     def _convert_nested(self, raw_json: dict) -> dict:
         # Converts a nested JSON into the expected dict
+        builder = JsonGraphBuilder(self._is_reference_field)
+        nodes = builder.add(raw_json)
 
-        nodes = []
-        edges = []
-
-        # Firstly we collect all ids
-        id_registry = set()
-        created_nodes = set()
-        counter = [0] # for if an object has not id
+        return self._finish_conversion(builder, nodes)
 
-        self._collect_all_ids(raw_json, id_registry)
+    @staticmethod
+    def _finish_conversion(builder: JsonGraphBuilder, nodes: list) -> dict:
+        # References to IDs that appeared later in the document were kept as attributes
+        # while traversing, remove them from the nodes now that they are edges
+        for old_id, new_id in builder.take_renames():
+            _rename_node_dict(nodes, old_id, new_id)
 
-        # Then we build the Graph object
-        self._traverse(raw_json, nodes, edges, id_registry, created_nodes ,parent_id=None, counter=counter)
+        edges, resolved_attributes = builder.finish()
+        if resolved_attributes:
+            nodes_by_id = {node["id"]: node for node in nodes}
+            for node_id, key in resolved_attributes:
+                nodes_by_id[node_id].pop(key, None)
 
         return {"nodes": nodes, "edges": edges}
 
-    # helper function
-    def _collect_all_ids(self, obj:Any, id_registry: set) -> None:
-        if isinstance(obj, dict):
-            # Collect all ids
-            if "id" in obj:
-                id_registry.add(str(obj["id"]))
-            if "@id" in obj:
-                id_registry.add(str(obj["@id"]))
-
-            # Recursively for every value
-            for value in obj.values():
-                self._collect_all_ids(value, id_registry)
-
-        elif isinstance(obj, list):
-            # Recursively for every list el
-            for item in obj:
-                self._collect_all_ids(item, id_registry)
-
-    # Generates a unique id for a node that has no id in the source file
-    def _new_auto_id(self, counter: list[int], id_registry: set[str]) -> str:
-        # Ensure no collision
-        while True:
-            counter[0] += 1
-            nid = f"auto_{counter[0]}"
-            if nid not in id_registry:
-                id_registry.add(nid)
-                return nid
-
-
-    def _traverse(self, obj: Any, nodes: list, edges: list, id_registry: set, created_nodes: set, parent_id: str, counter: list) -> str:
-        # Recursively visits every node in the JSON tree and populates
-        # the nodes and edges lists.
-
-        # Primitive values are not nodes
-        if not isinstance(obj, dict):
-            return None
-
-        # Resolve node identifier
-        if "id" in obj and obj["id"] is not None:
-            node_id = str(obj["id"])
-        elif "@id" in obj and obj["@id"] is not None:
-            node_id = str(obj["@id"])
-        else :
-            # No id
-            node_id = self._new_auto_id(counter, id_registry)
-
-        label = obj.get("label") or obj.get("name") or node_id
-
-        # Node summary
-        reserved = {"id", "@id", "label", "name"}
-        attributes = {} # regular attributes
-        children = {} # nested objects
-
-        for key, value in obj.items():
-            if key in reserved:
-                continue
-
-            # Nested object becomes a child node
-            if isinstance(value, dict):
-                # Nested object, child of the node
-                children[key] = value
-                continue
-
-            # Lists of objects become child nodes
-            if isinstance(value, list):
-                if all(isinstance(item, dict) for item in value):
-                    children[key] = value
-                else:
-                    # Keep primitive/mixed lists as node aatributes
-                    attributes[key] = value
-                continue
-
-            # Only explicitly recognized reference fields create graph edges
-            if (isinstance(value, str) and value in id_registry and self._is_reference_field(key)):
-                edges.append({"source": node_id, "target": value})
-                continue
 
-            # Otherwise this is a regular attribute
-            attributes[key] = value
-
-        # Create node only once
-        if node_id not in created_nodes:
-            node_data = {"id": node_id, "label": label}
-            node_data.update(attributes)
-            nodes.append(node_data)
-            created_nodes.add(node_id)
-
-            if parent_id is not None:
-                edges.append({"source": parent_id, "target": node_id})
-
-        # Traverse nested child structures
-        for value in children.values():
-            if isinstance(value, list):
-                for child in value:
-                    # Each child in the list has the current node as its parent.
-                    self._traverse(child, nodes, edges, id_registry, created_nodes, parent_id=node_id, counter=counter)
-            elif isinstance(value, dict):
-                self._traverse(value, nodes, edges, id_registry, created_nodes, parent_id=node_id, counter=counter)
-
-        return node_id
+def _rename_node_dict(nodes: list, old_id: str, new_id: str) -> None:
+    # The generated node comes before the object that claimed its ID
+    node = next(node for node in nodes if node["id"] == old_id)
+    node["id"] = new_id
+    if node["label"] == old_id:
+        node["label"] = new_id
@@ -0,0 +1,221 @@
+# Incremental JSON reading used by the streaming mode of the JSON datasource
+#
+# Only the standard library is used. The reader walks the outer structure of the
+# document (the root array, or the keys of the root object) itself, and decodes one
+# item at a time with the C-accelerated json decoder. Only the current item and a
+# read buffer are held in memory, no matter how large the file is.
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Iterator, Optional, TextIO
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# A decoding error this close to the end of the buffer can come from a token the read
+# cut off (a number, true/false/null, Infinity, a \uXXXX escape or surrogate pair)
+_INCOMPLETE_TAIL = 16
+
+
+class JsonSyntaxError(ValueError):
+    # Malformed input, as opposed to a well-formed document that describes an invalid graph
+    pass
+
+
+class JsonStreamReader:
+    """
+    Pull-style reader over a JSON text stream.
+
+    peek() looks at the next structural character, iter_array() yields the items of
+    an array one by one, iter_object() yields the keys of an object (the caller reads
+    each value before asking for the next key) and read_value() decodes one value.
+    """
+
+    def __init__(self, f: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        # Characters dropped from the front of the buffer, for error positions
+        self._consumed = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    # -----------------
+    # BUFFER
+    # -----------------
+
+    def _fill(self, min_size: int = 0) -> bool:
+        # Drop the consumed part of the buffer and read the next chunk
+        if self._eof:
+            return False
+        if self._pos:
+            self._consumed += self._pos
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+        chunk = self._f.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def _error(self, message: str, position: Optional[int] = None) -> JsonSyntaxError:
+        position = self._pos if position is None else position
+        return JsonSyntaxError(f"Invalid JSON: {message} (char {self._consumed + position})")
+
+    def _retry(self, error: json.JSONDecodeError) -> None:
+        # Reads more input when the error may only mean the buffer ends in the middle of a
+        # value, raises it at once otherwise, so malformed input is not read to the end first
+        truncated = error.pos >= len(self._buf) - _INCOMPLETE_TAIL or error.msg.startswith("Unterminated string")
+        # _fill moves the start of the buffer, the position is taken before it
+        position = self._consumed + error.pos
+        if not truncated or not self._fill(len(self._buf) - self._pos):
+            raise self._error(error.msg, position - self._consumed) from None
+
+    def peek(self) -> str:
+        # Next non-whitespace character, or "" at the end of the input
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise self._error(f"expected '{char}' but found '{found or 'end of input'}'")
+        self._pos += 1
+
+    # -----------------
+    # VALUES
+    # -----------------
+
+    def _decode(self) -> Any:
+        # Decodes the value at the current position, reading more input while it is incomplete.
+        # Each retry at least doubles the buffer, so a large item is re-scanned only a few times.
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as error:
+                self._retry(error)
+                continue
+
+            # A number that touches the end of the buffer may continue in the next chunk
+            if end == len(self._buf) and isinstance(value, (int, float)) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def read_value(self) -> Any:
+        try:
+            return self._decode()
+        except RecursionError:
+            return self._read_value_iteratively()
+
+    def _read_key(self) -> str:
+        if self.peek() != '"':
+            raise self._error("expected an object key")
+        while True:
+            try:
+                key, end = scanstring(self._buf, self._pos + 1)
+            except json.JSONDecodeError as error:
+                self._retry(error)
+                continue
+            self._pos = end
+            break
+        self._expect(":")
+        return key
+
+    def _read_value_iteratively(self) -> Any:
+        # Fallback for values nested deeper than the recursion limit of the C decoder
+        # Containers under construction are kept on an explicit stack
+        stack: list = []
+        keys: list = []
+
+        while True:
+            char = self.peek()
+            if char in ("{", "["):
+                self._pos += 1
+                closing = "}" if char == "{" else "]"
+                container: Any = {} if char == "{" else []
+                if self.peek() == closing:
+                    self._pos += 1
+                    value = container
+                else:
+                    stack.append(container)
+                    keys.append(self._read_key() if char == "{" else None)
+                    continue
+            elif char == "":
+                raise self._error("unexpected end of input")
+            else:
+                value = self._decode()
+
+            # Attach the finished value to its parent, closing every container that ends here
+            while True:
+                if not stack:
+                    return value
+
+                parent = stack[-1]
+                if isinstance(parent, dict):
+                    parent[keys[-1]] = value
+                else:
+                    parent.append(value)
+
+                separator = self.peek()
+                if separator == ",":
+                    self._pos += 1
+                    if isinstance(parent, dict):
+                        keys[-1] = self._read_key()
+                    break
+
+                closing = "}" if isinstance(parent, dict) else "]"
+                if separator != closing:
+                    raise self._error(f"expected ',' or '{closing}'")
+                self._pos += 1
+                value = stack.pop()
+                keys.pop()
+
+    # -----------------
+    # CONTAINERS
+    # -----------------
+
+    def iter_array(self) -> Iterator[Any]:
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield self.read_value()
+            separator = self.peek()
+            if separator == ",":
+                self._pos += 1
+            elif separator == "]":
+                self._pos += 1
+                return
+            else:
+                raise self._error("expected ',' or ']' in array")
+
+    def iter_object(self) -> Iterator[str]:
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            yield self._read_key()
+            separator = self.peek()
+            if separator == ",":
+                self._pos += 1
+            elif separator == "}":
+                self._pos += 1
+                return
+            else:
+                raise self._error("expected ',' or '}' in object")
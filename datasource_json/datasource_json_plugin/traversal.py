@@ -0,0 +1,188 @@
+# Converts JSON objects into the node and edge dictionaries the base datasource expects
+#
+# Objects are visited with an explicit stack, so the depth of the document does not
+# matter, and every object is visited exactly once. IDs are registered while visiting.
+# A reference field whose target has not been seen yet is stored as an attribute for
+# now and recorded as pending; finish() turns it into an edge if the target showed up later.
+# A generated ID that an object further on uses explicitly is handed to that object,
+# the node it was generated for gets the next free ID and is listed in take_renames().
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESERVED_KEYS = {"id", "@id", "label", "name"}
+
+
+class JsonGraphBuilder:
+    """
+    Single-pass builder for flat lists and nested JSON hierarchies.
+
+    add() visits one top-level value and returns the nodes created for it, in the same
+    pre-order the nested structure is written in. finish() resolves pending references
+    and returns the edges plus the (node id, attribute) pairs that turned into edges.
+    Nodes that were already returned under a generated ID another object claimed later
+    have to be renamed by the caller, in the order take_renames() lists them.
+    """
+
+    def __init__(self, is_reference_field: Callable[[str], bool]):
+        self._is_reference_field = is_reference_field
+        self.id_registry: set = set()
+        self._created_nodes: set = set()
+        self._counter = 0
+
+        # Generated ID -> slot of the edge from its parent (None for top-level objects)
+        self._generated: Dict[str, Optional[int]] = {}
+        # (generated ID, new ID) in the order the collisions were found
+        self._renames: List[Tuple[str, str]] = []
+
+        # Edges in creation order, a pending reference holds its place as None
+        self._edges: List[Optional[dict]] = []
+        # (edge slot, source node id, attribute key, target value, node created by this object)
+        self._pending: List[Tuple[int, str, str, str, bool]] = []
+
+    def _register_ids(self, value: Any) -> None:
+        # IDs of objects that are kept as attribute values (e.g. inside mixed lists) still count
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, dict):
+                self._register_object_id(item)
+                stack.extend(item.values())
+            elif isinstance(item, list):
+                stack.extend(item)
+
+    def _register_object_id(self, obj: dict) -> None:
+        if "id" in obj:
+            self.id_registry.add(str(obj["id"]))
+        if "@id" in obj:
+            self.id_registry.add(str(obj["@id"]))
+
+    def _new_auto_id(self) -> str:
+        # Generates a unique id for a node that has no id in the source file
+        while True:
+            self._counter += 1
+            nid = f"auto_{self._counter}"
+            if nid not in self.id_registry:
+                self.id_registry.add(nid)
+                return nid
+
+    def add(self, root: Any) -> List[dict]:
+        nodes: List[dict] = []
+        if not isinstance(root, dict):
+            # Primitive values are not nodes
+            self._register_ids(root)
+            return nodes
+
+        stack: List[Tuple[dict, Optional[str]]] = [(root, None)]
+        while stack:
+            obj, parent_id = stack.pop()
+            self._register_object_id(obj)
+
+            # Resolve node identifier
+            generated = False
+            if "id" in obj and obj["id"] is not None:
+                node_id = str(obj["id"])
+            elif "@id" in obj and obj["@id"] is not None:
+                node_id = str(obj["@id"])
+            else:
+                node_id = self._new_auto_id()
+                generated = True
+
+            if not generated and node_id in self._generated:
+                self._rename_generated(node_id)
+
+            label = obj.get("label") or obj.get("name") or node_id
+
+            attributes: Dict[str, Any] = {}
+            children: List[dict] = []
+            references: List[Tuple[int, str, str]] = []
+
+            for key, value in obj.items():
+                if key in RESERVED_KEYS:
+                    continue
+
+                # Nested object becomes a child node
+                if isinstance(value, dict):
+                    children.append(value)
+                    continue
+
+                # Lists of objects become child nodes, primitive/mixed lists stay attributes
+                if isinstance(value, list):
+                    if all(isinstance(item, dict) for item in value):
+                        children.extend(value)
+                    else:
+                        attributes[key] = value
+                        self._register_ids(value)
+                    continue
+
+                # Only explicitly recognized reference fields create graph edges
+                if isinstance(value, str) and self._is_reference_field(key):
+                    if value in self.id_registry:
+                        self._edges.append({"source": node_id, "target": value})
+                        continue
+                    # The target may still appear further on
+                    references.append((len(self._edges), key, value))
+                    self._edges.append(None)
+
+                # Otherwise this is a regular attribute
+                attributes[key] = value
+
+            # Create node only once
+            created = node_id not in self._created_nodes
+            if created:
+                node_data = {"id": node_id, "label": label}
+                node_data.update(attributes)
+                nodes.append(node_data)
+                self._created_nodes.add(node_id)
+
+                parent_slot = None
+                if parent_id is not None:
+                    parent_slot = len(self._edges)
+                    self._edges.append({"source": parent_id, "target": node_id})
+                if generated:
+                    self._generated[node_id] = parent_slot
+
+            for slot, key, value in references:
+                self._pending.append((slot, node_id, key, value, created))
+
+            # Children are pushed in reverse so they are visited in document order
+            stack.extend((child, node_id) for child in reversed(children))
+
+        return nodes
+
+    def _rename_generated(self, node_id: str) -> None:
+        # The explicit object keeps the ID, references to it already point at the right
+        # node. The generated node moves to a new ID with its own edges.
+        new_id = self._new_auto_id()
+        parent_slot = self._generated.pop(node_id)
+        self._generated[new_id] = parent_slot
+        self._created_nodes.discard(node_id)
+        self._created_nodes.add(new_id)
+        self._renames.append((node_id, new_id))
+
+        if parent_slot is not None:
+            self._edges[parent_slot]["target"] = new_id
+        for edge in self._edges:
+            if edge is not None and edge["source"] == node_id:
+                edge["source"] = new_id
+        self._pending = [
+            (slot, new_id if source == node_id else source, key, value, created)
+            for slot, source, key, value, created in self._pending
+        ]
+
+    def take_renames(self) -> List[Tuple[str, str]]:
+        # Renames found since the last call, for the nodes add() already returned
+        renames, self._renames = self._renames, []
+        return renames
+
+    def finish(self) -> Tuple[List[dict], List[Tuple[str, str]]]:
+        # Fixup phase: the remaining references are resolved against the complete ID registry
+        resolved_attributes = []
+        for slot, node_id, key, value, created in self._pending:
+            if value in self.id_registry:
+                self._edges[slot] = {"source": node_id, "target": value}
+                if created:
+                    resolved_attributes.append((node_id, key))
+        self._pending = []
+
+        edges = [edge for edge in self._edges if edge is not None]
+        return edges, resolved_attributes
@@ -0,0 +1,488 @@
+"""
+Shared storage for graph sessions, so every worker process can serve every graph.
+
+A backend keeps the fields of a session (workspace, active graph, original graph and
+layout log) together with a version that changes on every save. Workers cache sessions
+in memory (see GraphSessionStore) and only load one again when its version changed.
+Deleted sessions leave a tombstone, so every worker can answer 410 for them.
+
+Graphs are not pickled with the session. Every graph the fields refer to is written
+once as a binary snapshot (api.graph_api.model.binary.write_graph) and loaded back as
+a read-only MappedGraph, so the pages of a graph are shared by every worker that maps
+it and a graph that did not change since it was loaded is not written again. Only the
+small rest (workspace state, undo history, layout log) is pickled, with references to
+the snapshot files.
+
+Saves are a compare-and-swap on the version the session was loaded as: when another
+worker saved the session in between, save() returns None instead of overwriting it.
+
+Sessions are written with pickle, only point a backend at a location the server owns.
+"""
+
+import importlib
+import io
+import os
+import pickle
+import re
+import sqlite3
+import tempfile
+import time
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Hashable, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from api.graph_api.model import Graph, MappedGraph, open_graph, write_graph
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+# Tombstones are removed after this many idle TTLs
+TOMBSTONE_TTL_FACTOR = 24
+
+# Attempts to load a session whose snapshots were replaced while it was being read
+LOAD_ATTEMPTS = 3
+
+_SAFE_GRAPH_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+_SNAPSHOT_NAME = re.compile(r"^[A-Za-z0-9_.-]+\.gsnap$")
+
+SessionFields = Tuple[object, object, object, object]
+
+
+class _SessionPickler(pickle.Pickler):
+    # Pickles the session state with every graph replaced by the name of its snapshot
+
+    def __init__(self, file, store_graph):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._store_graph = store_graph
+        self.names = {}
+        self._graphs = []
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, Graph):
+            return None
+        name = self.names.get(id(obj))
+        if name is None:
+            name = self.names[id(obj)] = self._store_graph(obj)
+            # Keeps the object alive, so its id is not reused during the dump
+            self._graphs.append(obj)
+        return name
+
+
+class _SessionUnpickler(pickle.Unpickler):
+    def __init__(self, file, open_graph_file):
+        super().__init__(file)
+        self._open_graph_file = open_graph_file
+
+    def persistent_load(self, name):
+        return self._open_graph_file(name)
+
+
+class SessionBackend(ABC):
+    """
+    Contract of a session store shared by the worker processes.
+
+    Subclasses keep the session records (version, graph snapshot names, pickled state)
+    and call dump()/load_state() to turn fields into records and back. Snapshot files
+    live in graph_path and are never changed once written, a save writes new files and
+    removes the ones the replaced record used.
+    """
+
+    def __init__(self, graph_path):
+        self.graph_path = Path(graph_path)
+        self.graph_path.mkdir(parents=True, exist_ok=True)
+        # Snapshots this worker has mapped, by file name, shared by every session copy
+        self._mapped: "weakref.WeakValueDictionary[str, MappedGraph]" = weakref.WeakValueDictionary()
+
+    # version() is None when there is no live session (never saved or deleted)
+    @abstractmethod
+    def version(self, graph_id: str) -> Optional[Hashable]:
+        """Return the version of the stored session."""
+
+    @abstractmethod
+    def load(self, graph_id: str) -> Optional[Tuple[Hashable, SessionFields]]:
+        """Return the version and fields of the stored session."""
+
+    @abstractmethod
+    def save(self, graph_id: str, fields: SessionFields, expected: Optional[Hashable]) -> Optional[Hashable]:
+        """
+        Store the fields if the session is still at the expected version (None: not saved yet).
+
+        Return the new version, or None when another worker saved the session in between.
+        """
+
+    @abstractmethod
+    def touch(self, graph_id: str) -> None:
+        """Record an access that did not change the session."""
+
+    @abstractmethod
+    def delete(self, graph_id: str) -> None:
+        """Delete the session and leave a tombstone."""
+
+    @abstractmethod
+    def was_deleted(self, graph_id: str) -> bool:
+        """Return True when the session has a tombstone."""
+
+    @abstractmethod
+    def purge(self, max_idle: float) -> List[str]:
+        """Delete sessions not used for max_idle seconds and return their IDs."""
+
+    # -----------------
+    # GRAPH SNAPSHOTS
+    # -----------------
+
+    def dump(self, graph_id: str, fields: SessionFields) -> Tuple[List[str], bytes]:
+        # Snapshot names the fields refer to and the pickled fields
+        buffer = io.BytesIO()
+        pickler = _SessionPickler(buffer, lambda graph: self._store_graph(graph_id, graph))
+        try:
+            pickler.dump(fields)
+        except BaseException:
+            self._remove_snapshots(self._new_names(pickler.names.values()))
+            raise
+        return list(pickler.names.values()), buffer.getvalue()
+
+    def load_state(self, state) -> SessionFields:
+        return _SessionUnpickler(io.BytesIO(state), self._open_graph_file).load()
+
+    def discard(self, names: Iterable[str], keep: Iterable[str] = ()) -> None:
+        # Removes the snapshots of a replaced or failed record that the kept record does not use
+        self._remove_snapshots(set(names) - set(keep))
+
+    def _store_graph(self, graph_id: str, graph: Graph) -> str:
+        # A snapshot of this session mapped by this backend is unchanged (snapshots are
+        # read-only), reuse it. Snapshots of other sessions are removed along with them.
+        if isinstance(graph, MappedGraph):
+            path = Path(graph.path)
+            if path.parent == self.graph_path and path.name.startswith(f"{graph_id}."):
+                return path.name
+
+        name = f"{graph_id}.{uuid4().hex}.gsnap"
+        write_graph(graph, self.graph_path / name)
+        return name
+
+    def _new_names(self, names: Iterable[str]) -> List[str]:
+        return [name for name in names if name not in self._mapped]
+
+    def _open_graph_file(self, name: str) -> MappedGraph:
+        graph = self._mapped.get(name)
+        if graph is None:
+            if not _SNAPSHOT_NAME.match(name):
+                raise ValueError(f"Invalid graph snapshot name: {name}")
+            graph = open_graph(self.graph_path / name)
+            self._mapped[name] = graph
+        return graph
+
+    def _remove_snapshots(self, names: Iterable[str]) -> None:
+        # Workers that still map a removed file keep reading it until they let it go
+        for name in names:
+            if _SNAPSHOT_NAME.match(name):
+                (self.graph_path / name).unlink(missing_ok=True)
+
+    def _load_retrying(self, read_record):
+        # read_record() returns (version, names, state) or None. A save by another worker
+        # may remove the snapshots of the record that was just read, then read it again.
+        for attempt in range(LOAD_ATTEMPTS):
+            record = read_record()
+            if record is None:
+                return None
+            version, _, state = record
+            try:
+                return version, self.load_state(state)
+            except FileNotFoundError:
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+        return None
+
+
+@contextmanager
+def _file_lock(path: Path):
+    # Exclusive lock across processes, held for the duration of one compare-and-swap
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DirectorySessionBackend(SessionBackend):
+    """
+    One record file per session in a directory shared by the workers, next to the
+    graph snapshots of the sessions.
+
+    Records are replaced atomically under a per-session lock file. A sidecar file
+    records the last access, so touching a session does not change its version.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        super().__init__(self.path)
+
+    def _file(self, graph_id: str, suffix: str) -> Optional[Path]:
+        # Graph IDs come from requests, anything that is not a plain name has no file
+        if not _SAFE_GRAPH_ID.match(graph_id):
+            return None
+        return self.path / f"{graph_id}{suffix}"
+
+    @staticmethod
+    def _stat_version(stat: os.stat_result) -> Hashable:
+        # Every save writes a new file, so the inode changes along with the mtime
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def version(self, graph_id: str) -> Optional[Hashable]:
+        path = self._file(graph_id, ".session")
+        if path is None:
+            return None
+        try:
+            return self._stat_version(path.stat())
+        except FileNotFoundError:
+            return None
+
+    def _read_record(self, graph_id: str) -> Optional[Tuple[Hashable, List[str], bytes]]:
+        path = self._file(graph_id, ".session")
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                version = self._stat_version(os.fstat(f.fileno()))
+                names, state = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        return version, names, state
+
+    def load(self, graph_id: str) -> Optional[Tuple[Hashable, SessionFields]]:
+        return self._load_retrying(lambda: self._read_record(graph_id))
+
+    def save(self, graph_id: str, fields: SessionFields, expected: Optional[Hashable]) -> Optional[Hashable]:
+        path = self._file(graph_id, ".session")
+        if path is None:
+            raise ValueError(f"Invalid graph ID: {graph_id}")
+
+        names, state = self.dump(graph_id, fields)
+        with _file_lock(self._file(graph_id, ".lock")):
+            current = self._read_record(graph_id)
+            if (current[0] if current is not None else None) != expected:
+                self.discard(names, keep=current[1] if current is not None else ())
+                return None
+
+            descriptor, temp_name = tempfile.mkstemp(dir=self.path, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "wb") as f:
+                    pickle.dump((names, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_name, path)
+            except BaseException:
+                if os.path.exists(temp_name):
+                    os.unlink(temp_name)
+                self.discard(names, keep=current[1] if current is not None else ())
+                raise
+            version = self.version(graph_id)
+
+        if current is not None:
+            self.discard(current[1], keep=names)
+        self._file(graph_id, ".evicted").unlink(missing_ok=True)
+        self.touch(graph_id)
+        return version
+
+    def touch(self, graph_id: str) -> None:
+        path = self._file(graph_id, ".access")
+        if path is not None:
+            path.touch()
+
+    def delete(self, graph_id: str) -> None:
+        path = self._file(graph_id, ".session")
+        if path is None:
+            return
+        self._file(graph_id, ".evicted").touch()
+        with _file_lock(self._file(graph_id, ".lock")):
+            record = self._read_record(graph_id)
+            path.unlink(missing_ok=True)
+        if record is not None:
+            self.discard(record[1])
+        self._file(graph_id, ".access").unlink(missing_ok=True)
+
+    def was_deleted(self, graph_id: str) -> bool:
+        path = self._file(graph_id, ".evicted")
+        return path is not None and path.exists()
+
+    def purge(self, max_idle: float) -> List[str]:
+        now = time.time()
+        purged = []
+        for path in self.path.glob("*.session"):
+            graph_id = path.stem
+            try:
+                last_used = path.stat().st_mtime
+                access = self._file(graph_id, ".access")
+                if access.exists():
+                    last_used = max(last_used, access.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+            if now - last_used > max_idle:
+                self.delete(graph_id)
+                purged.append(graph_id)
+
+        for path in self.path.glob("*.evicted"):
+            try:
+                if now - path.stat().st_mtime > max_idle * TOMBSTONE_TTL_FACTOR:
+                    path.unlink()
+                    # Kept with the tombstone, a worker may still wait on the lock of a deleted session
+                    path.with_suffix(".lock").unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+        return purged
+
+
+class SqliteSessionBackend(SessionBackend):
+    """
+    Sessions stored as rows of one SQLite file shared by the workers, their graph
+    snapshots in a "<file>.graphs" directory next to it.
+
+    A row with no data is a tombstone. The version is a counter bumped on every save.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        super().__init__(self.path + ".graphs")
+        self._execute("PRAGMA journal_mode=WAL")
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS graph_sessions ("
+            "graph_id TEXT PRIMARY KEY, version INTEGER NOT NULL, accessed REAL NOT NULL, "
+            "graphs TEXT, data BLOB)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per call, so nothing is shared across threads or forks
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> list:
+        connection = self._connect()
+        try:
+            with connection:
+                return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _names(graphs: Optional[str]) -> List[str]:
+        return graphs.split("\n") if graphs else []
+
+    def version(self, graph_id: str) -> Optional[Hashable]:
+        rows = self._execute(
+            "SELECT version FROM graph_sessions WHERE graph_id = ? AND data IS NOT NULL", (graph_id,)
+        )
+        return rows[0][0] if rows else None
+
+    def _read_record(self, graph_id: str) -> Optional[Tuple[Hashable, List[str], bytes]]:
+        rows = self._execute(
+            "SELECT version, graphs, data FROM graph_sessions WHERE graph_id = ? AND data IS NOT NULL", (graph_id,)
+        )
+        if not rows:
+            return None
+        version, graphs, data = rows[0]
+        return version, self._names(graphs), data
+
+    def load(self, graph_id: str) -> Optional[Tuple[Hashable, SessionFields]]:
+        return self._load_retrying(lambda: self._read_record(graph_id))
+
+    def save(self, graph_id: str, fields: SessionFields, expected: Optional[Hashable]) -> Optional[Hashable]:
+        names, state = self.dump(graph_id, fields)
+        connection = self._connect()
+        try:
+            with connection:
+                # Takes the write lock before reading, so the compare and the swap are one step
+                connection.execute("BEGIN IMMEDIATE")
+                rows = connection.execute(
+                    "SELECT version, graphs, data IS NOT NULL FROM graph_sessions WHERE graph_id = ?", (graph_id,)
+                ).fetchall()
+                live = bool(rows) and bool(rows[0][2])
+                current_version = rows[0][0] if live else None
+                old_names = self._names(rows[0][1]) if live else []
+                if current_version != expected:
+                    connection.rollback()
+                    self.discard(names, keep=old_names)
+                    return None
+
+                version = (rows[0][0] + 1) if rows else 1
+                connection.execute(
+                    "INSERT INTO graph_sessions (graph_id, version, accessed, graphs, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(graph_id) DO UPDATE SET version = excluded.version, "
+                    "accessed = excluded.accessed, graphs = excluded.graphs, data = excluded.data",
+                    (graph_id, version, time.time(), "\n".join(names), sqlite3.Binary(state)),
+                )
+        except BaseException:
+            self.discard(names, keep=self._read_names(graph_id))
+            raise
+        finally:
+            connection.close()
+
+        self.discard(old_names, keep=names)
+        return version
+
+    def _read_names(self, graph_id: str) -> List[str]:
+        record = self._read_record(graph_id)
+        return record[1] if record is not None else []
+
+    def touch(self, graph_id: str) -> None:
+        self._execute("UPDATE graph_sessions SET accessed = ? WHERE graph_id = ?", (time.time(), graph_id))
+
+    def delete(self, graph_id: str) -> None:
+        rows = self._execute(
+            "UPDATE graph_sessions SET data = NULL, accessed = ? WHERE graph_id = ? AND data IS NOT NULL "
+            "RETURNING graphs",
+            (time.time(), graph_id),
+        )
+        for (graphs,) in rows:
+            self.discard(self._names(graphs))
+
+    def was_deleted(self, graph_id: str) -> bool:
+        rows = self._execute("SELECT 1 FROM graph_sessions WHERE graph_id = ? AND data IS NULL", (graph_id,))
+        return bool(rows)
+
+    def purge(self, max_idle: float) -> List[str]:
+        now = time.time()
+        rows = self._execute(
+            "UPDATE graph_sessions SET data = NULL, accessed = ? "
+            "WHERE data IS NOT NULL AND accessed < ? RETURNING graph_id, graphs",
+            (now, now - max_idle),
+        )
+        self._execute(
+            "DELETE FROM graph_sessions WHERE data IS NULL AND accessed < ?",
+            (now - max_idle * TOMBSTONE_TTL_FACTOR,),
+        )
+        for _, graphs in rows:
+            self.discard(self._names(graphs))
+        return [row[0] for row in rows]
+
+
+SESSION_BACKENDS = {
+    "directory": DirectorySessionBackend,
+    "sqlite": SqliteSessionBackend,
+}
+
+
+def create_session_backend(name: Optional[str], path) -> Optional[SessionBackend]:
+    # name is one of SESSION_BACKENDS or the dotted path of a SessionBackend subclass,
+    # None keeps sessions in the worker process only
+    if not name:
+        return None
+    if "." in name:
+        module_name, _, class_name = name.rpartition(".")
+        return getattr(importlib.import_module(module_name), class_name)(path)
+    backend_cls = SESSION_BACKENDS.get(name)
+    if backend_cls is None:
+        available = ", ".join(sorted(SESSION_BACKENDS))
+        raise ValueError(f"Unknown graph session backend '{name}'. Available: {available}.")
+    return backend_cls(path)
@@ -0,0 +1,369 @@
+"""
+In-process store for the graphs and workspaces of the explorer.
+
+Every loaded graph gets a session holding its workspace, active graph, original graph
+and the layout change log of the active graph. Sessions are evicted when they have been idle for longer than idle_ttl seconds,
+and least recently used sessions are evicted while the estimated size of all sessions
+is over max_bytes. IDs of evicted sessions are remembered for a while, so requests for
+them can be answered with 410 Gone instead of 404.
+
+With a SessionBackend (see session_backends) the sessions are shared by all worker
+processes: the store becomes a per-worker cache, sessions changed during a request are
+saved by flush(), and the idle TTL is applied to the shared copies. Sessions are
+changed by set() or, when a value was changed in place, reported with changed().
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional
+
+from api.graph_api.model import MappedGraph
+
+from .session_backends import SessionBackend
+
+# Defaults, overridden by the GRAPH_SESSION_* Django settings
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_IDLE_TTL = 60 * 60
+
+# Number of evicted session IDs remembered for 410 responses
+EVICTED_IDS_KEPT = 4096
+
+# Seconds between two scans of the shared backend for idle sessions
+PURGE_INTERVAL = 60
+
+# Number of nodes/edges measured per graph, the size of the rest is extrapolated
+SIZE_SAMPLE = 64
+
+# Rough cost of the ID lookup and adjacency entries a graph keeps per node and per edge
+NODE_INDEX_BYTES = 400
+EDGE_INDEX_BYTES = 250
+
+SESSION_FIELDS = ("workspace", "active", "original", "layout")
+
+
+def _sample_bytes(elements) -> int:
+    # Extrapolated size of a node/edge sequence from up to SIZE_SAMPLE evenly spaced elements
+    count = len(elements)
+    if not count:
+        return 0
+
+    step = max(1, count // SIZE_SAMPLE)
+    measured = 0
+    sampled = 0
+    for index in range(0, count, step):
+        element = elements[index]
+        attributes = element.attributes
+        measured += sys.getsizeof(element) + sys.getsizeof(attributes)
+        measured += sum(sys.getsizeof(value) for value in attributes.values())
+        sampled += 1
+    return measured * count // sampled
+
+
+def estimate_graph_bytes(graph, shared: bool = False) -> int:
+    # A graph that shares its elements with its parent (GraphView) only pays for its indexes
+    nodes = graph.nodes
+    edges = graph.edges
+    total = len(nodes) * NODE_INDEX_BYTES + len(edges) * EDGE_INDEX_BYTES
+    if not shared:
+        total += _sample_bytes(nodes) + _sample_bytes(edges)
+    return total
+
+
+class GraphSession:
+    __slots__ = ("workspace", "active", "original", "layout", "last_access", "nbytes", "version")
+
+    def __init__(self, now: float):
+        self.workspace = None
+        self.active = None
+        self.original = None
+        # (lineage, changes) of the active graph, see explorer.views
+        self.layout = None
+        self.last_access = now
+        self.nbytes = 0
+        # Backend version this copy was loaded from or saved as
+        self.version = None
+
+    def fields(self) -> tuple:
+        return self.workspace, self.active, self.original, self.layout
+
+    def graphs(self) -> List[object]:
+        # Every distinct graph the session keeps alive, including the parents of views
+        seen: Dict[int, object] = {}
+        pending = [self.active, self.original]
+        if self.workspace is not None:
+            pending.append(self.workspace.get_graph())
+        while pending:
+            graph = pending.pop()
+            if graph is None or id(graph) in seen:
+                continue
+            seen[id(graph)] = graph
+            pending.append(getattr(graph, "parent", None))
+        return list(seen.values())
+
+    def measure(self) -> int:
+        total = 0
+        for graph in self.graphs():
+            # Views share the elements of their parent, snapshots the pages of their file
+            shared = getattr(graph, "parent", None) is not None or isinstance(graph, MappedGraph)
+            total += estimate_graph_bytes(graph, shared=shared)
+        if self.workspace is not None:
+            total += self.workspace.history_bytes()
+        return total
+
+
+class GraphSessionStore:
+    """
+    Thread-safe LRU store of graph sessions with an idle TTL and a memory budget.
+
+    A limit of None disables it. The session that was just used is never evicted to
+    make room, so a single graph bigger than the budget still works on its own.
+    With a backend, the memory budget only drops the cached copy of a session.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = DEFAULT_MAX_BYTES, idle_ttl: Optional[float] = DEFAULT_IDLE_TTL,
+                 clock: Callable[[], float] = time.monotonic, backend: Optional[SessionBackend] = None):
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.backend = backend
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[str, GraphSession]" = OrderedDict()
+        self._evicted: "OrderedDict[str, None]" = OrderedDict()
+        self._next_purge = 0.0
+        # graph ID -> True when changed, False when only read, per request thread
+        self._request = threading.local()
+
+    # -----------------
+    # SESSIONS
+    # -----------------
+
+    def get(self, graph_id: str, field: str):
+        with self._lock:
+            session = self._session(graph_id)
+            if session is None:
+                return None
+            # A read, a caller that changes the value in place reports it with changed()
+            self._mark(graph_id, changed=False)
+            return getattr(session, field)
+
+    def set(self, graph_id: str, field: str, value) -> None:
+        with self._lock:
+            session = self._session(graph_id)
+            if session is None:
+                session = GraphSession(self._clock())
+                self._sessions[graph_id] = session
+                self._evicted.pop(graph_id, None)
+            setattr(session, field, value)
+            session.nbytes = session.measure()
+            self._mark(graph_id, changed=True)
+            self._evict(keep=graph_id)
+
+    def changed(self, graph_id: str) -> None:
+        # For values changed in place (e.g. a workspace edit): the session is measured
+        # again and saved by the next flush()
+        with self._lock:
+            session = self._sessions.get(graph_id)
+            if session is None:
+                return
+            session.nbytes = session.measure()
+            self._mark(graph_id, changed=True)
+            self._evict(keep=graph_id)
+
+    def flush(self) -> List[str]:
+        # Saves the sessions changed by the current thread to the backend, called at the
+        # end of every request that may change a session. Returns the IDs of sessions
+        # another worker saved since they were loaded: their changes are dropped along
+        # with the cached copy, so the next request sees the other worker's version.
+        marked = getattr(self._request, "marked", None)
+        self._request.marked = {}
+        if self.backend is None or not marked:
+            return []
+
+        conflicts = []
+        with self._lock:
+            for graph_id, changed in marked.items():
+                session = self._sessions.get(graph_id)
+                if session is None:
+                    continue
+                if not changed:
+                    self.backend.touch(graph_id)
+                    continue
+                version = self.backend.save(graph_id, session.fields(), session.version)
+                if version is None:
+                    del self._sessions[graph_id]
+                    conflicts.append(graph_id)
+                else:
+                    session.version = version
+        return conflicts
+
+    def ids(self, field: Optional[str] = None) -> List[str]:
+        # IDs of the live sessions (that have the field set), without marking them as used
+        with self._lock:
+            self._evict()
+            return [
+                graph_id for graph_id, session in self._sessions.items()
+                if field is None or getattr(session, field) is not None
+            ]
+
+    def was_evicted(self, graph_id: str) -> bool:
+        with self._lock:
+            self._session(graph_id)
+            if graph_id in self._evicted:
+                return True
+            return self.backend is not None and self.backend.was_deleted(graph_id)
+
+    def _mark(self, graph_id: str, changed: bool) -> None:
+        marked = getattr(self._request, "marked", None)
+        if marked is None:
+            marked = self._request.marked = {}
+        marked[graph_id] = marked.get(graph_id, False) or changed
+
+    def _session(self, graph_id: str) -> Optional[GraphSession]:
+        # Looks a session up and marks it as used, an expired one is evicted instead
+        if self.backend is not None:
+            return self._shared_session(graph_id)
+
+        session = self._sessions.get(graph_id)
+        if session is None:
+            return None
+
+        now = self._clock()
+        if self.idle_ttl is not None and now - session.last_access > self.idle_ttl:
+            self._drop(graph_id)
+            return None
+
+        session.last_access = now
+        self._sessions.move_to_end(graph_id)
+        return session
+
+    def _shared_session(self, graph_id: str) -> Optional[GraphSession]:
+        # The cached copy is used as long as the backend still has the same version
+        session = self._sessions.get(graph_id)
+        version = self.backend.version(graph_id)
+
+        if version is None:
+            # Not saved yet (created by this request) or deleted by another worker
+            if session is not None and session.version is not None:
+                self._drop(graph_id)
+                return None
+        elif session is None or session.version != version:
+            loaded = self.backend.load(graph_id)
+            if loaded is None:
+                return None
+            session = GraphSession(self._clock())
+            session.version, (session.workspace, session.active, session.original, session.layout) = loaded
+            session.nbytes = session.measure()
+            self._sessions[graph_id] = session
+            self._evict(keep=graph_id)
+
+        if session is None:
+            return None
+        session.last_access = self._clock()
+        self._sessions.move_to_end(graph_id)
+        return session
+
+    # -----------------
+    # EVICTION
+    # -----------------
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        if self.idle_ttl is not None:
+            if self.backend is not None:
+                self._purge_backend()
+            else:
+                deadline = self._clock() - self.idle_ttl
+                for graph_id, session in list(self._sessions.items()):
+                    if session.last_access < deadline and graph_id != keep:
+                        self._drop(graph_id)
+
+        if self.max_bytes is not None:
+            total = sum(session.nbytes for session in self._sessions.values())
+            for graph_id in list(self._sessions):
+                if total <= self.max_bytes:
+                    break
+                if graph_id == keep:
+                    continue
+                total -= self._sessions[graph_id].nbytes
+                # A shared session can be loaded again, only the cached copy goes away
+                if self.backend is not None:
+                    del self._sessions[graph_id]
+                else:
+                    self._drop(graph_id)
+
+    def _purge_backend(self) -> None:
+        now = self._clock()
+        if now < self._next_purge:
+            return
+        self._next_purge = now + PURGE_INTERVAL
+        for graph_id in self.backend.purge(self.idle_ttl):
+            if graph_id in self._sessions:
+                self._drop(graph_id)
+
+    def _drop(self, graph_id: str) -> None:
+        del self._sessions[graph_id]
+        self._evicted[graph_id] = None
+        while len(self._evicted) > EVICTED_IDS_KEPT:
+            self._evicted.popitem(last=False)
+
+    # -----------------
+    # ACCOUNTING
+    # -----------------
+
+    def usage(self) -> dict:
+        # Estimated bytes per session, least recently used first
+        with self._lock:
+            self._evict()
+            now = self._clock()
+            sessions = [
+                {
+                    "graph_id": graph_id,
+                    "bytes": session.nbytes,
+                    "idle_seconds": round(now - session.last_access, 3),
+                }
+                for graph_id, session in self._sessions.items()
+            ]
+            return {
+                "max_bytes": self.max_bytes,
+                "idle_ttl": self.idle_ttl,
+                "total_bytes": sum(session["bytes"] for session in sessions),
+                "sessions": sessions,
+            }
+
+    def field(self, field: str) -> "SessionField":
+        if field not in SESSION_FIELDS:
+            raise ValueError(f"Unknown session field: {field}")
+        return SessionField(self, field)
+
+
+class SessionField(MutableMapping):
+    # Dict-like access to one field of every session (e.g. the workspaces by graph ID)
+
+    def __init__(self, store: GraphSessionStore, field: str):
+        self._store = store
+        self._field = field
+
+    def __getitem__(self, graph_id: str):
+        value = self._store.get(graph_id, self._field)
+        if value is None:
+            raise KeyError(graph_id)
+        return value
+
+    def __setitem__(self, graph_id: str, value) -> None:
+        self._store.set(graph_id, self._field, value)
+
+    def __delitem__(self, graph_id: str) -> None:
+        if self._store.get(graph_id, self._field) is None:
+            raise KeyError(graph_id)
+        self._store.set(graph_id, self._field, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.ids(self._field))
+
+    def __len__(self) -> int:
+        return len(self._store.ids(self._field))
+
+    def changed(self, graph_id: str) -> None:
+        self._store.changed(graph_id)
@@ -13,5 +13,6 @@ urlpatterns = [
     path("api/graph/search/", views.graph_search_api, name="graph-search-api"),
     path("api/graph/filter/", views.graph_filter_api, name="graph-filter-api"),
     path("api/workspace/reset/", views.workspace_reset_api, name="workspace-reset-api"),
+    path("api/graph/sessions/", views.graph_sessions_api, name="graph-sessions-api"),
     path("api/render/", views.render_visualizer_api, name="render-visualizer-api"),
 ]
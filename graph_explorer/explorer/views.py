@@ -3,13 +3,14 @@ import shlex
 import json
 import logging
 import datetime
-import re
-from copy import deepcopy
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from uuid import uuid4
 from html import escape as escape_html
+from functools import wraps
+from collections.abc import Mapping
 
+from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import render
@@ -19,16 +20,42 @@ from django.views.decorators.http import require_GET, require_POST
 from core.graph_platform.registry import PluginRegistry
 from core.graph_platform.workspace import Workspace
 
-WORKSPACES = {}
+from .session_backends import create_session_backend
+from .sessions import DEFAULT_IDLE_TTL, DEFAULT_MAX_BYTES, GraphSessionStore
+
+# Workspaces, active and original graphs by graph ID, kept in one session per graph
+# and evicted by idle time and memory budget. With a backend configured the sessions
+# are shared by every worker process.
+SESSIONS = GraphSessionStore(
+    max_bytes=getattr(settings, "GRAPH_SESSION_MAX_BYTES", DEFAULT_MAX_BYTES),
+    idle_ttl=getattr(settings, "GRAPH_SESSION_IDLE_TTL", DEFAULT_IDLE_TTL),
+    backend=create_session_backend(
+        getattr(settings, "GRAPH_SESSION_BACKEND", None),
+        getattr(settings, "GRAPH_SESSION_PATH", None),
+    ),
+)
+WORKSPACES = SESSIONS.field("workspace")
+
+# Layouts of unchanged graph structures are reused across renders and visualizers
+try:
+    from api.graph_api.layout import DEFAULT_LAYOUT_CACHE_SIZE, LAYOUT_CACHE
+
+    LAYOUT_CACHE.resize(getattr(settings, "GRAPH_LAYOUT_CACHE_SIZE", DEFAULT_LAYOUT_CACHE_SIZE))
+except Exception:  # pragma: no cover - import failure path is runtime/environment dependent
+    LAYOUT_CACHE = None
+
+MAX_LAYOUT_CHANGES = 256
 
 try:
     from api.graph_api.model.edge import Edge
     from api.graph_api.model.graph import Graph
     from api.graph_api.model.node import Node
+    from api.graph_api.model.view import GraphView
 except Exception as exc:  # pragma: no cover - import failure path is runtime/environment dependent
     Graph = None  # type: ignore[assignment]
     Node = None  # type: ignore[assignment]
     Edge = None  # type: ignore[assignment]
+    GraphView = None  # type: ignore[assignment]
     GRAPH_IMPORT_ERROR = exc
 else:
     GRAPH_IMPORT_ERROR = None
@@ -44,12 +71,22 @@ MOCK_GRAPH_DATA = {
         {"id": "e2", "source": "n2", "target": "n3"},
     ],
 }
-ACTIVE_GRAPHS: dict[str, object] = {}
-ORIGINAL_GRAPHS: dict[str, object] = {}
+ACTIVE_GRAPHS = SESSIONS.field("active")
+ORIGINAL_GRAPHS = SESSIONS.field("original")
+# Structural edits made through the console since the layout lineage of a graph started,
+# graph ID -> (lineage, changes). Visualizers apply them to their previous layout instead
+# of laying the graph out again; any other edit drops the entry and starts a new lineage.
+# The log lives in the graph session, so it is evicted and shared along with the graph.
+LAYOUT_LOGS = SESSIONS.field("layout")
 LOGGER = logging.getLogger(__name__)
 DATASOURCE_BY_EXTENSION = {
     ".json": "json",
     ".csv": "csv",
+    ".gsnap": "binary",
+    ".arrow": "binary",
+    ".feather": "binary",
+    ".ipc": "binary",
+    ".parquet": "binary",
 }
 DATASOURCE_EXTENSIONS_BY_PLUGIN: dict[str, set[str]] = {}
 for extension, plugin_name in DATASOURCE_BY_EXTENSION.items():
@@ -62,6 +99,33 @@ def _json_error(message: str, status: int) -> JsonResponse:
     return JsonResponse({"ok": False, "error": message}, status=status)
 
 
+def _flush_sessions(view):
+    # Saves the graph sessions a view changed to the shared backend once it returns.
+    # A session another worker saved in the meantime keeps the other worker's changes,
+    # and the request that lost the race gets a 409.
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            SESSIONS.flush()
+            raise
+        conflicts = SESSIONS.flush()
+        if conflicts:
+            return _json_error(
+                f"Graph '{conflicts[0]}' was changed by another request at the same time. Try again.", 409
+            )
+        return response
+    return wrapper
+
+
+def _missing_graph_error(graph_id: str, message: str = "Graph not found") -> JsonResponse:
+    # 410 for graphs whose session was evicted, 404 for IDs that were never loaded
+    if SESSIONS.was_evicted(graph_id):
+        return _json_error(f"Graph '{graph_id}' was evicted from memory. Load it again.", 410)
+    return _json_error(message, 404)
+
+
 def json_error(
     status_code: int,
     error: str,
@@ -215,6 +279,43 @@ def datasource_plugins_api(request: HttpRequest) -> JsonResponse:
     )
 
 
+@require_GET
+def graph_sessions_api(request: HttpRequest) -> JsonResponse:
+    # Return the estimated memory used by every graph session of this worker process,
+    # along with the hit rate of the layout cache.
+    layout_cache = LAYOUT_CACHE.stats() if LAYOUT_CACHE is not None else None
+    return JsonResponse({"ok": True, **SESSIONS.usage(), "layout_cache": layout_cache})
+
+
+def _layout_change(graph: Graph, tokens: list[str]) -> tuple | None:
+    # Layout change set entry of a console node/edge command, None when it has none
+    action = tokens[0].lower()
+    subject = tokens[1].lower()
+
+    if action == "create" and subject == "node":
+        return ("add_node", _parse_flag(tokens, "--id"))
+
+    if action == "create" and subject == "edge":
+        return ("add_edge", _parse_flag(tokens, "--source"), _parse_flag(tokens, "--target"))
+
+    if action == "delete" and subject == "edge":
+        edge = graph.get_edge(_parse_flag(tokens, "--id"))
+        return ("remove_edge", edge.source, edge.target) if edge is not None else None
+
+    return None
+
+
+def _record_layout_change(graph_id: str, change: tuple | None) -> None:
+    # Append to the layout change log of the graph, or start a new lineage when the
+    # edit cannot be described by one. Logs are replaced, never changed in place, so
+    # the session sees the change.
+    log = LAYOUT_LOGS.get(graph_id)
+    if change is None or log is None or len(log[1]) >= MAX_LAYOUT_CHANGES:
+        LAYOUT_LOGS.pop(graph_id, None)
+        return
+    LAYOUT_LOGS[graph_id] = (log[0], log[1] + (change,))
+
+
 def _parse_flag(tokens: list[str], name: str) -> str | None:
     # Extract a CLI flag value from either '--flag=value' or '--flag value'.
     for i, token in enumerate(tokens):
@@ -225,53 +326,19 @@ def _parse_flag(tokens: list[str], name: str) -> str | None:
     return None
 
 def _clone_graph(graph: Graph) -> Graph:
-    # Deep-clone nodes and edges so workspace mutations do not touch the original graph.
-    g2 = Graph(directed=getattr(graph, "directed", True))
-    for n in graph.nodes:
-        g2.add_node(Node(node_id=str(n.node_id), label=getattr(n, "label", "") or str(n.node_id),
-                         attributes=deepcopy(getattr(n, "attributes", {}) or {})))
-    for e in graph.edges:
-        g2.add_edge(Edge(source=str(e.source), target=str(e.target),
-                         edge_id=getattr(e, "edge_id", None),
-                         weight=getattr(e, "weight", 1.0),
-                         directed=getattr(e, "directed", True),
-                         attributes=deepcopy(getattr(e, "attributes", {}) or {})))
-    return g2
-
-
-def _build_subgraph(graph: Graph, node_ids: set[str]) -> Graph:
-    # Create a graph containing only nodes in node_ids and edges between those nodes.
-    if Graph is None or Node is None or Edge is None:
+    # View over the whole graph: nodes and edges are shared and only copied when
+    # the workspace changes them, so mutations never touch the original graph.
+    if GraphView is None:
         raise RuntimeError(f"Graph API classes are not importable: {GRAPH_IMPORT_ERROR}")
+    return GraphView(graph)
 
-    subgraph = Graph(directed=getattr(graph, "directed", True))
-
-    for node in graph.nodes:
-        if node.node_id not in node_ids:
-            continue
-        subgraph.add_node(
-            Node(
-                node_id=str(node.node_id),
-                label=getattr(node, "label", "") or str(node.node_id),
-                attributes=deepcopy(getattr(node, "attributes", {}) or {}),
-            )
-        )
 
-    for edge in graph.edges:
-        if edge.source not in node_ids or edge.target not in node_ids:
-            continue
-        subgraph.add_edge(
-            Edge(
-                source=str(edge.source),
-                target=str(edge.target),
-                edge_id=getattr(edge, "edge_id", None),
-                weight=getattr(edge, "weight", 1.0),
-                directed=getattr(edge, "directed", getattr(graph, "directed", True)),
-                attributes=deepcopy(getattr(edge, "attributes", {}) or {}),
-            )
-        )
-
-    return subgraph
+def _build_subgraph(graph: Graph, node_ids: list[str]) -> Graph:
+    # View containing only the nodes in node_ids (given in graph order) and the edges
+    # between them. Nothing is copied until the workspace edits an element.
+    if GraphView is None:
+        raise RuntimeError(f"Graph API classes are not importable: {GRAPH_IMPORT_ERROR}")
+    return GraphView(graph, node_ids)
 
 
 def _to_json_safe_value(value):
@@ -280,7 +347,7 @@ def _to_json_safe_value(value):
         return value.isoformat()
     if isinstance(value, datetime.date):
         return value.isoformat()
-    if isinstance(value, dict):
+    if isinstance(value, Mapping):
         return {
             str(k): _to_json_safe_value(v)
             for k, v in value.items()
@@ -375,10 +442,12 @@ def _clear_graph_state(graph_id: str) -> Graph:
     empty_graph = Graph(directed=directed)
 
     ACTIVE_GRAPHS[graph_id] = empty_graph
+    LAYOUT_LOGS.pop(graph_id, None)
     ORIGINAL_GRAPHS[graph_id] = _clone_graph(empty_graph)
 
     workspace.clear()
     workspace.set_graph(empty_graph)
+    WORKSPACES.changed(graph_id)
 
     return empty_graph
 
@@ -391,6 +460,7 @@ def _apply_search_to_workspace(graph_id: str, workspace: Workspace, query: str)
 
     if workspace.get_graph() is not current_graph:
         workspace.set_graph(current_graph)
+        WORKSPACES.changed(graph_id)
 
     query = query.strip()
 
@@ -400,60 +470,36 @@ def _apply_search_to_workspace(graph_id: str, workspace: Workspace, query: str)
     else:
         matched_nodes = workspace.find_nodes_by_query_contains(query)
 
-    matched_ids = {str(n.node_id) for n in matched_nodes}
-    filtered_graph = _build_subgraph(current_graph, matched_ids)
+    filtered_graph = _build_subgraph(current_graph, [str(n.node_id) for n in matched_nodes])
 
     ACTIVE_GRAPHS[graph_id] = filtered_graph
+    LAYOUT_LOGS.pop(graph_id, None)
     workspace.set_graph(filtered_graph)
+    WORKSPACES.changed(graph_id)
     return filtered_graph
 
 
-def _parse_filter_condition(condition: str) -> tuple[str, str, str]:
-    # Parse one filter condition into (attribute, operator, value).
-    condition = condition.strip()
-
-    match = re.match(r"^(.+?)(==|!=|>=|<=|>|<|=)(.+)$", condition)
-    if not match:
-        raise ValueError(f"Invalid filter condition: '{condition}'")
-
-    attribute = match.group(1).strip()
-    operator = match.group(2).strip()
-    value = match.group(3).strip()
-
-    if operator == "=":
-        operator = "=="
-
-    return attribute, operator, value
-
-
 def _apply_filter_expression_to_workspace(graph_id: str, workspace: Workspace, expression: str) -> Graph:
-    # Apply '&&'-joined filter conditions and keep narrowing the active graph.
+    # Apply a filter expression (&&, ||, ! and parentheses) and narrow the active graph once.
     current_graph = ACTIVE_GRAPHS.get(graph_id) or workspace.get_graph() or ORIGINAL_GRAPHS.get(graph_id)
     if current_graph is None:
         raise ValueError("Graph not found")
 
     if workspace.get_graph() is not current_graph:
         workspace.set_graph(current_graph)
+        WORKSPACES.changed(graph_id)
 
-    expression = expression.strip()
-    conditions = [c.strip() for c in expression.split("&&") if c.strip()]
-    if not conditions:
-        raise ValueError("Empty filter expression")
-
-    temp_graph = current_graph
-
-    for condition in conditions:
-        attribute, operator, value = _parse_filter_condition(condition)
-        workspace.set_graph(temp_graph)
-        matched_nodes = workspace.find_nodes_by_attribute(attribute, operator, value)
-        matched_ids = {str(n.node_id) for n in matched_nodes}
-        temp_graph = _build_subgraph(temp_graph, matched_ids)
+    matched_nodes = workspace.find_nodes_by_filter_expression(expression)
+    filtered_graph = _build_subgraph(current_graph, [str(n.node_id) for n in matched_nodes])
 
-    ACTIVE_GRAPHS[graph_id] = temp_graph
-    workspace.set_graph(temp_graph)
-    return temp_graph
+    ACTIVE_GRAPHS[graph_id] = filtered_graph
+    LAYOUT_LOGS.pop(graph_id, None)
+    workspace.set_graph(filtered_graph)
+    WORKSPACES.changed(graph_id)
+    return filtered_graph
 
 @csrf_exempt
+@_flush_sessions
 def cli_execute_api(request: HttpRequest) -> JsonResponse:
     # Execute graph console commands and return the updated graph state.
     method_error = _require_post_json(request)
@@ -472,7 +518,7 @@ def cli_execute_api(request: HttpRequest) -> JsonResponse:
 
     workspace = WORKSPACES.get(graph_id)
     if not workspace:
-        return _json_error("Workspace not found", status=404)
+        return _missing_graph_error(graph_id, "Workspace not found")
 
     try:
         tokens = shlex.split(command)
@@ -496,7 +542,7 @@ def cli_execute_api(request: HttpRequest) -> JsonResponse:
 
         if action == "filter":
             if len(tokens) < 2:
-                raise ValueError("Invalid filter command. Use: filter 'Age>30 && Height>=150'")
+                raise ValueError("Invalid filter command. Use: filter 'Age>30 && (Height>=150 || !Team==A)'")
 
             expression = " ".join(tokens[1:]).strip()
             updated_graph = _apply_filter_expression_to_workspace(graph_id, workspace, expression)
@@ -523,6 +569,7 @@ def cli_execute_api(request: HttpRequest) -> JsonResponse:
             raise ValueError("Invalid command. format: [action] [subject] --flags")
 
         subject = tokens[1].lower()
+        change = _layout_change(workspace.get_graph(), tokens)
         if subject == "node":
             msg = _execute_node_command(workspace, tokens)
         elif subject == "edge":
@@ -533,8 +580,12 @@ def cli_execute_api(request: HttpRequest) -> JsonResponse:
                 f"Supported: create/edit/delete node|edge, search, filter, clear"
             )
 
+        # Setting the active graph also measures and saves the edited workspace
         updated_graph = workspace.get_graph()
         ACTIVE_GRAPHS[graph_id] = updated_graph
+        # Edits only touch attributes, the layout does not depend on them
+        if action != "edit":
+            _record_layout_change(graph_id, change)
 
         return JsonResponse({
             "ok": True,
@@ -597,7 +648,7 @@ def _execute_edge_command(workspace: Workspace, tokens: list[str]) -> str:
         if not edge_id:
             raise ValueError("Edge creation requires --id")
 
-        if any(e.get('id') == edge_id for e in graph.to_dict().get('edges', [])):
+        if graph.get_edge(edge_id) is not None:
             raise ValueError(f"Edge with id '{edge_id}' already exists.")
 
         source = _parse_flag(tokens, "--source")
@@ -613,7 +664,7 @@ def _execute_edge_command(workspace: Workspace, tokens: list[str]) -> str:
         if not edge_id:
             raise ValueError("Missing --id for edge edit")
 
-        if not any(e.get('id') == edge_id for e in graph.to_dict().get('edges', [])):
+        if graph.get_edge(edge_id) is None:
             raise ValueError(f"Edge with id '{edge_id}' does not exist.")
 
         workspace.edit_edge(edge_id=edge_id, properties=props)
@@ -623,7 +674,7 @@ def _execute_edge_command(workspace: Workspace, tokens: list[str]) -> str:
         if not edge_id:
             raise ValueError("Missing --id for edge deletion")
 
-        if not any(e.get('id') == edge_id for e in graph.to_dict().get('edges', [])):
+        if graph.get_edge(edge_id) is None:
             raise ValueError(f"Edge with id '{edge_id}' does not exist.")
 
         workspace.delete_edge(edge_id=edge_id)
@@ -633,6 +684,7 @@ def _execute_edge_command(workspace: Workspace, tokens: list[str]) -> str:
 
 
 @csrf_exempt
+@_flush_sessions
 def graph_search_api(request: HttpRequest) -> JsonResponse:
     # Search nodes in the current graph and persist the matched subgraph as active.
     method_error = _require_post_json(request)
@@ -651,22 +703,25 @@ def graph_search_api(request: HttpRequest) -> JsonResponse:
 
     workspace = WORKSPACES.get(graph_id)
     if not workspace:
-        return _json_error("Graph not found", 404)
+        return _missing_graph_error(graph_id)
 
     current_graph = ACTIVE_GRAPHS.get(graph_id) or workspace.get_graph() or ORIGINAL_GRAPHS.get(graph_id)
     if current_graph is None:
-        return _json_error("Graph not found", 404)
+        return _missing_graph_error(graph_id)
 
     if workspace.get_graph() is not current_graph:
         workspace.set_graph(current_graph)
+        WORKSPACES.changed(graph_id)
 
     matched_nodes = workspace.find_nodes_by_query_contains(query)
     matched_ids = {n.node_id for n in matched_nodes}
 
     if Graph is not None and Node is not None and Edge is not None:
-        filtered_graph = _build_subgraph(current_graph, matched_ids)
+        filtered_graph = _build_subgraph(current_graph, [n.node_id for n in matched_nodes])
         ACTIVE_GRAPHS[graph_id] = filtered_graph
+        LAYOUT_LOGS.pop(graph_id, None)
         workspace.set_graph(filtered_graph)
+        WORKSPACES.changed(graph_id)
         subgraph = {
             "nodes": [n.to_dict() for n in filtered_graph.nodes],
             "edges": [e.to_dict() for e in filtered_graph.edges],
@@ -685,6 +740,7 @@ def graph_search_api(request: HttpRequest) -> JsonResponse:
 
 
 @csrf_exempt
+@_flush_sessions
 def graph_filter_api(request: HttpRequest) -> JsonResponse:
     # Filter nodes by one attribute condition and store the filtered subgraph.
     method_error = _require_post_json(request)
@@ -705,14 +761,15 @@ def graph_filter_api(request: HttpRequest) -> JsonResponse:
 
     workspace = WORKSPACES.get(graph_id)
     if not workspace:
-        return _json_error("Graph not found", 404)
+        return _missing_graph_error(graph_id)
 
     current_graph = ACTIVE_GRAPHS.get(graph_id) or workspace.get_graph() or ORIGINAL_GRAPHS.get(graph_id)
     if current_graph is None:
-        return _json_error("Graph not found", 404)
+        return _missing_graph_error(graph_id)
 
     if workspace.get_graph() is not current_graph:
         workspace.set_graph(current_graph)
+        WORKSPACES.changed(graph_id)
 
     try:
         matched_nodes = workspace.find_nodes_by_attribute(attribute, operator, value)
@@ -722,9 +779,11 @@ def graph_filter_api(request: HttpRequest) -> JsonResponse:
     matched_ids = {n.node_id for n in matched_nodes}
 
     if Graph is not None and Node is not None and Edge is not None:
-        filtered_graph = _build_subgraph(current_graph, matched_ids)
+        filtered_graph = _build_subgraph(current_graph, [n.node_id for n in matched_nodes])
         ACTIVE_GRAPHS[graph_id] = filtered_graph
+        LAYOUT_LOGS.pop(graph_id, None)
         workspace.set_graph(filtered_graph)
+        WORKSPACES.changed(graph_id)
         subgraph = {
             "nodes": [n.to_dict() for n in filtered_graph.nodes],
             "edges": [e.to_dict() for e in filtered_graph.edges],
@@ -743,6 +802,7 @@ def graph_filter_api(request: HttpRequest) -> JsonResponse:
 
 
 @csrf_exempt
+@_flush_sessions
 def workspace_reset_api(request: HttpRequest) -> JsonResponse:
     # Reset the workspace and active graph back to the originally loaded graph.
     method_error = _require_post_json(request)
@@ -759,10 +819,11 @@ def workspace_reset_api(request: HttpRequest) -> JsonResponse:
 
     original_graph = ORIGINAL_GRAPHS.get(graph_id)
     if not original_graph:
-        return _json_error("Graph not found", 404)
+        return _missing_graph_error(graph_id)
 
     fresh_graph = _clone_graph(original_graph)
     ACTIVE_GRAPHS[graph_id] = fresh_graph
+    LAYOUT_LOGS.pop(graph_id, None)
 
     workspace = WORKSPACES.get(graph_id)
     if workspace is None:
@@ -770,6 +831,7 @@ def workspace_reset_api(request: HttpRequest) -> JsonResponse:
         WORKSPACES[graph_id] = workspace
     workspace.clear()
     workspace.set_graph(fresh_graph)
+    WORKSPACES.changed(graph_id)
 
     return JsonResponse({
         "ok": True,
@@ -779,6 +841,7 @@ def workspace_reset_api(request: HttpRequest) -> JsonResponse:
 
 @csrf_exempt
 @require_POST
+@_flush_sessions
 def load_graph_api(request: HttpRequest) -> JsonResponse:
     # Load an uploaded graph via datasource plugin and initialize workspace state.
     uploaded_file = request.FILES.get("file")
@@ -883,6 +946,7 @@ def _build_visualizer_map() -> dict[str, object | None]:
 
 
 @require_GET
+@_flush_sessions
 def render_visualizer_api(request: HttpRequest) -> HttpResponse:
     # Render the active graph with the selected visualizer and return HTML.
     visualizer_id = request.GET.get("visualizer_id", "").strip().lower()
@@ -914,6 +978,12 @@ def render_visualizer_api(request: HttpRequest) -> HttpResponse:
         )
 
     graph = ACTIVE_GRAPHS.get(graph_id)
+    if graph is None and SESSIONS.was_evicted(graph_id):
+        return _html_response(
+            "Graph Evicted",
+            f"Graph '{graph_id}' was evicted from memory. Load it again.",
+            status=410,
+        )
     if graph is None:
         return _html_response(
             "Graph Not Found",
@@ -931,9 +1001,12 @@ def render_visualizer_api(request: HttpRequest) -> HttpResponse:
             status=500,
         )
 
+    # The first render of a lineage lays the graph out in full, later ones apply the new changes
+    lineage, layout_changes = LAYOUT_LOGS.setdefault(graph_id, (f"{graph_id}:{uuid4().hex}", ()))
+
     try:
         graph_for_render = _build_visualizer_graph(graph, is_directed=is_directed)
-        html = visualizer.render(graph_for_render)
+        html = visualizer.render(graph_for_render, layout_key=lineage, layout_changes=layout_changes)
     except Exception as exc:
         return _html_response(
             "Visualizer Render Error",
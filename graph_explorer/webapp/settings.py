@@ -79,3 +79,19 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Loaded graphs are kept in memory per worker process. Sessions idle for longer than
+# the TTL (seconds) are dropped, and least recently used ones while the estimated size
+# of all graphs is over the budget (bytes). None disables a limit.
+GRAPH_SESSION_MAX_BYTES = 512 * 1024 * 1024
+GRAPH_SESSION_IDLE_TTL = 60 * 60
+
+# Set to "directory" or "sqlite" (or the dotted path of a SessionBackend class) to share
+# graph sessions between worker processes through GRAPH_SESSION_PATH. Required when
+# running more than one worker.
+GRAPH_SESSION_BACKEND = None
+GRAPH_SESSION_PATH = BASE_DIR / "graph_sessions"
+
+# Number of graph layouts kept per worker process, keyed by graph structure and layout
+# parameters, so re-rendering an unchanged topology skips the layout. 0 disables it.
+GRAPH_LAYOUT_CACHE_SIZE = 64
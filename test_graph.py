@@ -0,0 +1,310 @@
+import random
+
+import pytest
+
+from api.graph_api.model import CompactGraph, Edge, Graph, GraphView, Node
+
+GRAPH_TYPES = [Graph, CompactGraph]
+
+
+def adjacency(graph):
+    # out/in edges, neighbors and degree of every node, from the model's indexes.
+    # After removals the order of neighbors depends on the model, so they are compared as sets.
+    return {
+        n.node_id: (
+            [e.edge_id for e in graph.out_edges(n.node_id)],
+            [e.edge_id for e in graph.in_edges(n.node_id)],
+            sorted(graph.neighbors(n.node_id)),
+            graph.degree(n.node_id),
+        )
+        for n in graph.nodes
+    }
+
+
+def scanned_adjacency(graph):
+    # The same, worked out from the edge list
+    result = {}
+    for node in graph.nodes:
+        node_id = node.node_id
+        out_ids = [e.edge_id for e in graph.edges if e.source == node_id]
+        in_ids = [e.edge_id for e in graph.edges if e.target == node_id]
+        neighbors = {e.target if e.source == node_id else e.source
+                     for e in graph.edges if node_id in (e.source, e.target)}
+        result[node_id] = (out_ids, in_ids, sorted(neighbors), len(out_ids) + len(in_ids))
+    return result
+
+
+def element_ids(graph):
+    return [n.node_id for n in graph.nodes], [(e.edge_id, e.source, e.target) for e in graph.edges]
+
+
+# ----------------------------
+# Bulk adds
+# ----------------------------
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+def test_bulk_add_generates_ids_like_single_adds(graph_cls):
+    bulk, single = graph_cls(), graph_cls()
+    nodes = [Node("a"), Node(None, label="first"), Node("b"), Node(None)]
+    bulk.add_nodes_bulk(Node(n.node_id, n.label) for n in nodes)
+    for node in nodes:
+        single.add_node(Node(node.node_id, node.label))
+    edges = [Edge("a", "b"), Edge("b", "1", edge_id="x"), Edge("1", "2")]
+    bulk.add_edges_bulk(Edge(e.source, e.target, e.edge_id) for e in edges)
+    for edge in edges:
+        single.add_edge(Edge(edge.source, edge.target, edge.edge_id))
+
+    assert element_ids(bulk) == element_ids(single) == (
+        ["a", "1", "b", "2"], [("1", "a", "b"), ("x", "b", "1"), ("2", "1", "2")]
+    )
+    assert bulk.get_node("1").label == "first"
+    assert bulk.get_edge("2").source == "1"
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+@pytest.mark.parametrize("nodes, duplicate", [
+    ([Node(None), Node("1")], "1"),
+    ([Node("1"), Node(None)], "1"),
+    ([Node("a"), Node("b"), Node("a")], "a"),
+    ([Node("existing")], "existing"),
+])
+def test_bulk_node_duplicates_add_nothing(graph_cls, nodes, duplicate):
+    graph = graph_cls()
+    graph.add_node(Node("existing"))
+    before = element_ids(graph)
+
+    with pytest.raises(ValueError, match=f"Node '{duplicate}' already exists"):
+        graph.add_nodes_bulk(nodes)
+
+    assert element_ids(graph) == before
+    # The counter did not move either, the next generated ID is still 1
+    graph.add_node(Node(None))
+    assert graph.nodes[-1].node_id == "1"
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+@pytest.mark.parametrize("edges, duplicate", [
+    ([Edge("a", "b"), Edge("b", "a", edge_id="1")], "1"),
+    ([Edge("a", "b", edge_id="1"), Edge("b", "a")], "1"),
+    ([Edge("a", "b"), Edge("b", "a"), Edge("a", "a")], "e"),
+    ([Edge("a", "b", edge_id="x"), Edge("b", "a", edge_id="x")], "x"),
+])
+def test_bulk_edge_duplicates_add_nothing(graph_cls, edges, duplicate):
+    graph = graph_cls()
+    graph.add_nodes_bulk([Node("a"), Node("b")])
+    graph.add_edge(Edge("a", "b", edge_id="e"))
+    if duplicate == "e":
+        # Generated IDs are checked against the explicit IDs of earlier edges as well
+        graph.add_edge(Edge("a", "b", edge_id="3"))
+        duplicate = "3"
+    before = element_ids(graph)
+
+    with pytest.raises(ValueError, match=f"Edge '{duplicate}' already exists"):
+        graph.add_edges_bulk(edges)
+
+    assert element_ids(graph) == before
+    assert adjacency(graph) == scanned_adjacency(graph)
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+def test_bulk_add_reports_every_error(graph_cls):
+    graph = graph_cls()
+    graph.add_nodes_bulk([Node("a"), Node("b")])
+
+    with pytest.raises(ValueError) as error:
+        graph.add_edges_bulk([Edge("a", "x"), Edge("y", "b"), Edge("a", "b", edge_id="d"), Edge("b", "a", edge_id="d")])
+
+    message = str(error.value)
+    assert "3 error(s)" in message
+    assert "Source node 'y'" in message and "Target node 'x'" in message and "Edge 'd'" in message
+    assert len(graph.edges) == 0
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+def test_single_add_rejects_generated_duplicates(graph_cls):
+    graph = graph_cls()
+    graph.add_nodes_bulk([Node("1"), Node("b")])
+    graph.add_edge(Edge("1", "b", edge_id="1"))
+
+    with pytest.raises(ValueError, match="Node '1' already exists"):
+        graph.add_node(Node(None))
+    with pytest.raises(ValueError, match="Edge '1' already exists"):
+        graph.add_edge(Edge("b", "1"))
+    assert element_ids(graph) == (["1", "b"], [("1", "1", "b")])
+
+
+# ----------------------------
+# Adjacency and removal
+# ----------------------------
+
+def random_edits(graph, seed, steps=300):
+    # Random adds and removals, checking the adjacency indexes against the edge list on the way
+    rng = random.Random(seed)
+    graph.add_nodes_bulk(Node(f"n{i}") for i in range(20))
+    serial = 0
+    for step in range(steps):
+        choice = rng.random()
+        node_ids = [n.node_id for n in graph.nodes]
+        if choice < 0.1 or len(node_ids) < 2:
+            serial += 1
+            graph.add_node(Node(f"m{serial}"))
+        elif choice < 0.2:
+            graph.remove_node(rng.choice(node_ids))
+        elif choice < 0.6:
+            edge_id = None if rng.random() < 0.5 else f"e{step}"
+            graph.add_edge(Edge(rng.choice(node_ids), rng.choice(node_ids), edge_id=edge_id))
+        elif choice < 0.7:
+            batch = [Edge(rng.choice(node_ids), rng.choice(node_ids)) for _ in range(rng.randint(0, 4))]
+            graph.add_edges_bulk(batch)
+        elif graph.edges:
+            graph.remove_edge(rng.choice(graph.edges).edge_id)
+
+        if step % 25 == 0:
+            assert adjacency(graph) == scanned_adjacency(graph)
+    return graph
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+@pytest.mark.parametrize("seed", range(5))
+def test_adjacency_follows_adds_and_removals(graph_cls, seed):
+    graph = random_edits(graph_cls(), seed)
+    assert adjacency(graph) == scanned_adjacency(graph)
+
+    # Lookups by ID agree with the lists
+    for node in graph.nodes:
+        assert graph.get_node(node.node_id).node_id == node.node_id
+    for edge in graph.edges:
+        assert graph.get_edge(edge.edge_id).source == edge.source
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_graph_matches_graph(seed):
+    plain = random_edits(Graph(), seed)
+    compact = random_edits(CompactGraph(), seed)
+    assert element_ids(compact) == element_ids(plain)
+    assert adjacency(compact) == adjacency(plain)
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+def test_remove_node_drops_its_edges_and_keeps_order(graph_cls):
+    graph = graph_cls()
+    graph.add_nodes_bulk(Node(str(i)) for i in range(5))
+    graph.add_edges_bulk([
+        Edge("0", "1", edge_id="a"), Edge("2", "2", edge_id="loop"), Edge("1", "2", edge_id="b"),
+        Edge("2", "3", edge_id="c"), Edge("3", "4", edge_id="d"),
+    ])
+
+    removed = graph.remove_node("2")
+
+    assert removed.node_id == "2"
+    assert element_ids(graph) == (["0", "1", "3", "4"], [("a", "0", "1"), ("d", "3", "4")])
+    assert graph.get_node("2") is None and not graph.has_node("2")
+    assert graph.get_edge("loop") is None and graph.get_edge("b") is None
+    assert graph.neighbors("1") == ["0"] and graph.neighbors("3") == ["4"]
+    assert adjacency(graph) == scanned_adjacency(graph)
+
+    with pytest.raises(ValueError, match="Node '2' does not exist"):
+        graph.remove_node("2")
+    with pytest.raises(ValueError, match="Edge 'b' does not exist"):
+        graph.remove_edge("b")
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+def test_neighbors_in_the_order_they_were_connected(graph_cls):
+    graph = graph_cls()
+    graph.add_nodes_bulk(Node(i) for i in "abcd")
+    graph.add_edges_bulk([Edge("c", "a"), Edge("a", "d"), Edge("a", "c"), Edge("b", "a"), Edge("a", "a")])
+
+    assert graph.neighbors("a") == ["c", "d", "b", "a"]
+    assert graph.neighbors("c") == ["a"]
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES)
+def test_parallel_edges_keep_neighbors_until_the_last_one(graph_cls):
+    graph = graph_cls()
+    graph.add_nodes_bulk([Node("a"), Node("b")])
+    graph.add_edges_bulk([Edge("a", "b", edge_id="1"), Edge("b", "a", edge_id="2")])
+
+    graph.remove_edge("1")
+    assert graph.neighbors("a") == ["b"]
+    graph.remove_edge("2")
+    assert graph.neighbors("a") == [] and graph.degree("b") == 0
+
+
+def test_view_removal_leaves_the_parent_alone():
+    parent = Graph()
+    parent.add_nodes_bulk(Node(str(i)) for i in range(4))
+    parent.add_edges_bulk([Edge("0", "1"), Edge("1", "2"), Edge("2", "3")])
+    before = element_ids(parent)
+
+    view = GraphView(parent)
+    view.remove_node("1")
+    view.add_edge(Edge("0", "3"))
+
+    assert element_ids(parent) == before
+    assert element_ids(view) == (["0", "2", "3"], [("3", "2", "3"), ("4", "0", "3")])
+    assert adjacency(view) == scanned_adjacency(view)
+
+
+@pytest.mark.parametrize("graph_cls", GRAPH_TYPES + [lambda: GraphView(Graph())])
+@pytest.mark.parametrize("seed", range(3))
+def test_positions_match_the_element_lists(graph_cls, seed):
+    graph = random_edits(graph_cls(), seed)
+    for position, node in enumerate(graph.nodes):
+        assert graph.node_position(node.node_id) == position
+    for position, edge in enumerate(graph.edges):
+        assert graph.edge_position(edge.edge_id) == position
+
+    with pytest.raises(ValueError, match="Node 'missing' does not exist"):
+        graph.node_position("missing")
+    with pytest.raises(ValueError, match="Edge 'missing' does not exist"):
+        graph.edge_position("missing")
+
+
+# ----------------------------
+# CompactGraph rows
+# ----------------------------
+
+def test_compact_views_follow_their_element():
+    graph = CompactGraph()
+    graph.add_nodes_bulk(Node(str(i), attributes={"i": i}) for i in range(10))
+    graph.add_edges_bulk(Edge(str(i), str(i + 1), weight=i) for i in range(9))
+    node, edge = graph.get_node("8"), graph.get_edge("9")
+    mutable = graph.mutable_node("9")
+
+    # Enough removals before them to compact the store and move every row
+    for i in range(6):
+        graph.remove_node(str(i))
+    assert graph.store.node_index["8"] < 8
+
+    assert node.node_id == "8" and node.attributes["i"] == 8
+    assert (edge.edge_id, edge.source, edge.target, edge.weight) == ("9", "8", "9", 8)
+    mutable.attributes["i"] = -9
+    assert graph.get_node("9").attributes["i"] == -9
+    assert graph.nodes[2] == node and hash(graph.nodes[2]) == hash(node)
+    assert graph.edges[-1] == edge
+
+    graph.remove_node("8")
+    with pytest.raises(ValueError, match="Node '8' does not exist"):
+        node.attributes
+    with pytest.raises(ValueError, match="Edge '9' does not exist"):
+        edge.source
+    assert node.node_id == "8" and edge.edge_id == "9"
+
+
+def test_compact_removal_leaves_other_rows_in_place():
+    graph = CompactGraph()
+    graph.add_nodes_bulk(Node(str(i)) for i in range(10))
+    graph.add_edges_bulk(Edge(str(i), str((i + 1) % 10)) for i in range(10))
+    rows = {n.node_id: n._index for n in graph.nodes}
+
+    graph.remove_node("3")
+    graph.remove_edge("8")
+
+    # Holes until half of the rows are gone
+    assert {n.node_id: n._index for n in graph.nodes} == {k: v for k, v in rows.items() if k != "3"}
+    assert graph.store.removed_nodes == 1 and graph.store.removed_edges == 3
+    assert len(graph.nodes) == graph.store.node_count == 9
+    assert [e.edge_id for e in graph.edges] == ["1", "2", "5", "6", "7", "9", "10"]
+    assert graph.node_position("4") == 3 and graph.edge_position("10") == 6
+    assert adjacency(graph) == scanned_adjacency(graph)
@@ -0,0 +1,156 @@
+import pickle
+
+import pytest
+
+from api.graph_api.model import CompactGraph, Edge, Graph, GraphView, MappedGraph, Node
+from api.graph_api.model.binary import open_graph, write_graph
+from core.graph_platform.workspace import Workspace
+
+
+def sample_graph(graph_cls=Graph):
+    graph = graph_cls(directed=True)
+    for i in range(8):
+        graph.add_node(Node(str(i), label=f"N{i}", attributes={"age": 20 + i, "city": "Paris" if i % 2 else "Rome"}))
+    for i in range(7):
+        graph.add_edge(Edge(str(i), str(i + 1), weight=1.0 + i, attributes={"kind": "next"}))
+    graph.add_edge(Edge("7", "0", edge_id="back"))
+    return graph
+
+
+@pytest.fixture(params=["graph", "compact", "view", "mapped"])
+def workspace(request, tmp_path):
+    if request.param == "graph":
+        graph = sample_graph()
+    elif request.param == "compact":
+        graph = sample_graph(CompactGraph)
+    elif request.param == "view":
+        graph = GraphView(sample_graph())
+    else:
+        path = str(tmp_path / "sample.gsnap")
+        write_graph(sample_graph(), path)
+        graph = open_graph(path)
+
+    workspace = Workspace()
+    workspace.set_graph(graph)
+    return workspace
+
+
+# Every kind of change the history records, in an order that touches shared elements
+EDITS = [
+    lambda ws: ws.create_node("new", {"age": 99}),
+    lambda ws: ws.edit_node("3", {"age": 1, "extra": "x"}),
+    lambda ws: ws.create_edge("new", "3", None, {"weight": 4, "kind": "added"}),
+    lambda ws: ws.edit_edge("back", {"weight": 9, "kind": "changed"}),
+    lambda ws: ws.delete_edge("3"),
+    lambda ws: ws.delete_edge("back"),
+    lambda ws: ws.edit_node("0", {"city": "Oslo"}),
+    # Narrowing to a view of the current graph, then to a plain copy of a subset
+    lambda ws: ws.set_graph(GraphView(ws.get_graph(), ["0", "1", "2", "3", "new"])),
+    lambda ws: ws.set_graph(plain_subgraph(ws.get_graph(), {"0", "1", "new"})),
+    lambda ws: ws.delete_node("new"),
+]
+
+
+def plain_subgraph(graph, node_ids):
+    subgraph = Graph(directed=graph.directed)
+    subgraph.add_nodes_bulk(
+        Node(n.node_id, n.label, dict(n.attributes)) for n in graph.nodes if n.node_id in node_ids
+    )
+    subgraph.add_edges_bulk(
+        Edge(e.source, e.target, e.edge_id, e.weight, e.directed, dict(e.attributes))
+        for e in graph.edges if e.source in node_ids and e.target in node_ids
+    )
+    return subgraph
+
+
+def test_undo_restores_every_state(workspace, graph_snapshot):
+    states = []
+    for edit in EDITS:
+        states.append(graph_snapshot(workspace.get_graph()))
+        edit(workspace)
+
+    while states:
+        workspace.undo()
+        assert graph_snapshot(workspace.get_graph()) == states.pop()
+    assert workspace.history_size() == 0
+
+
+def test_undo_after_pickling(workspace, graph_snapshot):
+    # Sessions are pickled between requests, the history has to survive that
+    states = []
+    for edit in EDITS:
+        states.append(graph_snapshot(workspace.get_graph()))
+        edit(workspace)
+        workspace = pickle.loads(pickle.dumps(workspace))
+
+    while states:
+        workspace.undo()
+        assert graph_snapshot(workspace.get_graph()) == states.pop()
+
+
+def test_edits_leave_a_mapped_snapshot_untouched(tmp_path, graph_snapshot):
+    path = str(tmp_path / "sample.gsnap")
+    write_graph(sample_graph(), path)
+    original = graph_snapshot(open_graph(path))
+
+    workspace = Workspace()
+    workspace.set_graph(open_graph(path))
+    for edit in EDITS:
+        edit(workspace)
+
+    assert not isinstance(workspace.get_graph(), MappedGraph)
+    assert graph_snapshot(open_graph(path)) == original
+
+
+def test_undo_restores_element_positions(graph_snapshot):
+    workspace = Workspace()
+    workspace.set_graph(sample_graph())
+    before = graph_snapshot(workspace.get_graph())
+
+    # Node 3 sits between edges 3 (2 -> 3) and 4 (3 -> 4)
+    workspace.delete_edge("4")
+    workspace.delete_edge("3")
+    workspace.delete_node("3")
+    workspace.undo()
+    workspace.undo()
+    workspace.undo()
+
+    assert graph_snapshot(workspace.get_graph()) == before
+
+
+def test_history_is_bounded_by_depth():
+    workspace = Workspace(max_history=3)
+    workspace.set_graph(sample_graph())
+    for i in range(5):
+        workspace.create_node(f"x{i}", {})
+
+    assert workspace.history_size() == 3
+    for _ in range(3):
+        workspace.undo()
+    assert workspace.undo() is None
+    assert [n.node_id for n in workspace.get_graph().nodes][-2:] == ["x0", "x1"]
+
+
+def test_history_is_bounded_by_bytes():
+    workspace = Workspace(max_history_bytes=1)
+    workspace.set_graph(sample_graph())
+    other = Graph()
+    other.add_node(Node("z"))
+    workspace.set_graph(other)
+
+    # The whole replaced graph is bigger than the budget, so it is not kept
+    assert workspace.history_size() == 0
+    assert workspace.history_bytes() == 0
+
+
+def test_undo_after_many_deletes_restores_positions(workspace, graph_snapshot):
+    # Enough deletes that the element lists drop their holes in between
+    before = graph_snapshot(workspace.get_graph())
+    for edge_id in ["back", "5", "1", "3", "7", "6", "2", "4"]:
+        workspace.delete_edge(edge_id)
+    for node_id in ["4", "0", "7", "2", "5", "1"]:
+        workspace.delete_node(node_id)
+
+    while workspace.history_size():
+        workspace.undo()
+    assert graph_snapshot(workspace.get_graph()) == before
@@ -0,0 +1,311 @@
+import csv
+import datetime
+import operator
+import random
+
+import pytest
+
+from api.graph_api.model import Node
+from core.graph_platform.filter_expression import And, Condition, FilterNode, Not, Or
+from core.graph_platform.workspace import Workspace
+from datasource_csv.datasource_csv_plugin.plugin import CsvDatasourcePlugin
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def scan_attribute(workspace, attribute, op, value):
+    # What find_nodes_by_attribute returned before it had indexes: a scan of every node
+    nodes = workspace.list_nodes()
+    target_type = None
+    for node in nodes:
+        raw = workspace._resolve_node_filter_value(node, attribute)
+        if raw is not None:
+            target_type = workspace._detect_filter_type(raw)
+            if target_type is not None:
+                break
+    if target_type is None:
+        return []
+
+    coerced = workspace._convert_filter_value(value, target_type, attribute)
+    result = []
+    for node in nodes:
+        raw = workspace._resolve_node_filter_value(node, attribute)
+        normalized = None if raw is None else workspace._normalize_raw_for_type(raw, target_type)
+        if normalized is not None and OPERATORS[op](normalized, coerced):
+            result.append(node)
+    return result
+
+
+NUMERIC_QUERIES = [
+    ("age", op, value) for op in OPERATORS for value in ("17", "30", "45", "70", "99")
+] + [
+    ("score", op, value) for op in OPERATORS for value in ("0", "2.5", "5", "9.99")
+] + [
+    ("joined", op, value) for op in OPERATORS for value in ("2019-12-31", "2021-01-01", "2022-06-18")
+]
+TEXT_QUERIES = [("city", op, value) for op in ("==", "!=") for value in ("Paris", "Novi Sad", "Berlin")]
+
+
+def node_ids(nodes):
+    return [node.node_id for node in nodes]
+
+
+@pytest.fixture
+def workspace(random_graph):
+    workspace = Workspace()
+    workspace.set_graph(random_graph(random.Random(3), 300, attributes=True))
+    return workspace
+
+
+@pytest.mark.parametrize("attribute, op, value", NUMERIC_QUERIES + TEXT_QUERIES)
+def test_attribute_index_matches_scan(workspace, attribute, op, value):
+    expected = node_ids(scan_attribute(workspace, attribute, op, value))
+    assert node_ids(workspace.find_nodes_by_attribute(attribute, op, value)) == expected
+
+
+def test_attribute_index_follows_edits(workspace):
+    queries = [("age", ">=", "40"), ("city", "==", "Paris"), ("score", "<", "3")]
+    for query in queries:
+        workspace.find_nodes_by_attribute(*query)
+
+    workspace.create_node("extra", {"age": 44, "city": "Paris", "score": 1.5})
+    workspace.edit_node("n0", {"age": 69, "city": "Paris"})
+    workspace.edit_node("n1", {"score": "unknown"})
+    workspace.delete_node("n2")
+    workspace.undo()
+    workspace.delete_node("n3")
+
+    for query in queries:
+        assert node_ids(workspace.find_nodes_by_attribute(*query)) == node_ids(scan_attribute(workspace, *query))
+
+
+def test_attribute_index_rejects_invalid_filters(workspace):
+    with pytest.raises(ValueError, match="not valid for attribute 'city'"):
+        workspace.find_nodes_by_attribute("city", ">", "Paris")
+    with pytest.raises(ValueError, match="Expected int"):
+        workspace.find_nodes_by_attribute("age", ">", "old")
+    assert workspace.find_nodes_by_attribute("missing", "==", "1") == []
+
+
+def test_typed_column_index_matches_scan(tmp_path):
+    # A CSV node list keeps numeric columns as arrays, which get their own index
+    pytest.importorskip("numpy")
+    random.seed(11)
+    path = tmp_path / "people.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "age", "score"])
+        for i in range(500):
+            writer.writerow([i, f"p{i}", random.randint(18, 70), f"{random.uniform(0, 10):.3f}"])
+
+    workspace = Workspace()
+    workspace.set_graph(CsvDatasourcePlugin().load_graph(str(path)))
+    assert workspace.get_graph().node_column("age") is not None
+
+    queries = [(a, op, v) for a, values in [("age", ("18", "35", "70")), ("score", ("0", "5.5"))]
+               for op in OPERATORS for v in values]
+    for attribute, op, value in queries:
+        expected = node_ids(scan_attribute(workspace, attribute, op, value))
+        assert node_ids(workspace.find_nodes_by_attribute(attribute, op, value)) == expected
+
+
+# ----------------------------
+# Trigram text index
+# ----------------------------
+
+def scan_text(workspace, query, allowed_node_ids=None):
+    # What find_nodes_by_query_contains returned before the trigram index
+    query = str(query).strip().casefold()
+    if not query:
+        return []
+
+    def text(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        return "" if value is None else str(value)
+
+    matched = []
+    for node in workspace.list_nodes():
+        if allowed_node_ids is not None and node.node_id not in allowed_node_ids:
+            continue
+        fields = [node.label, node.node_id]
+        for key, value in node.attributes.items():
+            fields.extend((key, value))
+        if any(query in text(field).casefold() for field in fields):
+            matched.append(node)
+    return matched
+
+
+TEXT_SEARCHES = [
+    # Shorter than a trigram, so the index cannot narrow them down
+    "a", "7", "ö", "pa", "N1",
+    # Whole and partial values, labels, IDs and attribute keys
+    "paris", "PARIS", "  novi sad ", "vi s", "Đorđe", "élodie", "ELO", "n12", "n299", "joined", "sco",
+    "2021-0", "4.25", "n/a", "true",
+    # Every trigram is in the node, but not the query as a whole, or only across two fields
+    "parisrome", "anan", "paris30", "n1n2",
+    # Casefolding that changes the length
+    "STRASSE", "straße",
+    "nothing like this",
+]
+
+
+@pytest.fixture
+def text_workspace(random_graph):
+    graph = random_graph(random.Random(3), 300, attributes=True)
+    graph.add_node(Node("street", label="Hauptstraße", attributes={"zip": 10115, "note": "Ananas"}))
+    workspace = Workspace()
+    workspace.set_graph(graph)
+    return workspace
+
+
+@pytest.mark.parametrize("query", TEXT_SEARCHES)
+def test_text_index_matches_scan(text_workspace, query):
+    expected = node_ids(scan_text(text_workspace, query))
+    assert node_ids(text_workspace.find_nodes_by_query_contains(query)) == expected
+
+
+@pytest.mark.parametrize("query", ["a", "paris", "n1", "nothing like this"])
+def test_text_index_respects_allowed_nodes(text_workspace, query):
+    allowed = {f"n{i}" for i in range(0, 300, 3)} | {"street", "missing"}
+    expected = node_ids(scan_text(text_workspace, query, allowed))
+    assert node_ids(text_workspace.find_nodes_by_query_contains(query, allowed)) == expected
+    assert text_workspace.find_nodes_by_query_contains(query, set()) == []
+
+
+def test_text_index_follows_edits(text_workspace):
+    queries = ["paris", "ström", "oslo", "n4", "a"]
+    for query in queries:
+        text_workspace.find_nodes_by_query_contains(query)
+
+    text_workspace.create_node("n400", {"city": "Strömstad", "label": "Oslo"})
+    text_workspace.edit_node("n4", {"city": "Strömsund"})
+    text_workspace.delete_node("n5")
+    text_workspace.delete_node("street")
+    text_workspace.undo()
+    text_workspace.edit_node("n6", {"city": "Oslo"})
+    text_workspace.undo()
+
+    for query in queries:
+        expected = node_ids(scan_text(text_workspace, query))
+        assert node_ids(text_workspace.find_nodes_by_query_contains(query)) == expected
+
+    assert text_workspace.find_nodes_by_query_contains("") == []
+    assert text_workspace.find_nodes_by_query_contains("   ") == []
+
+
+# ----------------------------
+# Filter expression planner
+# ----------------------------
+
+CONDITIONS = [
+    ("age", ">", "30"), ("age", "<=", "45"), ("age", "==", "52"), ("age", "!=", "30"),
+    ("score", ">=", "5"), ("score", "<", "2.5"),
+    ("city", "==", "Paris"), ("city", "!=", "Rome"), ("city", "==", "Novi Sad"),
+    ("team", "==", "Core (Backend)"),
+    ("joined", ">", "2021-01-01"),
+    # No node has a filterable value, so it matches nothing
+    ("missing", "==", "1"),
+]
+
+
+def random_expression(rng, depth):
+    # A random AND/OR/NOT tree, rendered with as few parentheses as precedence allows,
+    # returned as (kind, text, matching node IDs)
+    kind = rng.choice(["cond"] * 2 + ["not", "and", "or"]) if depth else "cond"
+    if kind == "cond":
+        attribute, op, value = rng.choice(CONDITIONS)
+        shown = "=" if op == "==" and rng.random() < 0.3 else op
+        return kind, f"{attribute}{shown}{value}", lambda matches: matches(attribute, op, value)
+
+    if kind == "not":
+        _, text, evaluate = operand = random_expression(rng, depth - 1)
+        text = text if operand[0] in ("cond", "not") else f"({text})"
+        return kind, rng.choice(["!", "NOT "]) + text, lambda matches: matches.all() - evaluate(matches)
+
+    operands = [random_expression(rng, depth - 1) for _ in range(rng.randint(2, 3))]
+    texts = []
+    for operand_kind, text, _ in operands:
+        if (kind == "and" and operand_kind == "or") or rng.random() < 0.2:
+            text = f"({text})"
+        texts.append(text)
+    joiner = rng.choice([" && ", " AND ", "&&"] if kind == "and" else [" || ", " OR ", "||"])
+    evaluators = [evaluate for _, _, evaluate in operands]
+    if kind == "and":
+        return kind, joiner.join(texts), lambda matches: set.intersection(*(e(matches) for e in evaluators))
+    return kind, joiner.join(texts), lambda matches: set.union(*(e(matches) for e in evaluators))
+
+
+class ScanMatches:
+    # Node IDs per condition, from the full scan
+    def __init__(self, workspace):
+        self.workspace = workspace
+
+    def __call__(self, attribute, op, value):
+        return set(node_ids(scan_attribute(self.workspace, attribute, op, value)))
+
+    def all(self):
+        return set(node_ids(self.workspace.list_nodes()))
+
+
+@pytest.fixture
+def planner_workspace(random_graph):
+    graph = random_graph(random.Random(3), 300, attributes=True)
+    for i in range(0, 300, 17):
+        graph.get_node(f"n{i}").attributes["team"] = "Core (Backend)" if i % 2 else "Core"
+    workspace = Workspace()
+    workspace.set_graph(graph)
+    return workspace
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_filter_expression_matches_scan(planner_workspace, seed):
+    rng = random.Random(seed)
+    _, expression, evaluate = random_expression(rng, depth=3)
+
+    matching = evaluate(ScanMatches(planner_workspace))
+    expected = [nid for nid in node_ids(planner_workspace.list_nodes()) if nid in matching]
+
+    assert node_ids(planner_workspace.find_nodes_by_filter_expression(expression)) == expected, expression
+
+
+@pytest.mark.parametrize("expression, equivalent", [
+    # NOT binds tighter than AND, AND tighter than OR
+    ("city==Paris || age>30 && score<2.5", "city==Paris || (age>30 && score<2.5)"),
+    ("!city==Paris && age>30", "(!city==Paris) && age>30"),
+    ("NOT city==Paris OR age>30 AND NOT score<2.5", "(!city==Paris) || (age>30 && !score<2.5)"),
+    ("!!(age>30)", "age>30"),
+    ("!(age>30 || city==Rome)", "!age>30 && !city==Rome"),
+])
+def test_filter_expression_precedence(planner_workspace, expression, equivalent):
+    assert planner_workspace.find_nodes_by_filter_expression(expression) == \
+        planner_workspace.find_nodes_by_filter_expression(equivalent)
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("", "Empty filter expression"),
+    ("age>30 &&", "Incomplete filter expression"),
+    ("(age>30 || city==Rome", "Missing '\\)'"),
+    ("age>30)", "Unexpected '\\)'"),
+    ("age 30", "Invalid filter condition"),
+    # Checked even though the first condition matches nothing
+    ("missing==1 && city>Paris", "not valid for attribute 'city'"),
+    ("age>1000 && age>old", "Expected int"),
+])
+def test_filter_expression_errors(planner_workspace, expression, message):
+    with pytest.raises(ValueError, match=message):
+        planner_workspace.find_nodes_by_filter_expression(expression)
+
+
+def test_filter_nodes_implement_the_whole_plan_interface():
+    with pytest.raises(TypeError):
+        FilterNode()
+    for node_cls in (Condition, Not, And, Or):
+        assert not node_cls.__abstractmethods__
@@ -0,0 +1,167 @@
+import random
+
+import pytest
+
+import api.graph_api.layout.incremental as incremental_module
+from api.graph_api import Edge, Graph, Node
+from api.graph_api.layout import LayoutCache, LayoutParams, hierarchical_layout, incremental_layout, update_layout
+from api.graph_api.layout.hierarchical import build_hierarchy
+
+PARAMS = [
+    LayoutParams(),
+    LayoutParams(node_width=100, node_spacing=90, level_spacing=160, component_gap=200, row_gap=150, wrap_width=1200),
+]
+
+
+def random_changes(rng, graph, serials):
+    # Applies one to three edits to the graph and returns their change set
+    changes = []
+    for _ in range(rng.randint(1, 3)):
+        choice = rng.random()
+        if choice < 0.3:
+            node_id = f"x{next(serials)}"
+            graph.add_node(Node(node_id))
+            changes.append(("add_node", node_id))
+        elif choice < 0.7 or not graph.edges:
+            source = rng.choice(graph.nodes).node_id
+            target = rng.choice(graph.nodes).node_id
+            graph.add_edge(Edge(source, target, edge_id=f"y{next(serials)}"))
+            changes.append(("add_edge", source, target))
+        else:
+            edge = rng.choice(graph.edges)
+            graph.remove_edge(edge.edge_id)
+            changes.append(("remove_edge", edge.source, edge.target))
+    return changes
+
+
+def relative_positions(layout, nodes):
+    # Positions within a component, measured from its first node
+    origin_x, origin_y = layout.position(nodes[0])
+    return [(x - origin_x, y - origin_y) for x, y in map(layout.position, nodes)]
+
+
+def boxes_overlap(a, b):
+    return not (a[2] < b[0] or b[2] < a[0] or a[3] < b[1] or b[3] < a[1])
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    # Whether every update_layout call applied its changes or gave up
+    results = []
+    original = incremental_module.update_layout
+
+    def recording(previous, graph, changes):
+        layout = original(previous, graph, changes)
+        results.append(layout is not None)
+        return layout
+
+    monkeypatch.setattr(incremental_module, "update_layout", recording)
+    return results
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_incremental_layout_matches_full_layout(seed, updates, random_graph):
+    rng = random.Random(seed)
+    params = PARAMS[seed % 2]
+    graph = random_graph(rng, rng.randint(1, 40))
+    serials = iter(range(10 ** 6))
+    cache = LayoutCache(None)
+    changes = []
+    previous = incremental_layout(graph, params, cache, "lineage", changes)
+
+    for _ in range(12):
+        changes.extend(random_changes(rng, graph, serials))
+        layout = incremental_layout(graph, params, cache, "lineage", changes)
+        full = hierarchical_layout(graph, params, cache=None)
+        hierarchy = layout.placement.hierarchy
+        full_components = {tuple(c.nodes): c for c in build_hierarchy(graph).components}
+
+        # Same components, built the same way, and laid out the same within themselves
+        assert layout.node_ids == full.node_ids
+        assert sorted(tuple(c.nodes) for c in hierarchy.components) == sorted(full_components)
+        for component in hierarchy.components:
+            expected = full_components[tuple(component.nodes)]
+            assert component.levels == expected.levels
+            assert component.child_map == expected.child_map
+            assert component.subtree_size == expected.subtree_size
+            assert relative_positions(layout, component.nodes) == pytest.approx(
+                relative_positions(full, component.nodes)
+            )
+
+        # Components the changes did not touch all move by the same amount, if at all
+        kept = {id(c) for c in previous.placement.hierarchy.components}
+        shifts = set()
+        for component in hierarchy.components:
+            if id(component) in kept:
+                for node_id in component.nodes:
+                    (old_x, old_y), (x, y) = previous.position(node_id), layout.position(node_id)
+                    shifts.add((round(x - old_x, 6), round(y - old_y, 6)))
+        assert len(shifts) <= 1
+
+        boxes = []
+        for component in hierarchy.components:
+            xs, ys = zip(*map(layout.position, component.nodes))
+            boxes.append((min(xs), min(ys), max(xs), max(ys)))
+        for i, box in enumerate(boxes):
+            assert not any(boxes_overlap(box, other) for other in boxes[i + 1:])
+
+        # Boxes given up by rebuilt components may stay empty, so only the margin is guaranteed
+        assert min(layout.x) >= params.margin - 1e-9
+        assert min(layout.y) >= params.margin - 1e-9
+        assert layout.width == pytest.approx(max(layout.x) + params.margin)
+        assert layout.height == pytest.approx(max(layout.y) + params.margin)
+        previous = layout
+
+    assert updates and all(updates)
+
+
+def test_undescribed_edit_falls_back_to_full_layout(updates):
+    graph = Graph(directed=True)
+    graph.add_nodes_bulk(Node(str(i)) for i in range(6))
+    graph.add_edges_bulk([Edge("0", "1", edge_id="a"), Edge("1", "2", edge_id="b")])
+    cache = LayoutCache(None)
+    incremental_layout(graph, LayoutParams(), cache, "lineage", [])
+
+    # The change set says 3 -> 4, the graph got 3 -> 5
+    graph.add_edge(Edge("3", "5", edge_id="c"))
+    layout = incremental_layout(graph, LayoutParams(), cache, "lineage", [("add_edge", "3", "4")])
+
+    assert updates == [False]
+    assert layout.to_dict() == hierarchical_layout(graph, LayoutParams(), cache=None).to_dict()
+
+
+def test_update_layout_gives_up_on_removed_nodes():
+    graph = Graph(directed=True)
+    graph.add_nodes_bulk(Node(str(i)) for i in range(5))
+    graph.add_edge(Edge("0", "1", edge_id="a"))
+    previous = hierarchical_layout(graph, LayoutParams(), cache=None)
+
+    graph.add_edge(Edge("2", "3", edge_id="b"))
+    graph.remove_node("4")
+
+    assert update_layout(previous, graph, [("add_edge", "2", "3")]) is None
+    assert update_layout(previous, graph, [("remove_node", "4")]) is None
+    assert update_layout(previous, graph, []) is None
+
+
+def test_incremental_layout_applies_only_newer_changes(updates):
+    graph = Graph(directed=True)
+    graph.add_nodes_bulk(Node(str(i)) for i in range(4))
+    cache = LayoutCache(None)
+    changes = []
+    incremental_layout(graph, LayoutParams(), cache, "lineage", changes)
+
+    graph.add_edge(Edge("0", "1", edge_id="a"))
+    changes.append(("add_edge", "0", "1"))
+    first = incremental_layout(graph, LayoutParams(), cache, "lineage", changes)
+    # The same state again comes from the cache
+    assert incremental_layout(graph, LayoutParams(), cache, "lineage", changes) is first
+
+    graph.add_node(Node("4"))
+    graph.add_edge(Edge("4", "2", edge_id="b"))
+    changes.extend([("add_node", "4"), ("add_edge", "4", "2")])
+    second = incremental_layout(graph, LayoutParams(), cache, "lineage", changes)
+
+    assert updates == [True, True]
+    assert second.node_ids == ["0", "1", "2", "3", "4"]
+    assert second.position("0") == first.position("0")
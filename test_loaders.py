@@ -0,0 +1,321 @@
+import csv
+import io
+import json
+import os
+import random
+
+import pytest
+
+import datasource_csv.datasource_csv_plugin.plugin as csv_plugin_module
+from datasource_csv.datasource_csv_plugin.plugin import CsvDatasourcePlugin
+from api.graph_api.datasource_common.base import BaseDatasourcePlugin
+from api.graph_api.model import MappedGraph
+from datasource_binary.datasource_binary_plugin.plugin import BinaryDatasourcePlugin
+from datasource_json.datasource_json_plugin.plugin import JsonDatasourcePlugin
+from datasource_json.datasource_json_plugin.streaming import JsonStreamReader, JsonSyntaxError
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_data")
+
+
+# ----------------------------
+# CSV edge lists in worker processes
+# ----------------------------
+
+@pytest.fixture
+def quoted_edge_list(tmp_path):
+    # Quoted fields with delimiters, doubled quotes and newlines cross the chunk boundaries
+    random.seed(7)
+    path = tmp_path / "edges.csv"
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Source", "Target", "weight", "note", "id"])
+        for i in range(3000):
+            note = random.choice(["plain", 'multi\nline "quoted"', "a,b", '""', "", "x\n\ny"])
+            edge_id = f"e{i}" if i % 7 == 0 else ""
+            weight = random.choice(["1.5", "2", "", "heavy"])
+            writer.writerow([f"n{random.randrange(400)}", f"n{random.randrange(400)}", weight, note, edge_id])
+    return str(path)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_parallel_csv_matches_serial(quoted_edge_list, monkeypatch, compact, graph_snapshot):
+    serial = CsvDatasourcePlugin().load_graph(quoted_edge_list, compact=compact)
+
+    # Small chunks, so the file is split into many more chunks than there are workers
+    monkeypatch.setattr(csv_plugin_module, "CHUNK_BYTES", 4096)
+    chunks = []
+    edges_from_columns = csv_plugin_module._edges_from_columns
+    monkeypatch.setattr(
+        csv_plugin_module, "_edges_from_columns", lambda columns: chunks.append(columns) or edges_from_columns(columns)
+    )
+    parallel = CsvDatasourcePlugin().load_graph(quoted_edge_list, workers=3, compact=compact)
+
+    assert len(chunks) > 3 * csv_plugin_module.CHUNKS_AHEAD
+    assert len(parallel.edges) == 3000
+    assert graph_snapshot(parallel) == graph_snapshot(serial)
+
+
+def test_small_csv_stays_serial(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("source,target\na,b\nb,c\n", encoding="utf-8")
+
+    graph = CsvDatasourcePlugin().load_graph(str(path), workers=4)
+
+    assert [(e.source, e.target) for e in graph.edges] == [("a", "b"), ("b", "c")]
+    assert [n.node_id for n in graph.nodes] == ["a", "b", "c"]
+
+
+# ----------------------------
+# JSON stream mode
+# ----------------------------
+
+NODES = [{"id": "1", "name": "Ana", "age": "31"}, {"id": "2", "name": "Bo"}, {"id": "3", "manager_id": "1"}]
+EDGES = [{"source": "1", "target": "2", "weight": "2.5"}, {"source": "3", "target": "1"}]
+
+
+def write_json(tmp_path, document, name="graph.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(document, indent=1), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    # Tiny read chunks, so every value is split between reads somewhere
+    monkeypatch.setattr(JsonStreamReader.__init__, "__defaults__", (7,))
+
+
+@pytest.mark.parametrize("name", ["company_acyclic.json", "social_cyclic.json", "tree-like-graph.json"])
+@pytest.mark.parametrize("compact", [False, True])
+def test_json_stream_matches_regular_load(name, compact, small_reads, graph_snapshot):
+    path = os.path.join(TEST_DATA, name)
+    plugin = JsonDatasourcePlugin()
+    regular = plugin.load_graph(path, compact=compact)
+    streamed = plugin.load_graph(path, compact=compact, stream=True)
+    assert graph_snapshot(streamed) == graph_snapshot(regular)
+
+
+@pytest.mark.parametrize("document", [
+    {"nodes": NODES, "edges": EDGES},
+    {"meta": {"id": "m", "tags": [1, {"a": 2}]}, "nodes": NODES, "edges": EDGES},
+    {"edges": EDGES, "version": 2, "nodes": NODES},
+    # Not a nodes/edges document: one key is missing, so both loaders read a nested hierarchy
+    {"nodes": NODES, "meta": {"id": "m"}},
+    {"edges": EDGES},
+    [{"name": "A"}, {"id": "b", "parent": "c"}, {"id": "c"}],
+])
+def test_json_stream_reads_every_root_key(tmp_path, document, small_reads, graph_snapshot):
+    path = write_json(tmp_path, document)
+    plugin = JsonDatasourcePlugin()
+    assert graph_snapshot(plugin.load_graph(path, stream=True)) == graph_snapshot(plugin.load_graph(path))
+
+
+def test_json_stream_nodes_without_edges_is_a_hierarchy(tmp_path):
+    path = write_json(tmp_path, {"nodes": [{"id": "1"}, {"id": "2"}], "meta": {"id": "m"}})
+
+    graph = JsonDatasourcePlugin().load_graph(path, stream=True)
+
+    assert [n.node_id for n in graph.nodes] == ["auto_1", "1", "2", "m"]
+    assert [(e.source, e.target) for e in graph.edges] == [("auto_1", "1"), ("auto_1", "2"), ("auto_1", "m")]
+
+
+def test_json_stream_reports_the_same_errors(tmp_path):
+    path = write_json(tmp_path, {"nodes": [{"id": "1"}], "edges": [{"source": "1", "target": "9"}]})
+    plugin = JsonDatasourcePlugin()
+
+    with pytest.raises(ValueError, match="'9' does not exist"):
+        plugin.load_graph(path)
+    with pytest.raises(ValueError, match="'9' does not exist"):
+        plugin.load_graph(path, stream=True)
+
+
+class CountingReader(io.StringIO):
+    # Counts how much of the text was read
+    def __init__(self, text):
+        super().__init__(text)
+        self.read_chars = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.read_chars += len(chunk)
+        return chunk
+
+
+TRUNCATED_TOKENS = (
+    '[{"s": "x\\\\y\\"z\\u00e9\\ud83d\\ude00", "n": -1.25e-10, "i": 123456789012345678901, '
+    '"t": true, "f": false, "z": null, "inf": -Infinity, "k\\u0041": {"d": [[], {}]}}, 1e5, "tail"]'
+)
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 25))
+def test_json_stream_values_split_between_reads(chunk_size):
+    reader = JsonStreamReader(io.StringIO(TRUNCATED_TOKENS), chunk_size)
+    assert json.dumps(list(reader.iter_array())) == json.dumps(json.loads(TRUNCATED_TOKENS))
+
+
+@pytest.mark.parametrize("broken", ['{"id": 1,, "x": 2}', '{"id": tru}', '{"id": "a" "b"}', '{"id": 01}'])
+def test_json_stream_fails_before_reading_the_rest(broken):
+    # The broken item comes first, the rest of the file is never needed
+    text = "[" + broken + ", " + ", ".join(['{"id": "%d", "pad": "%s"}' % (i, "x" * 50) for i in range(20000)]) + "]"
+    f = CountingReader(text)
+
+    with pytest.raises(JsonSyntaxError, match="Invalid JSON"):
+        list(JsonStreamReader(f, 4096).iter_array())
+    assert f.read_chars <= 2 * 4096
+
+
+def test_json_stream_reports_syntax_errors_without_a_regular_load(tmp_path, monkeypatch):
+    path = tmp_path / "broken.json"
+    path.write_text('{"nodes": [{"id": "1"}, {"id": "2",}], "edges": []}', encoding="utf-8")
+
+    def regular_load(*args, **kwargs):
+        raise AssertionError("the regular loader was used")
+
+    monkeypatch.setattr(BaseDatasourcePlugin, "load_graph", regular_load)
+    with pytest.raises(JsonSyntaxError, match=r"Invalid JSON: .* \(char 35\)"):
+        JsonDatasourcePlugin().load_graph(str(path), stream=True)
+
+
+# ----------------------------
+# JSON generated IDs
+# ----------------------------
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_generated_id_claimed_later_keeps_both_nodes(tmp_path, stream):
+    path = write_json(tmp_path, [{"name": "A"}, {"id": "b"}, {"name": "C"}, {"id": "auto_2"}])
+
+    graph = JsonDatasourcePlugin().load_graph(path, stream=stream)
+
+    assert [(n.node_id, n.label) for n in graph.nodes] == [
+        ("auto_1", "A"), ("b", "b"), ("auto_3", "C"), ("auto_2", "auto_2")
+    ]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_generated_id_rename_moves_edges(tmp_path, stream):
+    # The node generated as auto_2 has a child and a reference, the later explicit auto_2 a parent
+    document = [
+        {"name": "A"},
+        {"name": "B", "kid": {"v": 1}, "manager_id": "auto_1"},
+        {"id": "auto_2", "parent": "auto_3"},
+        {"id": "auto_3"},
+    ]
+    path = write_json(tmp_path, document)
+
+    graph = JsonDatasourcePlugin().load_graph(path, stream=stream)
+
+    assert [n.node_id for n in graph.nodes] == ["auto_1", "auto_4", "auto_5", "auto_2", "auto_3"]
+    assert [(e.source, e.target) for e in graph.edges] == [
+        ("auto_4", "auto_1"), ("auto_4", "auto_5"), ("auto_2", "auto_3")
+    ]
+
+
+def test_generated_ids_in_nested_documents_stay_unique(tmp_path):
+    document = {"name": "root", "kids": [{"v": 1}, {"v": 2, "c": {"w": 1}}], "more": [{"id": "auto_2"}, {"id": "auto_3"}]}
+    path = write_json(tmp_path, document)
+
+    graph = JsonDatasourcePlugin().load_graph(path)
+
+    ids = [n.node_id for n in graph.nodes]
+    assert len(ids) == len(set(ids)) == 6
+    assert {"auto_2", "auto_3"} <= set(ids)
+    assert len(graph.edges) == 5
+
+
+def test_deeply_nested_json(tmp_path):
+    path = tmp_path / "deep.json"
+    opening = "".join(f'{{"id": "n{depth}", "child": ' for depth in range(3000))
+    path.write_text(opening + '{"id": "leaf"}' + "}" * 3000, encoding="utf-8")
+
+    graph = JsonDatasourcePlugin().load_graph(str(path))
+
+    assert len(graph.nodes) == 3001
+    assert len(graph.edges) == 3000
+    assert graph.edges[-1].target == "leaf"
+
+
+# ----------------------------
+# Binary snapshots and Arrow tables
+# ----------------------------
+
+@pytest.mark.parametrize("mapped", [False, True])
+def test_snapshot_round_trip(tmp_path, mapped, graph_snapshot):
+    from api.graph_api.model.binary import write_graph
+
+    original = JsonDatasourcePlugin().load_graph(os.path.join(TEST_DATA, "social_cyclic.json"))
+    path = str(tmp_path / "social.gsnap")
+    write_graph(original, path)
+
+    graph = BinaryDatasourcePlugin().load_graph(path, mapped=mapped)
+
+    assert isinstance(graph, MappedGraph) == mapped
+    assert graph_snapshot(graph) == graph_snapshot(original)
+
+
+def write_arrow_table(tmp_path, rows, name):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    table = pa.Table.from_pylist(rows)
+    path = str(tmp_path / name)
+    if name.endswith(".parquet"):
+        pyarrow.parquet.write_table(table, path)
+    else:
+        with pyarrow.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+EMPLOYEES = [
+    {"id": "1", "name": "CEO", "manager_id": None, "age": 50},
+    {"id": "2", "name": "CTO", "manager_id": "1", "age": 40},
+    {"id": "3", "name": "Dev", "manager_id": "2", "age": 30},
+    {"id": "4", "name": "Ext", "manager_id": "99", "age": 20},
+    {"id": "5", "name": "Self", "manager_id": "5", "age": 25},
+]
+
+
+@pytest.mark.parametrize("name", ["employees.arrow", "employees.ipc", "employees.parquet"])
+def test_arrow_node_table_references_become_edges(tmp_path, name):
+    path = write_arrow_table(tmp_path, EMPLOYEES, name)
+
+    graph = BinaryDatasourcePlugin().load_graph(path)
+
+    # Same nodes and edges as the CSV node-list loader
+    csv_path = tmp_path / "employees.csv"
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(EMPLOYEES[0]))
+        writer.writeheader()
+        writer.writerows(EMPLOYEES)
+    expected = CsvDatasourcePlugin().load_graph(str(csv_path))
+
+    assert [(n.node_id, n.label) for n in graph.nodes] == [(n.node_id, n.label) for n in expected.nodes]
+    assert [(e.edge_id, e.source, e.target) for e in graph.edges] == [
+        (e.edge_id, e.source, e.target) for e in expected.edges
+    ]
+    # References that are not edges stay attributes, so the column is not a typed one
+    assert graph.get_node("4").attributes["manager_id"] == "99"
+    assert "manager_id" not in graph.get_node("2").attributes
+    assert graph.node_column("manager_id") is None
+
+
+def test_arrow_edge_weights_fall_back_to_one(tmp_path):
+    rows = [
+        {"source": "a", "target": "b", "weight": "heavy"},
+        {"source": "b", "target": "c", "weight": "2.5"},
+        {"source": "c", "target": "a", "weight": None},
+    ]
+    path = write_arrow_table(tmp_path, rows, "edges.arrow")
+
+    graph = BinaryDatasourcePlugin().load_graph(path)
+
+    assert [e.weight for e in graph.edges] == [1.0, 2.5, 1.0]
+
+
+def test_binary_parse_source_returns_the_graph(tmp_path):
+    path = write_arrow_table(tmp_path, [{"source": "a", "target": "b"}], "edges.bin")
+
+    graph = BinaryDatasourcePlugin()._parse_source(path)
+
+    assert [(e.source, e.target) for e in graph.edges] == [("a", "b")]
@@ -0,0 +1,84 @@
+import pytest
+
+from api.graph_api.model import Edge, Graph, Node
+from core.graph_platform.workspace import Workspace
+from graph_explorer.explorer.session_backends import DirectorySessionBackend
+from graph_explorer.explorer.sessions import GraphSessionStore
+
+
+def sample_workspace(count=50):
+    graph = Graph()
+    graph.add_nodes_bulk(Node(str(i), attributes={"i": i}) for i in range(count))
+    graph.add_edges_bulk(Edge(str(i), str(i + 1)) for i in range(count - 1))
+    workspace = Workspace()
+    workspace.set_graph(graph)
+    return workspace
+
+
+@pytest.fixture
+def shared(tmp_path, monkeypatch):
+    # Two worker stores over one backend, and the IDs of every saved session
+    backend = DirectorySessionBackend(tmp_path)
+    saved = []
+    save = backend.save
+
+    def counting_save(graph_id, fields, expected):
+        saved.append(graph_id)
+        return save(graph_id, fields, expected)
+
+    monkeypatch.setattr(backend, "save", counting_save)
+    return GraphSessionStore(backend=backend), GraphSessionStore(backend=backend), saved
+
+
+def test_reads_do_not_save_the_session(shared):
+    store, _, saved = shared
+    workspaces = store.field("workspace")
+    workspaces["g"] = sample_workspace()
+    store.flush()
+    assert saved == ["g"]
+
+    nbytes = store.usage()["total_bytes"]
+    for _ in range(3):
+        workspace = workspaces.get("g")
+        workspace.get_graph().get_node("1")
+        store.flush()
+
+    assert saved == ["g"]
+    assert store.usage()["total_bytes"] == nbytes
+
+
+def test_changes_in_place_are_measured_and_saved(shared):
+    store, other, saved = shared
+    workspaces = store.field("workspace")
+    workspaces["g"] = sample_workspace()
+    store.flush()
+    nbytes = store.usage()["total_bytes"]
+
+    workspace = workspaces.get("g")
+    for i in range(50):
+        workspace.create_node(node_id=f"new{i}", properties={"text": "x" * 100})
+    workspaces.changed("g")
+    assert store.flush() == []
+
+    assert saved == ["g", "g"]
+    assert store.usage()["total_bytes"] > nbytes
+    # Another worker loads the saved copy
+    assert other.field("workspace")["g"].get_graph().get_node("new49") is not None
+
+
+def test_changed_sizes_count_against_the_budget():
+    store = GraphSessionStore(max_bytes=None)
+    workspaces = store.field("workspace")
+    workspaces["a"] = sample_workspace()
+    workspaces["b"] = sample_workspace()
+    store.max_bytes = store.usage()["total_bytes"] + 1000
+
+    workspace = workspaces.get("b")
+    for i in range(50):
+        workspace.create_node(node_id=f"new{i}", properties={})
+    assert store.ids() == ["a", "b"]
+
+    # The grown session is kept, the least recently used one makes room
+    workspaces.changed("b")
+    assert store.ids() == ["b"]
+    assert store.was_evicted("a")
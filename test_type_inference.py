@@ -0,0 +1,62 @@
+import math
+from datetime import date, datetime
+
+import pytest
+
+from api.graph_api.datasource_common.type_inference import (
+    COLUMN_SAMPLE_SIZE,
+    ColumnTypeInference,
+    _COLUMN_PARSERS,
+    infer_type,
+)
+
+# Strings that look like one type to a parser and like another to infer_type
+TRICKY = [
+    # Integers that fromisoformat reads as compact dates and datetimes
+    "20190101", "2019010110300", "20190101103000", "201901011030001234", "12345678901",
+    # Floats that fromisoformat also accepts
+    "20190101.5", "20190101e10", "2019.5",
+    # Whole floats are integers only when written as integers
+    "1e3", "3.0", "-0", "+7", " 42 ", "1_000", "1_000.5", "1e400",
+    "inf", "-Infinity", "nan",
+    # Real dates and datetimes
+    "2019-01-01", "2019-W01-1", "20190101T103000", "2019-01-01T10:30", "2019-01-01 10:30:00+01:00",
+    # Not numbers or dates
+    "0x10", "true", "", "  ", "1.2.3", "12:30",
+]
+
+
+def same(result, expected):
+    if isinstance(expected, float) and math.isnan(expected):
+        return isinstance(result, float) and math.isnan(result)
+    return type(result) is type(expected) and result == expected
+
+
+@pytest.mark.parametrize("value", TRICKY)
+@pytest.mark.parametrize("kind", list(_COLUMN_PARSERS))
+def test_column_parsers_agree_with_infer_type(kind, value):
+    # A parser may give up (None), but what it returns must be what infer_type returns
+    result = _COLUMN_PARSERS[kind](value)
+    assert result is None or same(result, infer_type(value))
+
+
+@pytest.mark.parametrize("sample, kind", [
+    ("2019-01-01T10:30:00", datetime),
+    ("2019-01-01", date),
+    ("17", int),
+    ("2.5", float),
+])
+def test_locked_column_agrees_with_infer_type(sample, kind):
+    column = ColumnTypeInference()
+    for _ in range(COLUMN_SAMPLE_SIZE):
+        assert type(column.infer(sample)) is kind
+
+    for value in TRICKY:
+        assert same(column.infer(value), infer_type(value)), value
+
+
+def test_values_that_are_not_strings_are_kept():
+    column = ColumnTypeInference()
+    values = [None, 3, 2.5, True, date(2020, 1, 2), ["a"]]
+    assert [column.infer(value) for value in values] == values
+    assert infer_type(" text ") == " text "